@@ -0,0 +1,136 @@
+"""
+구조화된 회의록 (주제/결정 사항/액션 아이템) 백필 및 조회
+
+/summarize와 일괄 재요약은 회의록과 함께 JSON 스키마로 주제/결정/액션 아이템을 받아 meeting_topics,
+meeting_decisions, action_items 테이블에 저장합니다. 이 기능 이전에 만든 요약은 원본 텍스트를 다시 보내는 대신
+저장된 마크다운 회의록에서 구조만 추출하여 채웁니다 (입력 토큰이 훨씬 적음).
+
+- 요약 ID 오름차순으로 처리하므로 같은 회의의 요약이 여러 개면 가장 최근 요약 항목이 is_current로 남음
+- 배치마다 커밋하고 structured_at으로 처리 여부를 기록하므로 중간에 멈춰도 다시 실행하면 이어서 진행
+- 상대적인 기한("다음 주 금요일")은 STT 레코드 생성일을 회의 날짜로 보고 변환
+
+실행 (먼저 python migrate_db.py --yes로 테이블 생성):
+    python action_items.py backfill --model gpt-5-mini --concurrency 4
+    python action_items.py list --team 마케팅
+    python action_items.py list --owner 김민수 --status all
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy.orm import load_only
+
+import crud
+from models import SummaryRecord
+
+DEFAULT_BATCH_SIZE = 50
+
+
+def backfill(
+    model: str = "gpt-5-mini",
+    concurrency: int = 4,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    limit: int = None,
+    session_factory=None
+) -> dict:
+    """
+    구조화되지 않은 요약에서 주제/결정/액션 아이템 추출
+
+    Returns:
+        dict: {"structured": 저장한 요약 수, "failed": 스키마에 맞지 않아 건너뛴 수, "elapsed": 초}
+    """
+    from gpt_summarizer import GPTSummarizer
+
+    if session_factory is None:
+        from database import SessionLocal
+        session_factory = SessionLocal
+
+    summarizer = GPTSummarizer()
+    stats = {"structured": 0, "failed": 0}
+    start = time.time()
+    after_id = 0
+    db = session_factory()
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+            while limit is None or stats["structured"] + stats["failed"] < limit:
+                size = batch_size if limit is None else min(batch_size, limit - stats["structured"] - stats["failed"])
+                ids = crud.get_unstructured_summary_ids(db, limit=size, after_id=after_id)
+                if not ids:
+                    break
+                after_id = ids[-1]
+
+                texts = crud.get_summary_texts(db, ids)
+                dates = crud.get_transcript_dates(db, list({transcript_id for _, transcript_id, _ in texts}))
+                futures = {
+                    summary_id: executor.submit(
+                        summarizer.extract_structure, summary, model=model, meeting_date=dates.get(transcript_id)
+                    )
+                    for summary_id, transcript_id, summary in texts
+                }
+
+                records = db.query(SummaryRecord).options(
+                    load_only(SummaryRecord.id, SummaryRecord.transcript_id, SummaryRecord.structured_at)
+                ).filter(SummaryRecord.id.in_(ids)).order_by(SummaryRecord.id).all()
+                for record in records:
+                    try:
+                        structure = futures[record.id].result()
+                    except Exception as e:
+                        print(f"구조 추출 실패 (Summary ID: {record.id}): {str(e)}")
+                        structure = None
+                    if structure is None:
+                        stats["failed"] += 1
+                        continue
+                    crud.save_summary_structure(db, record, structure)
+                    stats["structured"] += 1
+                db.commit()
+                print(f"  → 구조화 {stats['structured']}건, 실패 {stats['failed']}건 (마지막 Summary ID: {after_id})")
+    finally:
+        db.close()
+
+    stats["elapsed"] = round(time.time() - start, 1)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="구조화된 회의록 (액션 아이템) 백필 및 조회")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("backfill", help="구조화 이전에 만든 요약에서 주제/결정/액션 아이템 추출")
+    run.add_argument("--model", default="gpt-5-mini", help="사용할 GPT 모델 (기본값: gpt-5-mini)")
+    run.add_argument("--concurrency", type=int, default=4, help="GPT 동시 호출 수")
+    run.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help=f"트랜잭션당 요약 수 (기본값: {DEFAULT_BATCH_SIZE})")
+    run.add_argument("--limit", type=int, help="이번 실행에서 처리할 최대 요약 수")
+
+    listing = sub.add_parser("list", help="액션 아이템 조회 (기한순)")
+    listing.add_argument("--team")
+    listing.add_argument("--owner")
+    listing.add_argument("--status", choices=["open", "done", "all"], default="open")
+    listing.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args()
+
+    if args.command == "backfill":
+        stats = backfill(model=args.model, concurrency=args.concurrency, batch_size=args.batch_size, limit=args.limit)
+        print(f"✓ 구조화 {stats['structured']}건, 실패 {stats['failed']}건 ({stats['elapsed']}초)")
+        return
+
+    from database import SessionLocal
+    db = SessionLocal()
+    try:
+        items = crud.get_action_items(
+            db,
+            team=args.team,
+            owner=args.owner,
+            status=None if args.status == "all" else args.status,
+            limit=args.limit
+        )
+        for item in items:
+            due = item.due_date.isoformat() if item.due_date else "기한 없음"
+            assignee = " / ".join(filter(None, [item.team, item.owner])) or "담당 미정"
+            print(f"[{item.status}] {due}  {assignee}  {item.task}  (회의 #{item.transcript_id}, 항목 #{item.id})")
+        print(f"총 {len(items)}건")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
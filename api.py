@@ -1,20 +1,46 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException, Form, Depends
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi import FastAPI, File, UploadFile, HTTPException, Form, Depends, Request, Header, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse, PlainTextResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi.concurrency import run_in_threadpool
 from contextlib import asynccontextmanager
 from enum import Enum
 from sqlalchemy.orm import Session
 import os
 import shutil
-from datetime import datetime
+from datetime import datetime, date
 from stt_module import STTProcessor
-from gpt_summarizer import GPTSummarizer
+from inference_scheduler import InferenceScheduler
+from diarization import SpeakerDiarizer, assign_speakers, format_speaker_transcript
+from segment_store import parse_timestamp
+from audio_cache import AudioCache
+from inference_server import RemoteSTTProcessor, RemoteDiarizer, InferenceBusyError
+from upload_sessions import UploadSessionStore, UploadError, DEFAULT_CHUNK_SIZE
+from live_transcription import LiveTranscriber
+from job_scheduler import JobScheduler, estimate_stt_cost, estimate_gpt_cost, client_id
+from audio_probe import probe_audio, AudioProbeError
+from gpt_summarizer import GPTSummarizer, CHUNK_PROMPT_VERSION
+from transcript_compactor import compact_transcript
+from bulk_resummarize import BulkResummarizer
+from export import stream_export, EXPORT_KINDS
+from response_cache import ResponseCache
+from semantic_search import SemanticSearch, RECORD_TYPES
+import profiling
+from profiling import RequestProfiler, SamplingProfiler, profiled
+import cancellation
+from cancellation import JobRegistry, watch_disconnect
+import functools
 import uuid
 import time
+import asyncio
+import hashlib
+import json
+import threading
 import boto3
+import openai
 
 # 데이터베이스 관련 임포트
-from database import get_db, engine, Base
+from database import get_db, engine, Base, SessionLocal
 from models import TranscriptRecord, SummaryRecord
 import crud
 
@@ -38,7 +64,33 @@ class WhisperModel(str, Enum):
 
 # 전역 변수로 모델 저장
 stt_processor = None
+stt_scheduler = None
+speaker_diarizer = None
 gpt_summarizer = None
+audio_cache = None
+live_transcriber = None
+stt_jobs = None
+gpt_jobs = None
+semantic_search = None
+
+# 재변환 시 요청된 크기의 Whisper 모델을 필요할 때 로드하여 보관
+extra_stt_processors = {}
+extra_stt_lock = threading.Lock()
+
+# 동시 요청의 Whisper 윈도우를 배치로 묶을지 여부
+STT_BATCHING = os.getenv("STT_BATCHING", "false").lower() == "true"
+# STT와 병렬로 화자 분리를 수행할지 여부 (pyannote.audio 필요)
+DIARIZATION_ENABLED = os.getenv("DIARIZATION_ENABLED", "false").lower() == "true"
+# 로컬 임베딩 모델로 회의 의미 검색 인덱스를 유지할지 여부 (sentence-transformers 필요)
+SEMANTIC_SEARCH_ENABLED = os.getenv("SEMANTIC_SEARCH_ENABLED", "false").lower() == "true"
+# 설정 시 모델을 직접 로드하지 않고 로컬 추론 서버(inference_server.py)에 요청
+INFERENCE_SERVER_ADDRESS = os.getenv("INFERENCE_SERVER_ADDRESS")
+
+# 예상 STT 대기 시간이 이 값(초)을 넘으면 새 변환 요청을 429로 거절 (0이면 제한 없음)
+STT_MAX_BACKLOG_SECONDS = float(os.getenv("STT_MAX_BACKLOG_SECONDS", "0"))
+# ETA 예측에 쓰는 모델별 처리 속도 비율(DB 이력)을 다시 계산하는 주기 (초)
+STT_ETA_REFRESH_SECONDS = 300
+stt_speed_ratios = {"ratios": {}, "updated_at": 0.0}
 
 # 업로드 및 출력 디렉토리
 UPLOAD_DIR = "uploads"
@@ -46,6 +98,26 @@ OUTPUT_DIR = "output"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+# 분할 업로드 세션 저장소
+upload_store = UploadSessionStore(os.path.join(UPLOAD_DIR, "sessions"))
+
+# 일괄 재요약 작업 (체크포인트는 output/bulk_jobs, 실행 중인 작업은 백그라운드 스레드)
+bulk_runner = BulkResummarizer(os.path.join(OUTPUT_DIR, "bulk_jobs"))
+bulk_threads = {}
+
+# 레코드 조회 응답 캐시 (직렬화된 본문 + ETag + 압축본, 삭제 시 무효화)
+record_cache = ResponseCache.from_env()
+
+# 취소 가능한 작업 (연결 끊김 감지, DELETE /jobs/{id})
+job_registry = JobRegistry()
+# 클라이언트 연결 끊김을 확인하는 주기 (초)
+JOB_DISCONNECT_POLL_SECONDS = float(os.getenv("JOB_DISCONNECT_POLL_SECONDS", "1"))
+
+# 요청 단위 프로파일링 (PROFILING_ADMIN_TOKEN 설정 시) / 상시 샘플링 프로파일러 (PROFILING_SAMPLER=true)
+request_profiler = RequestProfiler.from_env()
+sampling_profiler = SamplingProfiler.from_env()
+PROFILING_SAMPLER = os.getenv("PROFILING_SAMPLER", "false").lower() == "true"
+
 S3_BUCKET = os.getenv("S3_BUCKET_NAME")
 S3_REGION = os.getenv("S3_REGION")
 S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL")
@@ -87,16 +159,228 @@ def upload_file_to_s3(local_path: str, key: str, content_type: str = "text/plain
 async def lifespan(app: FastAPI):
     """서버 시작/종료 시 실행되는 이벤트"""
     # 시작 시
-    global stt_processor, gpt_summarizer
+    global stt_processor, stt_scheduler, speaker_diarizer, gpt_summarizer, audio_cache, live_transcriber
+    global stt_jobs, gpt_jobs, semantic_search
     print("모델 초기화 중...")
-    stt_processor = STTProcessor()
+    audio_cache = AudioCache.from_env()
+    live_transcriber = LiveTranscriber.from_env()
+    # 짧은 작업 우선 + 사용자별 공정성 (STT와 GPT는 별도 자원이므로 따로 스케줄링)
+    stt_jobs = JobScheduler.from_env("STT", "STT_JOBS", max_concurrent=2, max_heavy=1, heavy_cost=300)
+    gpt_jobs = JobScheduler.from_env("GPT", "GPT_JOBS", max_concurrent=4, max_heavy=2, heavy_cost=60)
+    if INFERENCE_SERVER_ADDRESS:
+        # 모델은 추론 서버 프로세스가 한 벌만 보유 (배치/화자 분리 설정도 서버 쪽에서 적용)
+        stt_processor = RemoteSTTProcessor(INFERENCE_SERVER_ADDRESS)
+        if stt_processor.diarization:
+            speaker_diarizer = RemoteDiarizer(INFERENCE_SERVER_ADDRESS)
+    else:
+        stt_processor = STTProcessor()
+        if STT_BATCHING:
+            stt_scheduler = InferenceScheduler.from_env(stt_processor)
+        if DIARIZATION_ENABLED:
+            speaker_diarizer = SpeakerDiarizer.from_env()
     gpt_summarizer = GPTSummarizer()
+    if SEMANTIC_SEARCH_ENABLED:
+        semantic_search = SemanticSearch.from_env()
+        semantic_search.load()
+    if PROFILING_SAMPLER:
+        sampling_profiler.start()
     print("모델 초기화 완료!")
 
     yield
 
     # 종료 시 (필요한 경우)
     print("서버 종료 중...")
+    if stt_scheduler:
+        stt_scheduler.shutdown()
+    if isinstance(speaker_diarizer, SpeakerDiarizer):
+        speaker_diarizer.shutdown()
+    if semantic_search:
+        semantic_search.shutdown()
+    sampling_profiler.stop()
+
+
+def transcribe_file(audio_file_path: str) -> str:
+    """배치 스케줄러가 켜져 있으면 스케줄러를, 아니면 STTProcessor를 직접 사용"""
+    transcriber = stt_scheduler or stt_processor
+    with profiling.stage("whisper"):
+        return transcriber.transcribe(audio_file_path)
+
+
+def index_for_search(record_type: str, record_id: int, transcript_id: int, text: str):
+    """새 레코드를 의미 검색 인덱스에 추가 (백그라운드, 비활성화 시 무시)"""
+    if semantic_search:
+        semantic_search.submit(record_type, record_id, transcript_id, text)
+
+
+def remove_from_search(record_type: str, *record_ids: int):
+    """삭제된 레코드를 의미 검색 인덱스에서 제거 (백그라운드, 비활성화 시 무시)"""
+    if semantic_search:
+        for record_id in record_ids:
+            semantic_search.remove(record_type, record_id)
+
+
+def get_stt_processor(model_size: str) -> STTProcessor:
+    """요청된 크기의 STTProcessor 반환 (기본 모델이 아니면 처음 요청 시 로드)"""
+    if model_size == stt_processor.model_size:
+        return stt_processor
+    if isinstance(stt_processor, RemoteSTTProcessor):
+        return stt_processor.for_model(model_size)
+    with extra_stt_lock:
+        if model_size not in extra_stt_processors:
+            extra_stt_processors[model_size] = STTProcessor(model_size)
+        return extra_stt_processors[model_size]
+
+
+def save_upload(file: UploadFile, path: str) -> str:
+    """업로드 파일을 저장하면서 내용의 SHA-256을 계산하여 반환"""
+    digest = hashlib.sha256()
+    with open(path, "wb") as buffer:
+        for chunk in iter(lambda: file.file.read(1024 * 1024), b""):
+            digest.update(chunk)
+            buffer.write(chunk)
+    return digest.hexdigest()
+
+
+def get_client_id(request: Request) -> str:
+    """요청한 사용자 식별 (X-API-Key 헤더, 없으면 클라이언트 IP)"""
+    host = request.client.host if request.client else None
+    return client_id(request.headers.get("x-api-key"), host)
+
+
+def default_model_size() -> str:
+    """업로드 변환에 실제로 쓰이는 Whisper 모델 (요청의 whisper_model 값과 무관)"""
+    return (stt_scheduler or stt_processor).model_size
+
+
+def estimate_eta(db: Session, whisper_model: str, audio_duration: float = None, file_size: int = None) -> dict:
+    """
+    과거 처리 이력(stt_processing_time / audio_duration)으로 예상 대기/처리 시간 계산
+
+    whisper_model은 실제로 실행할 모델이어야 합니다 (레코드의 whisper_model도 실제 실행한 모델로 저장).
+
+    Returns:
+        dict: {"queue_seconds", "processing_seconds", "eta_seconds", "speed_ratio"}
+    """
+    if time.time() - stt_speed_ratios["updated_at"] > STT_ETA_REFRESH_SECONDS:
+        stt_speed_ratios["ratios"] = crud.get_stt_speed_ratios(db)
+        stt_speed_ratios["updated_at"] = time.time()
+    ratios = stt_speed_ratios["ratios"]
+    ratio = ratios.get(whisper_model) or ratios.get("*")
+
+    processing = estimate_stt_cost(audio_duration, file_size, ratio=ratio)
+    queue = stt_jobs.backlog_seconds() / stt_jobs.max_concurrent
+    return {
+        "queue_seconds": round(queue, 1),
+        "processing_seconds": round(processing, 1),
+        "eta_seconds": round(queue + processing, 1),
+        "speed_ratio": ratio
+    }
+
+
+def check_admission():
+    """STT 대기열이 STT_MAX_BACKLOG_SECONDS를 넘으면 429 + Retry-After로 거절"""
+    if STT_MAX_BACKLOG_SECONDS <= 0:
+        return
+    queue = stt_jobs.backlog_seconds() / stt_jobs.max_concurrent
+    if queue > STT_MAX_BACKLOG_SECONDS:
+        retry_after = max(1, int(queue - STT_MAX_BACKLOG_SECONDS))
+        print(f"STT 대기열 초과로 요청 거절 (예상 대기 {queue:.0f}초)")
+        raise HTTPException(
+            status_code=429,
+            detail="음성 변환 요청이 많아 지금은 처리할 수 없습니다. 잠시 후 다시 시도해주세요.",
+            headers={"Retry-After": str(retry_after)}
+        )
+
+
+def cancellable(kind: str):
+    """
+    엔드포인트를 취소 가능한 작업으로 실행 (request: Request 인자 필요)
+
+    - 클라이언트가 X-Job-Id 헤더로 작업 ID를 정할 수 있고, 없으면 생성하여 응답의 X-Job-Id로 알려줌
+    - 클라이언트 연결이 끊기거나 DELETE /jobs/{id}로 취소되면 요청 태스크를 취소
+      → 대기/실행 중인 스케줄러 슬롯을 바로 다음 작업에 넘기고, finally 블록에서 임시 파일 정리
+    - Whisper 윈도우 사이, OpenAI 스트림, 재시도 대기 등 스레드 쪽 작업은 취소 토큰으로 중단
+    - 취소된 요청에는 409로 응답 (연결이 끊긴 경우에는 아무도 받지 않음)
+    """
+    def decorator(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            request = kwargs["request"]
+            try:
+                job = job_registry.register(kind, get_client_id(request), request.headers.get("x-job-id"))
+            except ValueError as e:
+                raise HTTPException(status_code=409, detail=str(e))
+
+            task = asyncio.current_task()
+            loop = asyncio.get_running_loop()
+            finished = False
+
+            def cancel_task():
+                # 응답을 이미 만든 뒤라면 취소하지 않음 (전송 중인 응답을 끊지 않도록)
+                if not finished:
+                    task.cancel()
+
+            remove_callback = job.token.add_callback(lambda: loop.call_soon_threadsafe(cancel_task))
+            context_token = cancellation.activate(job.token)
+            watcher = asyncio.create_task(watch_disconnect(request, job, job_registry, JOB_DISCONNECT_POLL_SECONDS))
+            try:
+                response = await endpoint(*args, **kwargs)
+            except (asyncio.CancelledError, Exception) as e:
+                if not job.token.cancelled:
+                    raise
+                if isinstance(e, asyncio.CancelledError):
+                    task.uncancel()
+                print(f"작업 취소됨: {job.id} ({job.kind}, {job.token.reason})")
+                raise HTTPException(
+                    status_code=409,
+                    detail=f"작업이 취소되었습니다 ({job.token.reason})",
+                    headers={"X-Job-Id": job.id}
+                )
+            finally:
+                finished = True
+                remove_callback()
+                watcher.cancel()
+                cancellation.reset(context_token)
+                job_registry.unregister(job)
+
+            if isinstance(response, Response):
+                response.headers["X-Job-Id"] = job.id
+            return response
+        return wrapper
+    return decorator
+
+
+def probe_upload(path: str, fallback_duration: float = None) -> dict:
+    """업로드 파일의 헤더에서 길이/코덱 확인 (헤더에 길이가 없으면 클라이언트 값 사용)"""
+    try:
+        info = probe_audio(path)
+    except AudioProbeError as e:
+        raise HTTPException(status_code=400, detail=f"음성 파일을 읽을 수 없습니다: {str(e)}")
+    if not info["duration"]:
+        info["duration"] = fallback_duration
+    return info
+
+
+async def transcribe_with_segments(audio, transcriber=None):
+    """
+    STT 세그먼트를 구하고, 화자 분리가 켜져 있으면 병렬로 실행하여 화자 라벨을 붙임
+
+    Args:
+        audio: 음성 파일 경로 또는 디코딩된 PCM 배열
+        transcriber: 사용할 STT 처리기 (기본값: 배치 스케줄러 또는 기본 STTProcessor)
+
+    Returns:
+        tuple: (변환된 텍스트, 세그먼트 목록)
+    """
+    transcriber = transcriber or stt_scheduler or stt_processor
+    if not speaker_diarizer:
+        return await run_in_threadpool(profiled("whisper", transcriber.transcribe_segments), audio)
+
+    (transcript, segments), turns = await asyncio.gather(
+        run_in_threadpool(profiled("whisper", transcriber.transcribe_segments), audio),
+        run_in_threadpool(profiled("diarization", speaker_diarizer.diarize), audio),
+    )
+    return transcript, assign_speakers(segments, turns)
 
 
 app = FastAPI(
@@ -116,6 +400,36 @@ app.add_middleware(
 )
 
 
+async def profile_request(request: Request, call_next):
+    """X-Profile 헤더(또는 ?profile=1)와 관리자 토큰이 있는 요청만 프로파일링"""
+    wants_profile = request.headers.get("x-profile") or request.query_params.get("profile")
+    if not wants_profile or not request_profiler.is_authorized(request.headers.get("x-admin-token")):
+        return await call_next(request)
+
+    profile = await run_in_threadpool(request_profiler.begin, request.method, request.url.path)
+    if profile is None:
+        response = await call_next(request)
+        response.headers["X-Profile-Status"] = "busy"
+        return response
+
+    token = profiling.activate(profile)
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+    finally:
+        profiling.reset(token)
+        result = await run_in_threadpool(request_profiler.end, profile, status_code)
+    print(f"프로파일 저장: {result['id']} ({request.method} {request.url.path}, {result['seconds']:.2f}초)")
+    response.headers["X-Profile-Id"] = result["id"]
+    return response
+
+
+# 프로파일링이 꺼져 있으면 미들웨어를 등록하지 않음 (일반 요청 경로에 오버헤드 없음)
+if request_profiler.enabled:
+    app.add_middleware(BaseHTTPMiddleware, dispatch=profile_request)
+
+
 @app.get("/")
 async def root():
     """API 상태 확인"""
@@ -132,45 +446,147 @@ async def root():
 @app.get("/health")
 async def health_check():
     """서버 상태 확인"""
-    return {
+    response_data = {
         "status": "healthy",
         "models_loaded": {
             "stt": stt_processor is not None,
             "gpt": gpt_summarizer is not None
+        },
+        "stt_batching": stt_scheduler is not None,
+        "stt_max_backlog_seconds": STT_MAX_BACKLOG_SECONDS or None,
+        "live": live_transcriber.status() if live_transcriber else None,
+        "jobs": {
+            "stt": stt_jobs.status() if stt_jobs else None,
+            "gpt": gpt_jobs.status() if gpt_jobs else None,
+            "cancellable": job_registry.status()
+        },
+        "response_cache": record_cache.status(),
+        "semantic_search": semantic_search.status() if semantic_search else None,
+        "profiling": {
+            "request_profiles": request_profiler.enabled,
+            "sampler": sampling_profiler.status() if sampling_profiler.running else None
         }
     }
 
+    if isinstance(stt_processor, RemoteSTTProcessor):
+        try:
+            response_data["inference_server"] = await run_in_threadpool(stt_processor.health)
+        except Exception as e:
+            response_data["status"] = "degraded"
+            response_data["inference_server"] = {"status": "unreachable", "error": str(e)}
+
+    return response_data
+
+
+ALLOWED_EXTENSIONS = ['.mp3', '.wav', '.m4a', '.ogg', '.flac', '.aac']
+
+
+def check_audio_extension(filename: str) -> str:
+    """파일 확장자를 확인하고 반환 (지원하지 않으면 400)"""
+    file_ext = os.path.splitext(filename)[1].lower()
+    if file_ext not in ALLOWED_EXTENSIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"지원하지 않는 파일 형식입니다. 허용된 형식: {', '.join(ALLOWED_EXTENSIONS)}"
+        )
+    return file_ext
+
+
+async def transcribe_and_store(
+    db: Session,
+    temp_file_path: str,
+    audio_hash: str,
+    filename: str,
+    file_size: int,
+    audio_duration: float,
+    timestamp: str,
+    client: str,
+    eta: dict = None
+) -> dict:
+    """
+    저장된 음성 파일을 STT 변환하고 TranscriptRecord를 생성 (/transcribe-only, 분할 업로드 완료 공용)
+    레코드의 whisper_model은 요청 값이 아니라 실제로 실행한 모델 (처리 시간 예측 이력이 섞이지 않도록)
+
+    Returns:
+        dict: JSON 응답 데이터
+    """
+    # 예상 처리 시간 기준으로 차례를 기다림 (대기 시간은 stt_time에서 제외)
+    cost = eta["processing_seconds"] if eta else estimate_stt_cost(audio_duration, file_size)
+    async with stt_jobs.slot(client, cost) as queue_wait:
+        # STT (음성 -> 텍스트) - 시간 측정
+        print("음성을 텍스트로 변환 중...")
+        start_time = time.time()
+        # 디코딩 결과를 캐시에 저장하여 재변환 시 재사용
+        audio = await run_in_threadpool(profiled("decode", audio_cache.put), temp_file_path, audio_hash)
+        if not audio_duration:
+            audio_duration = len(audio) / 16000
+        transcript, segments = await transcribe_with_segments(audio)
+        stt_time = time.time() - start_time
+    print(f"변환 완료 (길이: {len(transcript)}자, 소요 시간: {stt_time:.2f}초)")
+    # 변환 도중 취소되었으면 아무도 읽지 않을 레코드를 만들지 않음
+    cancellation.check()
+
+    # DB에 저장 (TranscriptRecord 생성)
+    transcript_record = crud.create_transcript_record(
+        db=db,
+        filename=filename,
+        file_size=file_size,
+        transcript=transcript,
+        whisper_model=default_model_size(),
+        audio_duration=audio_duration,
+        stt_processing_time=stt_time,
+        segments=segments,
+        audio_hash=audio_hash
+    )
+    print(f"DB 저장 완료 (Transcript ID: {transcript_record.id})")
+    index_for_search("transcript", transcript_record.id, transcript_record.id, transcript)
+
+    response_data = {
+        "success": True,
+        "transcript_id": transcript_record.id,
+        "filename": filename,
+        "transcript": transcript,
+        "timestamp": timestamp,
+        "queue_wait": queue_wait,
+        "eta": eta
+    }
+    if speaker_diarizer:
+        response_data["speaker_transcript"] = format_speaker_transcript(segments)
+    return response_data
+
 
 @app.post("/transcribe-only")
+@cancellable("stt")
 async def transcribe_only(
+    request: Request,
     file: UploadFile = File(..., description="음성 파일 (mp3, wav, m4a 등)"),
-    whisper_model: WhisperModel = Form(WhisperModel.BASE, description="Whisper API는 단일 모델 사용 (값은 기록용)"),
-    audio_duration: float = Form(None, description="오디오 길이 (초)"),
-    file_size: int = Form(..., description="파일 크기 (bytes)"),
+    whisper_model: WhisperModel = Form(WhisperModel.BASE, description="사용하지 않음 (서버 기본 모델로 변환하며 레코드에도 실제 모델을 기록)"),
+    audio_duration: float = Form(None, description="오디오 길이 (초, 파일 헤더에 길이가 없을 때만 사용)"),
+    file_size: int = Form(None, description="파일 크기 (bytes, 서버에서 다시 측정)"),
     db: Session = Depends(get_db)
 ):
     """
     음성 파일을 텍스트로만 변환 (STT만 수행) 및 DB 저장
 
+    길이/코덱은 서버가 파일 헤더에서 직접 확인하며, 예상 대기 시간이
+    STT_MAX_BACKLOG_SECONDS를 넘으면 429 + Retry-After로 거절합니다.
+    (multipart 본문은 이 함수가 호출되기 전에 이미 수신되므로, 업로드 전에 거절받으려면
+    GET /estimate로 확인하거나 분할 업로드를 사용하세요)
+
     Args:
         file: 음성 파일
-        whisper_model: Whisper 모델 선택 (참고용, 서버 재시작 필요)
+        whisper_model: 사용하지 않음 (다른 모델은 POST /transcripts/{id}/retranscribe)
         audio_duration: 오디오 길이 (초)
         file_size: 파일 크기 (bytes)
         db: 데이터베이스 세션
 
     Returns:
-        JSON 응답 (transcript 및 record_id 포함)
+        JSON 응답 (transcript, record_id, eta, audio_info 포함)
     """
     # 파일 확장자 확인
-    allowed_extensions = ['.mp3', '.wav', '.m4a', '.ogg', '.flac', '.aac']
-    file_ext = os.path.splitext(file.filename)[1].lower()
-
-    if file_ext not in allowed_extensions:
-        raise HTTPException(
-            status_code=400,
-            detail=f"지원하지 않는 파일 형식입니다. 허용된 형식: {', '.join(allowed_extensions)}"
-        )
+    file_ext = check_audio_extension(file.filename)
+    # 본문은 이미 받았지만 디스크 저장/디코딩/변환 전에 대기열부터 확인
+    check_admission()
 
     # 고유한 파일명 생성
     unique_id = str(uuid.uuid4())[:8]
@@ -179,56 +595,410 @@ async def transcribe_only(
     temp_file_path = os.path.join(UPLOAD_DIR, temp_filename)
 
     try:
-        # 업로드된 파일 저장
-        with open(temp_file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        # 업로드된 파일 저장 (내용 해시 계산)
+        audio_hash = await run_in_threadpool(save_upload, file, temp_file_path)
 
         print(f"파일 업로드 완료: {temp_file_path}")
 
-        # STT (음성 -> 텍스트) - 시간 측정
-        print("음성을 텍스트로 변환 중...")
-        start_time = time.time()
-        transcript = stt_processor.transcribe(temp_file_path)
-        stt_time = time.time() - start_time
-        print(f"변환 완료 (길이: {len(transcript)}자, 소요 시간: {stt_time:.2f}초)")
+        # 클라이언트 값 대신 실제 파일 크기와 헤더의 길이 사용
+        file_size = os.path.getsize(temp_file_path)
+        audio_info = await run_in_threadpool(probe_upload, temp_file_path, audio_duration)
+        eta = estimate_eta(db, default_model_size(), audio_info["duration"], file_size)
+        print(f"예상 처리 시간: {eta['eta_seconds']:.0f}초 (길이: {audio_info['duration']}초, 코덱: {audio_info['codec']})")
 
-        # DB에 저장 (TranscriptRecord 생성)
-        transcript_record = crud.create_transcript_record(
-            db=db,
-            filename=file.filename,
+        response_data = await transcribe_and_store(
+            db, temp_file_path, audio_hash, file.filename, file_size,
+            audio_info["duration"], timestamp, get_client_id(request), eta
+        )
+        response_data["audio_info"] = audio_info
+        return JSONResponse(content=response_data)
+
+    except HTTPException:
+        raise
+
+    except InferenceBusyError as e:
+        print(f"추론 서버 혼잡: {str(e)}")
+        raise HTTPException(
+            status_code=503,
+            detail="음성 변환 대기열이 가득 찼습니다. 잠시 후 다시 시도해주세요.",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
+    except Exception as e:
+        print(f"오류 발생: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"처리 중 오류 발생: {str(e)}")
+
+    finally:
+        # 업로드된 임시 파일 삭제
+        if os.path.exists(temp_file_path):
+            os.remove(temp_file_path)
+            print(f"임시 파일 삭제: {temp_file_path}")
+
+
+@app.get("/estimate")
+async def estimate_processing_time(
+    audio_duration: float = None,
+    file_size: int = None,
+    whisper_model: WhisperModel = None,
+    db: Session = Depends(get_db)
+):
+    """
+    업로드 전에 예상 대기/처리 시간과 접수 가능 여부 확인
+
+    Args:
+        audio_duration: 오디오 길이 (초)
+        file_size: 파일 크기 (bytes, audio_duration이 없을 때 길이 추정에 사용)
+        whisper_model: 재변환에 사용할 Whisper 모델 (없으면 업로드 변환에 쓰이는 서버 기본 모델)
+    """
+    model = whisper_model.value if whisper_model else default_model_size()
+    eta = estimate_eta(db, model, audio_duration, file_size)
+    accepting = STT_MAX_BACKLOG_SECONDS <= 0 or eta["queue_seconds"] <= STT_MAX_BACKLOG_SECONDS
+    return {"success": True, "accepting": accepting, **eta}
+
+
+# ============================================
+# 재개 가능한 분할 업로드
+# ============================================
+
+@app.post("/uploads")
+async def create_upload(
+    filename: str = Form(..., description="원본 파일명"),
+    file_size: int = Form(..., description="파일 크기 (bytes)"),
+    chunk_size: int = Form(DEFAULT_CHUNK_SIZE, description="청크 크기 (bytes, 최대 16MB)"),
+    sha256: str = Form(None, description="전체 파일 SHA-256 (선택, 완료 시 검증)"),
+    whisper_model: WhisperModel = Form(WhisperModel.BASE, description="사용하지 않음 (서버 기본 모델로 변환)"),
+    audio_duration: float = Form(None, description="오디오 길이 (초)"),
+    db: Session = Depends(get_db)
+):
+    """분할 업로드 세션 생성 (대기열이 가득 차 있으면 업로드 전에 429로 거절)"""
+    check_audio_extension(filename)
+    check_admission()
+    try:
+        session = upload_store.create(
+            filename=filename,
             file_size=file_size,
+            chunk_size=chunk_size,
+            sha256=sha256,
+            metadata={"audio_duration": audio_duration}
+        )
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+    print(f"분할 업로드 세션 생성: {session['upload_id']} ({filename}, {session['total_chunks']}개 청크)")
+    return {
+        "success": True,
+        "upload_id": session["upload_id"],
+        "chunk_size": session["chunk_size"],
+        "total_chunks": session["total_chunks"],
+        "eta": estimate_eta(db, default_model_size(), audio_duration, file_size)
+    }
+
+
+@app.put("/uploads/{upload_id}/chunks/{index}")
+async def upload_chunk(
+    upload_id: str,
+    index: int,
+    request: Request,
+    x_chunk_sha256: str = Header(None, description="청크 SHA-256 (선택, 무결성 검증)")
+):
+    """청크 업로드 (본문: 청크 바이트, 병렬 전송 가능)"""
+    try:
+        session = upload_store.get(upload_id)
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+    # 본문 전체를 먼저 메모리에 올리지 않고 청크 크기를 넘는 순간 거절
+    data = bytearray()
+    async for piece in request.stream():
+        data.extend(piece)
+        if len(data) > session["chunk_size"]:
+            raise HTTPException(status_code=413, detail=f"청크가 세션의 청크 크기({session['chunk_size']} bytes)보다 큽니다")
+    try:
+        result = await run_in_threadpool(upload_store.write_chunk, upload_id, index, data, x_chunk_sha256)
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    return {"success": True, **result}
+
+
+@app.get("/uploads/{upload_id}")
+async def get_upload_status(upload_id: str):
+    """수신된 바이트 구간과 빠진 청크 조회 (업로드 재개용)"""
+    try:
+        return {"success": True, **upload_store.status(upload_id)}
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+
+@app.post("/uploads/{upload_id}/complete")
+@cancellable("stt")
+async def complete_upload(upload_id: str, request: Request, db: Session = Depends(get_db)):
+    """
+    분할 업로드 완료: 전체 파일 무결성 검증 후 STT 변환 및 DB 저장
+    (응답 형식은 /transcribe-only와 동일, 대기열이 가득 차면 세션을 유지한 채 429로 거절)
+    """
+    try:
+        session = upload_store.get(upload_id)
+        check_admission()
+        # 동시에 들어온 완료 요청 중 하나만 진행 (나머지는 409)
+        upload_store.claim(upload_id)
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+    file_ext = os.path.splitext(session["filename"])[1].lower()
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    temp_file_path = os.path.join(UPLOAD_DIR, f"{timestamp}_{upload_id[:8]}{file_ext}")
+    try:
+        audio_hash = await run_in_threadpool(upload_store.finalize, upload_id)
+        os.replace(upload_store.data_path(upload_id), temp_file_path)
+    except BaseException as e:
+        # 검증 실패/취소 시 세션을 유지하여 빠진 청크를 보낸 뒤 다시 완료 요청 가능
+        upload_store.release(upload_id)
+        if isinstance(e, UploadError):
+            raise HTTPException(status_code=e.status_code, detail=str(e))
+        raise
+    upload_store.delete(upload_id)
+    print(f"분할 업로드 완료: {temp_file_path}")
+
+    try:
+        audio_info = await run_in_threadpool(probe_upload, temp_file_path, session["metadata"].get("audio_duration"))
+        eta = estimate_eta(db, default_model_size(), audio_info["duration"], session["file_size"])
+
+        response_data = await transcribe_and_store(
+            db, temp_file_path, audio_hash, session["filename"], session["file_size"],
+            audio_info["duration"], timestamp, get_client_id(request), eta
+        )
+        response_data["audio_info"] = audio_info
+        return JSONResponse(content=response_data)
+
+    except HTTPException:
+        raise
+
+    except InferenceBusyError as e:
+        print(f"추론 서버 혼잡: {str(e)}")
+        raise HTTPException(
+            status_code=503,
+            detail="음성 변환 대기열이 가득 찼습니다. 잠시 후 다시 시도해주세요.",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
+    except Exception as e:
+        print(f"오류 발생: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"처리 중 오류 발생: {str(e)}")
+
+    finally:
+        if os.path.exists(temp_file_path):
+            os.remove(temp_file_path)
+            print(f"임시 파일 삭제: {temp_file_path}")
+
+
+# ============================================
+# 실시간 회의 변환 (WebSocket)
+# ============================================
+
+@app.websocket("/ws/live/{room_id}")
+async def live_transcription(
+    websocket: WebSocket,
+    room_id: str,
+    audio_format: str = "pcm16",
+    filename: str = None
+):
+    """
+    실시간 회의 변환
+
+    - 클라이언트 → 서버: 바이너리 프레임(오디오), 텍스트 프레임 {"type": "stop"} (회의 종료)
+    - 서버 → 클라이언트:
+        {"type": "provisional", "segments": [...]}  아직 바뀔 수 있는 결과
+        {"type": "final", "segments": [...]}        확정된 세그먼트
+        {"type": "done", "transcript_id": ...}      회의 종료 후 DB 저장 완료
+
+    Args:
+        room_id: 회의실 ID (동시에 하나의 연결만 허용)
+        audio_format: "pcm16" (16kHz mono s16le) 또는 "opus" (MediaRecorder webm/ogg)
+        filename: 저장할 레코드의 파일명 (기본값: live_<room_id>_<시각>)
+    """
+    await websocket.accept()
+    try:
+        session = live_transcriber.open(room_id, audio_format)
+    except (ValueError, RuntimeError) as e:
+        await websocket.send_json({"type": "error", "detail": str(e)})
+        await websocket.close(code=1013)
+        return
+
+    print(f"실시간 변환 시작 (회의실: {room_id}, 형식: {audio_format})")
+    transcriber = stt_scheduler or stt_processor
+    connected = True
+    inference_task = None
+
+    async def send(message: dict):
+        nonlocal connected
+        if not connected:
+            return
+        try:
+            await websocket.send_json(message)
+        except Exception:
+            connected = False
+
+    async def infer(final: bool = False):
+        try:
+            new_final, provisional = await live_transcriber.run_pass(session, transcriber, final=final)
+        except Exception as e:
+            print(f"실시간 변환 오류 (회의실: {room_id}): {str(e)}")
+            await send({"type": "error", "detail": str(e)})
+            return
+        if new_final:
+            await send({"type": "final", "segments": new_final})
+        await send({"type": "provisional", "segments": provisional})
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                connected = False
+                break
+            if message.get("bytes"):
+                session.add_audio(message["bytes"])
+                # 이전 실행이 끝났을 때만 새로 실행 (밀린 오디오는 다음 실행에 합쳐짐)
+                if session.ready() and (inference_task is None or inference_task.done()):
+                    inference_task = asyncio.create_task(infer())
+            elif message.get("text"):
+                try:
+                    command = json.loads(message["text"])
+                except ValueError:
+                    continue
+                if command.get("type") == "stop":
+                    break
+    except WebSocketDisconnect:
+        connected = False
+
+    db = SessionLocal()
+    try:
+        # 남은 오디오를 모두 확정하고 바로 TranscriptRecord 저장
+        if inference_task:
+            await inference_task
+        # ffmpeg 입력을 닫고 버퍼에 남은 마지막 오디오까지 받은 뒤 마지막 변환
+        await run_in_threadpool(session.finish_input)
+        await infer(final=True)
+
+        if session.finalized:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            record = crud.create_transcript_record(
+                db=db,
+                filename=filename or f"live_{room_id}_{timestamp}",
+                file_size=session.bytes_received,
+                transcript=session.transcript(),
+                whisper_model=transcriber.model_size,
+                audio_duration=session.duration,
+                stt_processing_time=session.processing_time,
+                segments=session.finalized
+            )
+            print(f"실시간 변환 저장 완료 (회의실: {room_id}, Transcript ID: {record.id})")
+            index_for_search("transcript", record.id, record.id, record.transcript)
+            await send({
+                "type": "done",
+                "transcript_id": record.id,
+                "transcript": record.transcript,
+                "audio_duration": session.duration,
+                "dropped_seconds": session.dropped_seconds
+            })
+        else:
+            await send({"type": "done", "transcript_id": None})
+    finally:
+        db.close()
+        live_transcriber.close(room_id)
+        if connected:
+            await websocket.close()
+
+
+@app.post("/transcripts/{transcript_id}/retranscribe")
+@cancellable("stt")
+async def retranscribe(
+    transcript_id: int,
+    request: Request,
+    whisper_model: WhisperModel = Form(..., description="다시 변환할 Whisper 모델"),
+    db: Session = Depends(get_db)
+):
+    """
+    디코딩 캐시에 남아 있는 오디오를 다른 Whisper 모델로 다시 변환하여 새 TranscriptRecord 생성
+    (재업로드 및 재디코딩 불필요)
+
+    Args:
+        transcript_id: 원본 Transcript 레코드 ID
+        whisper_model: 사용할 Whisper 모델
+        db: 데이터베이스 세션
+    """
+    source = crud.get_transcript_record(db, transcript_id)
+    if not source:
+        raise HTTPException(status_code=404, detail="Transcript 레코드를 찾을 수 없습니다")
+
+    audio = audio_cache.get(source.audio_hash) if source.audio_hash else None
+    if audio is None:
+        raise HTTPException(
+            status_code=410,
+            detail="디코딩된 오디오가 캐시에 없습니다. 음성 파일을 다시 업로드해주세요."
+        )
+    check_admission()
+
+    try:
+        processor = await run_in_threadpool(get_stt_processor, whisper_model.value)
+
+        eta = estimate_eta(db, whisper_model.value, source.audio_duration, source.file_size)
+        async with stt_jobs.slot(get_client_id(request), eta["processing_seconds"]):
+            print(f"재변환 중 (Transcript ID: {transcript_id}, Whisper {whisper_model.value})...")
+            start_time = time.time()
+            # 기본 모델이면 배치 스케줄러를 그대로 사용
+            transcriber = stt_scheduler if processor is stt_processor and stt_scheduler else processor
+            transcript, segments = await transcribe_with_segments(audio, transcriber=transcriber)
+            stt_time = time.time() - start_time
+        print(f"재변환 완료 (길이: {len(transcript)}자, 소요 시간: {stt_time:.2f}초)")
+        cancellation.check()
+
+        record = crud.create_transcript_record(
+            db=db,
+            filename=source.filename,
+            file_size=source.file_size,
             transcript=transcript,
             whisper_model=whisper_model.value,
-            audio_duration=audio_duration,
-            stt_processing_time=stt_time
+            audio_duration=source.audio_duration,
+            stt_processing_time=stt_time,
+            segments=segments,
+            audio_hash=source.audio_hash
         )
-        print(f"DB 저장 완료 (Transcript ID: {transcript_record.id})")
+        print(f"DB 저장 완료 (Transcript ID: {record.id})")
+        index_for_search("transcript", record.id, record.id, transcript)
 
         return JSONResponse(content={
             "success": True,
-            "transcript_id": transcript_record.id,
-            "filename": file.filename,
+            "transcript_id": record.id,
+            "source_transcript_id": transcript_id,
+            "whisper_model": whisper_model.value,
             "transcript": transcript,
-            "timestamp": timestamp
+            "stt_processing_time": stt_time,
+            "eta": eta
         })
 
+    except InferenceBusyError as e:
+        raise HTTPException(
+            status_code=503,
+            detail="음성 변환 대기열이 가득 찼습니다. 잠시 후 다시 시도해주세요.",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
     except Exception as e:
         print(f"오류 발생: {str(e)}")
         raise HTTPException(status_code=500, detail=f"처리 중 오류 발생: {str(e)}")
 
-    finally:
-        # 업로드된 임시 파일 삭제
-        if os.path.exists(temp_file_path):
-            os.remove(temp_file_path)
-            print(f"임시 파일 삭제: {temp_file_path}")
-
 
 @app.post("/summarize")
+@cancellable("gpt")
 async def summarize_transcript(
+    request: Request,
     transcript_id: int = Form(..., description="Transcript 레코드 ID"),
     gpt_model: GPTModel = Form(GPTModel.GPT_5_MINI, description="사용할 GPT 모델 선택"),
     save_files: bool = Form(True, description="결과 파일을 서버에 저장할지 여부"),
     return_file: bool = Form(False, description="회의록을 텍스트 파일로 다운로드 (true 시 파일 응답, false 시 JSON 응답)"),
+    incremental: bool = Form(False, description="청크별 중간 요약을 재사용하여 바뀐 부분만 다시 요약"),
+    compact: bool = Form(True, description="GPT 전달 전 추임새/반복 제거로 토큰 절감"),
+    structured: bool = Form(True, description="회의록과 함께 주제/결정/액션 아이템을 구조화하여 저장"),
     db: Session = Depends(get_db)
 ):
     """
@@ -239,6 +1009,9 @@ async def summarize_transcript(
         gpt_model: GPT 모델 선택 (기본값: gpt-5-mini)
         save_files: 결과를 파일로 저장할지 여부 (기본값: True)
         return_file: True이면 회의록 텍스트 파일로 응답, False이면 JSON으로 응답 (기본값: False)
+        incremental: True이면 청크 캐시를 사용하는 증분 요약 (기본값: False)
+        compact: True이면 추임새/반복 n-gram/환각 문장을 제거한 텍스트를 GPT에 전달 (기본값: True)
+        structured: True이면 주제/결정 사항/액션 아이템을 함께 받아 조회 가능한 행으로 저장 (기본값: True)
         db: 데이터베이스 세션
 
     Returns:
@@ -250,16 +1023,54 @@ async def summarize_transcript(
         raise HTTPException(status_code=404, detail="Transcript 레코드를 찾을 수 없습니다")
 
     transcript = transcript_record.transcript
+    # "다음 주 금요일" 같은 상대적인 기한은 회의 날짜 기준으로 변환
+    meeting_date = transcript_record.created_at.date() if transcript_record.created_at else None
     unique_id = str(uuid.uuid4())[:8]
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 
+    # 화자 분리 결과가 있으면 "[화자 N] ..." 형태로 GPT에 전달
+    segments = crud.get_transcript_segments(db, transcript_id)
+    speaker_labeled = bool(segments) and any(seg.get("speaker") for seg in segments)
+    gpt_input = format_speaker_transcript(segments) if speaker_labeled else transcript
+
     try:
-        # GPT 요약 - 시간 측정
-        print(f"GPT ({gpt_model.value})로 회의록 작성 중...")
-        start_time = time.time()
-        summary = gpt_summarizer.summarize(transcript, model=gpt_model.value)
-        gpt_time = time.time() - start_time
+        compaction_stats = None
+        if compact:
+            gpt_input, compaction_stats = await run_in_threadpool(profiled("compact", compact_transcript), gpt_input)
+            print(f"텍스트 압축: 약 {compaction_stats['tokens_saved']}토큰 절감 ({compaction_stats['saved_ratio'] * 100:.1f}%)")
+
+        async with gpt_jobs.slot(get_client_id(request), estimate_gpt_cost(gpt_input)):
+            # GPT 요약 - 시간 측정
+            print(f"GPT ({gpt_model.value})로 회의록 작성 중...")
+            start_time = time.time()
+            incremental_stats = None
+            structure = None
+            if incremental:
+                summary, incremental_stats = await run_in_threadpool(
+                    profiled("gpt", gpt_summarizer.summarize_incremental),
+                    gpt_input,
+                    model=gpt_model.value,
+                    speaker_labeled=speaker_labeled,
+                    cache=crud.ChunkSummaryCache(db, CHUNK_PROMPT_VERSION),
+                    structured=structured,
+                    meeting_date=meeting_date
+                )
+                structure = incremental_stats.pop("structure", None)
+            elif structured:
+                summary, structure = await run_in_threadpool(
+                    profiled("gpt", gpt_summarizer.summarize_structured),
+                    gpt_input,
+                    model=gpt_model.value,
+                    speaker_labeled=speaker_labeled,
+                    meeting_date=meeting_date
+                )
+            else:
+                summary = await run_in_threadpool(
+                    profiled("gpt", gpt_summarizer.summarize), gpt_input, model=gpt_model.value, speaker_labeled=speaker_labeled
+                )
+            gpt_time = time.time() - start_time
         print(f"회의록 작성 완료! (소요 시간: {gpt_time:.2f}초)")
+        cancellation.check()
 
         # DB에 새 SummaryRecord 생성 (업데이트가 아닌 생성)
         summary_record = crud.create_summary_record(
@@ -267,9 +1078,11 @@ async def summarize_transcript(
             transcript_id=transcript_id,
             summary=summary,
             gpt_model=gpt_model.value,
-            gpt_processing_time=gpt_time
+            gpt_processing_time=gpt_time,
+            structure=structure
         )
         print(f"DB 저장 완료 (Summary ID: {summary_record.id}, Transcript ID: {transcript_id})")
+        index_for_search("summary", summary_record.id, transcript_id, summary)
 
         # 파일 저장 또는 응답 준비
         summary_path = os.path.join(OUTPUT_DIR, f"meeting_minutes_{timestamp}_{unique_id}.txt")
@@ -321,6 +1134,15 @@ async def summarize_transcript(
             "timestamp": timestamp
         }
 
+        if structure:
+            response_data["structure"] = structure
+
+        if incremental_stats:
+            response_data["incremental"] = incremental_stats
+
+        if compaction_stats:
+            response_data["compaction"] = compaction_stats
+
         if save_files:
             response_data["saved_files"] = {
                 "transcript": transcript_path,
@@ -331,13 +1153,153 @@ async def summarize_transcript(
 
         return JSONResponse(content=response_data)
 
+    except openai.RateLimitError as e:
+        # 재시도 후에도 한도 초과면 클라이언트가 다시 시도할 수 있도록 429로 응답
+        print(f"OpenAI 요청 한도 초과: {str(e)}")
+        retry_after = e.response.headers.get("retry-after", "30")
+        raise HTTPException(
+            status_code=429,
+            detail="GPT 요청 한도를 초과했습니다. 잠시 후 다시 시도해주세요.",
+            headers={"Retry-After": retry_after}
+        )
+
     except Exception as e:
         print(f"오류 발생: {str(e)}")
         raise HTTPException(status_code=500, detail=f"처리 중 오류 발생: {str(e)}")
 
 
+# ============================================
+# 작업 취소
+# ============================================
+
+@app.get("/jobs")
+async def list_jobs(request: Request):
+    """요청한 사용자의 진행 중인 작업 목록 (X-API-Key 또는 IP 기준)"""
+    jobs = job_registry.list(get_client_id(request))
+    return {"success": True, "count": len(jobs), "jobs": jobs}
+
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str, request: Request):
+    """
+    진행 중인 작업 취소 (요청한 사용자 본인의 작업만)
+
+    취소된 작업의 원래 요청은 409로 응답하며, 대기 중이었다면 바로 대기열에서 빠지고
+    실행 중이었다면 다음 Whisper 윈도우/OpenAI 응답 조각에서 중단됩니다.
+    """
+    job = job_registry.get(job_id)
+    if not job or job.client != get_client_id(request):
+        raise HTTPException(status_code=404, detail="진행 중인 작업을 찾을 수 없습니다")
+    if not job.token.cancel("사용자 요청"):
+        return {"success": True, "job_id": job_id, "message": "이미 취소 중인 작업입니다"}
+    print(f"작업 취소 요청: {job_id} ({job.kind})")
+    return {"success": True, "job_id": job_id, "message": "작업을 취소했습니다"}
+
+
+# ============================================
+# 일괄 재요약
+# ============================================
+
+def start_bulk_job(job_id: str):
+    """일괄 재요약 작업을 백그라운드 스레드로 실행"""
+    def worker():
+        try:
+            bulk_runner.run(
+                job_id, SessionLocal,
+                on_saved=lambda summary_id, row: index_for_search(
+                    "summary", summary_id, row["transcript_id"], row["summary"]
+                )
+            )
+        except Exception as e:
+            print(f"일괄 재요약 오류 ({job_id}): {str(e)}")
+
+    thread = threading.Thread(target=worker, name=f"bulk-{job_id}", daemon=True)
+    bulk_threads[job_id] = thread
+    thread.start()
+
+
+@app.post("/bulk/summaries")
+async def create_bulk_summaries(
+    gpt_model: GPTModel = Form(GPTModel.GPT_5_MINI, description="사용할 GPT 모델"),
+    transcript_ids: str = Form(None, description="대상 Transcript ID (쉼표 구분, 없으면 조건으로 선택)"),
+    keyword: str = Form(None, description="파일명/내용 검색어"),
+    created_after: datetime = Form(None, description="이 시각 이후 생성된 레코드"),
+    created_before: datetime = Form(None, description="이 시각 이전 생성된 레코드"),
+    whisper_model: WhisperModel = Form(None, description="특정 Whisper 모델로 변환된 레코드만"),
+    only_missing: bool = Form(False, description="gpt_model로 만든 요약이 없는 레코드만"),
+    concurrency: int = Form(4, ge=1, le=64, description="GPT 동시 호출 수"),
+    rpm: int = Form(None, description="분당 요청 한도 (기본값: OPENAI_RPM)"),
+    tpm: int = Form(None, description="분당 토큰 한도 (기본값: OPENAI_TPM)"),
+    batch_size: int = Form(20, ge=1, le=500, description="트랜잭션당 저장 건수"),
+    compact: bool = Form(True, description="GPT 전달 전 텍스트 압축"),
+    structured: bool = Form(True, description="주제/결정/액션 아이템 구조화하여 함께 저장"),
+    db: Session = Depends(get_db)
+):
+    """
+    기존 STT 레코드의 회의록을 일괄로 다시 생성 (백그라운드 실행)
+
+    진행 상황은 GET /bulk/summaries/{job_id}로 조회하고,
+    서버 재시작 등으로 중단되면 POST /bulk/summaries/{job_id}/resume으로 이어서 실행합니다.
+    """
+    if not any([transcript_ids, keyword, created_after, created_before, whisper_model, only_missing]):
+        raise HTTPException(status_code=400, detail="대상 ID 또는 조건을 하나 이상 지정해주세요")
+    try:
+        ids = [int(i) for i in transcript_ids.split(",")] if transcript_ids else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="transcript_ids는 쉼표로 구분된 숫자여야 합니다")
+
+    job = await run_in_threadpool(
+        bulk_runner.create_job,
+        db,
+        gpt_model=gpt_model.value,
+        ids=ids,
+        keyword=keyword,
+        created_after=created_after,
+        created_before=created_before,
+        whisper_model=whisper_model.value if whisper_model else None,
+        only_missing=only_missing,
+        concurrency=concurrency,
+        rpm=rpm,
+        tpm=tpm,
+        batch_size=batch_size,
+        compact=compact,
+        structured=structured
+    )
+    if job["total"]:
+        start_bulk_job(job["job_id"])
+    return {"success": True, **bulk_runner.status(job["job_id"])}
+
+
+@app.get("/bulk/summaries/{job_id}")
+async def get_bulk_summaries(job_id: str):
+    """일괄 재요약 진행 상황 (완료/실패 건수, 처리량, 토큰 사용량, 추정 비용)"""
+    try:
+        status = bulk_runner.status(job_id)
+    except (KeyError, ValueError):
+        raise HTTPException(status_code=404, detail="일괄 작업을 찾을 수 없습니다")
+    thread = bulk_threads.get(job_id)
+    status["active"] = bool(thread and thread.is_alive())
+    return {"success": True, **status}
+
+
+@app.post("/bulk/summaries/{job_id}/resume")
+async def resume_bulk_summaries(job_id: str):
+    """중단된 일괄 재요약 재개 (체크포인트에 기록된 레코드는 건너뜀)"""
+    try:
+        bulk_runner.status(job_id)
+    except (KeyError, ValueError):
+        raise HTTPException(status_code=404, detail="일괄 작업을 찾을 수 없습니다")
+    thread = bulk_threads.get(job_id)
+    if thread and thread.is_alive():
+        raise HTTPException(status_code=409, detail="이미 실행 중인 작업입니다")
+    start_bulk_job(job_id)
+    return {"success": True, **bulk_runner.status(job_id)}
+
+
 @app.post("/transcribe")
+@cancellable("transcribe")
 async def transcribe_audio(
+    request: Request,
     file: UploadFile = File(..., description="음성 파일 (mp3, wav, m4a 등)"),
     gpt_model: GPTModel = Form(GPTModel.GPT_5_MINI, description="사용할 GPT 모델 선택"),
     whisper_model: WhisperModel = Form(WhisperModel.BASE, description="Whisper API는 단일 모델 사용 (값은 기록용)"),
@@ -367,6 +1329,8 @@ async def transcribe_audio(
             detail=f"지원하지 않는 파일 형식입니다. 허용된 형식: {', '.join(allowed_extensions)}"
         )
 
+    check_admission()
+
     # 고유한 파일명 생성
     unique_id = str(uuid.uuid4())[:8]
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -380,15 +1344,21 @@ async def transcribe_audio(
 
         print(f"파일 업로드 완료: {temp_file_path}")
 
+        client = get_client_id(request)
+
         # 1단계: STT (음성 -> 텍스트)
-        print("음성을 텍스트로 변환 중...")
-        transcript = stt_processor.transcribe(temp_file_path)
+        async with stt_jobs.slot(client, estimate_stt_cost(file_size=os.path.getsize(temp_file_path))):
+            print("음성을 텍스트로 변환 중...")
+            transcript = await run_in_threadpool(transcribe_file, temp_file_path)
         print(f"변환 완료 (길이: {len(transcript)}자)")
 
-        # 2단계: GPT 요약
-        print(f"GPT ({gpt_model.value})로 회의록 작성 중...")
-        summary = gpt_summarizer.summarize(transcript, model=gpt_model.value)
+        # 2단계: GPT 요약 (추임새/반복 제거 후 전달)
+        gpt_input, _ = await run_in_threadpool(profiled("compact", compact_transcript), transcript)
+        async with gpt_jobs.slot(client, estimate_gpt_cost(gpt_input)):
+            print(f"GPT ({gpt_model.value})로 회의록 작성 중...")
+            summary = await run_in_threadpool(profiled("gpt", gpt_summarizer.summarize), gpt_input, model=gpt_model.value)
         print("회의록 작성 완료!")
+        cancellation.check()
 
         # 3단계: 파일 저장 또는 응답 준비
         summary_path = os.path.join(OUTPUT_DIR, f"meeting_minutes_{timestamp}_{unique_id}.txt")
@@ -483,6 +1453,9 @@ async def cleanup_files(days: int = 7):
                         os.remove(file_path)
                         deleted_count += 1
 
+        # 완료되지 않은 분할 업로드 세션 정리
+        deleted_count += upload_store.cleanup_expired(max_age)
+
         return {
             "success": True,
             "deleted_files": deleted_count,
@@ -509,19 +1482,91 @@ async def get_transcripts(
 
 
 @app.get("/transcripts/{transcript_id}")
-async def get_transcript(transcript_id: int, db: Session = Depends(get_db)):
-    """특정 STT 레코드 조회"""
-    record = crud.get_transcript_record(db, transcript_id)
-    if not record:
+async def get_transcript(transcript_id: int, request: Request, db: Session = Depends(get_db)):
+    """
+    특정 STT 레코드 조회 (ETag/If-None-Match, 응답 캐시)
+
+    보관/복원 CLI가 다른 프로세스에서 archived_at을 바꿀 수 있으므로 그 값을 캐시 키에 포함하고 매번 재검증하도록 합니다.
+    """
+    version = crud.get_transcript_record_version(db, transcript_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Transcript 레코드를 찾을 수 없습니다")
+    key = ("transcript", transcript_id) + version
+    entry = record_cache.get(key)
+    if entry is None:
+        record_cache.invalidate_prefix(("transcript", transcript_id))
+        record = crud.get_transcript_record(db, transcript_id)
+        if not record:
+            raise HTTPException(status_code=404, detail="Transcript 레코드를 찾을 수 없습니다")
+        entry = record_cache.put(key, {"success": True, "record": record})
+    return record_cache.respond(entry, request, "private, no-cache")
+
+
+@app.delete("/transcripts/{transcript_id}")
+async def delete_transcript(transcript_id: int, db: Session = Depends(get_db)):
+    """STT 레코드와 관련 요약 삭제"""
+    summary_ids = crud.get_summary_ids_by_transcript(db, transcript_id)
+    if not crud.delete_transcript_record(db, transcript_id):
         raise HTTPException(status_code=404, detail="Transcript 레코드를 찾을 수 없습니다")
-    return {"success": True, "record": record}
+    for key in [("transcript", transcript_id), ("transcript_summaries", transcript_id)]:
+        record_cache.invalidate_prefix(key)
+    for summary_id in summary_ids:
+        record_cache.invalidate_prefix(("summary", summary_id))
+    remove_from_search("transcript", transcript_id)
+    remove_from_search("summary", *summary_ids)
+    return {"success": True, "transcript_id": transcript_id, "deleted_summary_ids": summary_ids}
+
+
+@app.get("/transcripts/{transcript_id}/segments")
+async def get_transcript_segments(
+    transcript_id: int,
+    start: str = None,
+    end: str = None,
+    db: Session = Depends(get_db)
+):
+    """
+    특정 STT 레코드의 세그먼트 조회 (시간 구간 지정 가능)
+
+    Args:
+        start: 구간 시작 ("12:00", "1:02:03" 또는 초)
+        end: 구간 끝 ("15:00", "1:05:00" 또는 초)
+    """
+    try:
+        start_sec = parse_timestamp(start) if start else None
+        end_sec = parse_timestamp(end) if end else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="시간 형식이 올바르지 않습니다 (예: 12:00, 1:02:03, 720)")
+
+    segments = crud.get_transcript_segments(db, transcript_id, start=start_sec, end=end_sec)
+    if segments is None:
+        if not crud.get_transcript_record(db, transcript_id):
+            raise HTTPException(status_code=404, detail="Transcript 레코드를 찾을 수 없습니다")
+        raise HTTPException(status_code=404, detail="세그먼트 정보가 없는 레코드입니다")
+
+    return {
+        "success": True,
+        "transcript_id": transcript_id,
+        "count": len(segments),
+        "text": " ".join(seg["text"] for seg in segments),
+        "segments": segments
+    }
 
 
 @app.get("/transcripts/{transcript_id}/summaries")
-async def get_transcript_summaries(transcript_id: int, db: Session = Depends(get_db)):
-    """특정 STT 레코드에 대한 모든 요약 조회"""
-    summaries = crud.get_summaries_by_transcript(db, transcript_id)
-    return {"success": True, "count": len(summaries), "summaries": summaries}
+async def get_transcript_summaries(transcript_id: int, request: Request, db: Session = Depends(get_db)):
+    """
+    특정 STT 레코드에 대한 모든 요약 조회 (ETag/If-None-Match, 응답 캐시)
+
+    새 요약이 추가될 수 있으므로 (개수, 최대 ID) 버전을 캐시 키에 포함하고 매번 재검증하도록 합니다.
+    """
+    version = crud.get_summary_version(db, transcript_id)
+    key = ("transcript_summaries", transcript_id) + version
+    entry = record_cache.get(key)
+    if entry is None:
+        record_cache.invalidate_prefix(("transcript_summaries", transcript_id))
+        summaries = crud.get_summaries_by_transcript(db, transcript_id)
+        entry = record_cache.put(key, {"success": True, "count": len(summaries), "summaries": summaries})
+    return record_cache.respond(entry, request, "private, no-cache")
 
 
 @app.get("/summaries")
@@ -536,12 +1581,94 @@ async def get_summaries(
 
 
 @app.get("/summaries/{summary_id}")
-async def get_summary(summary_id: int, db: Session = Depends(get_db)):
-    """특정 요약 레코드 조회"""
+async def get_summary(summary_id: int, request: Request, db: Session = Depends(get_db)):
+    """
+    특정 요약 레코드 조회 (ETag/If-None-Match, 응답 캐시)
+
+    구조화 백필/보관 CLI가 structured_at, archived_at을 바꿀 수 있으므로 그 값을 캐시 키에 포함하고 매번 재검증하도록 합니다.
+    """
+    version = crud.get_summary_record_version(db, summary_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Summary 레코드를 찾을 수 없습니다")
+    key = ("summary", summary_id) + version
+    entry = record_cache.get(key)
+    if entry is None:
+        record_cache.invalidate_prefix(("summary", summary_id))
+        record = crud.get_summary_record(db, summary_id)
+        if not record:
+            raise HTTPException(status_code=404, detail="Summary 레코드를 찾을 수 없습니다")
+        entry = record_cache.put(key, {"success": True, "record": record})
+    return record_cache.respond(entry, request, "private, no-cache")
+
+
+@app.delete("/summaries/{summary_id}")
+async def delete_summary(summary_id: int, db: Session = Depends(get_db)):
+    """요약 레코드 삭제"""
     record = crud.get_summary_record(db, summary_id)
     if not record:
         raise HTTPException(status_code=404, detail="Summary 레코드를 찾을 수 없습니다")
-    return {"success": True, "record": record}
+    transcript_id = record.transcript_id
+    crud.delete_summary_record(db, summary_id)
+    record_cache.invalidate_prefix(("summary", summary_id))
+    record_cache.invalidate_prefix(("transcript_summaries", transcript_id))
+    remove_from_search("summary", summary_id)
+    return {"success": True, "summary_id": summary_id}
+
+
+@app.get("/summaries/{summary_id}/structure")
+async def get_summary_structure(summary_id: int, db: Session = Depends(get_db)):
+    """요약의 주제/결정 사항/액션 아이템 (구조화 이전 요약은 structured_at이 null, action_items.py backfill로 채움)"""
+    structure = crud.get_summary_structure(db, summary_id)
+    if structure is None:
+        raise HTTPException(status_code=404, detail="Summary 레코드를 찾을 수 없습니다")
+    return {"success": True, **structure}
+
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    ZIP = "zip"
+
+
+@app.get("/export/{kind}")
+async def export_records(
+    kind: str,
+    format: ExportFormat = ExportFormat.NDJSON,
+    created_after: datetime = None,
+    created_before: datetime = None,
+    whisper_model: WhisperModel = None,
+    gpt_model: GPTModel = None
+):
+    """
+    기록 일괄 내보내기 (스트리밍, 기록 수와 관계없이 서버 메모리 일정)
+
+    Args:
+        kind: "transcripts", "summaries", "all"
+        format: "ndjson" (한 줄에 레코드 하나) 또는 "zip" (텍스트 파일 묶음)
+        created_after / created_before: 생성 시각 범위
+        whisper_model: STT 레코드 Whisper 모델 필터
+        gpt_model: 요약 레코드 GPT 모델 필터
+    """
+    if kind not in EXPORT_KINDS:
+        raise HTTPException(status_code=404, detail=f"내보낼 수 있는 대상: {', '.join(EXPORT_KINDS)}")
+
+    filters = {
+        "created_after": created_after,
+        "created_before": created_before,
+        "whisper_model": whisper_model.value if whisper_model else None,
+        "gpt_model": gpt_model.value if gpt_model else None
+    }
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    if format == ExportFormat.ZIP:
+        media_type, extension = "application/zip", "zip"
+    else:
+        media_type, extension = "application/x-ndjson", "ndjson"
+
+    # 응답이 끝날 때까지 DB 세션이 필요하므로 요청 의존성 대신 전용 세션 사용
+    return StreamingResponse(
+        stream_export(SessionLocal, kind, format.value, filters),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{kind}_{timestamp}.{extension}"'}
+    )
 
 
 @app.get("/search/transcripts")
@@ -568,6 +1695,186 @@ async def search_summaries(
     return {"success": True, "count": len(records), "records": records}
 
 
+@app.get("/search/semantic")
+async def search_semantic(
+    q: str,
+    k: int = 10,
+    record_type: str = None,
+    db: Session = Depends(get_db)
+):
+    """
+    의미가 가까운 회의 검색 (키워드가 달라도 찾음, 회의 단위로 묶어 점수순)
+
+    Args:
+        q: 검색할 문장 (예: "3분기 예산 얘기한 회의")
+        k: 결과 회의 수 (최대 100)
+        record_type: transcript 또는 summary (없으면 둘 다)
+    """
+    if not semantic_search:
+        raise HTTPException(status_code=404, detail="의미 검색이 활성화되어 있지 않습니다 (SEMANTIC_SEARCH_ENABLED)")
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="검색어를 입력해주세요")
+    if record_type and record_type not in RECORD_TYPES:
+        raise HTTPException(status_code=400, detail=f"record_type은 {', '.join(RECORD_TYPES)} 중 하나여야 합니다")
+
+    start_time = time.time()
+    meetings = await run_in_threadpool(semantic_search.search, q, max(1, min(k, 100)), record_type)
+    meetings = await run_in_threadpool(semantic_search.add_snippets, db, meetings)
+    return {
+        "success": True,
+        "count": len(meetings),
+        "search_time": round(time.time() - start_time, 4),
+        "meetings": meetings
+    }
+
+
+# ============================================
+# 액션 아이템 / 결정 사항 / 주제
+# ============================================
+
+class ActionItemStatus(str, Enum):
+    OPEN = "open"
+    DONE = "done"
+
+
+@app.get("/action-items")
+async def get_action_items(
+    team: str = None,
+    owner: str = None,
+    status: str = "open",
+    transcript_id: int = None,
+    due_before: date = None,
+    include_history: bool = False,
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_db)
+):
+    """
+    회의를 가로지르는 액션 아이템 조회 (기한순)
+
+    예: GET /action-items?team=마케팅 → 마케팅 팀의 미완료 액션 아이템
+
+    Args:
+        team / owner: 담당 팀 / 담당자
+        status: open, done, all (기본값: open)
+        due_before: 이 날짜 이전 기한만 (YYYY-MM-DD)
+        include_history: 같은 회의의 이전 요약에서 나온 항목도 포함
+    """
+    if status not in ("open", "done", "all"):
+        raise HTTPException(status_code=400, detail="status는 open, done, all 중 하나여야 합니다")
+    items = crud.get_action_items(
+        db,
+        team=team,
+        owner=owner,
+        status=None if status == "all" else status,
+        transcript_id=transcript_id,
+        due_before=due_before,
+        include_history=include_history,
+        skip=skip,
+        limit=min(limit, 1000)
+    )
+    return {"success": True, "count": len(items), "action_items": items}
+
+
+@app.patch("/action-items/{item_id}")
+async def update_action_item(
+    item_id: int,
+    status: ActionItemStatus = Form(..., description="open 또는 done"),
+    db: Session = Depends(get_db)
+):
+    """액션 아이템 완료/미완료 처리 (같은 회의를 다시 요약해도 같은 할 일이면 완료 상태 유지)"""
+    item = crud.update_action_item_status(db, item_id, status.value)
+    if not item:
+        raise HTTPException(status_code=404, detail="액션 아이템을 찾을 수 없습니다")
+    return {"success": True, "action_item": item}
+
+
+@app.get("/decisions")
+async def get_decisions(
+    keyword: str = None,
+    transcript_id: int = None,
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_db)
+):
+    """회의별 최신 요약의 결정 사항 조회 (keyword: 포함 검색)"""
+    decisions = crud.search_decisions(db, keyword, transcript_id, skip=skip, limit=min(limit, 1000))
+    return {"success": True, "count": len(decisions), "decisions": decisions}
+
+
+@app.get("/topics")
+async def get_topics(
+    keyword: str = None,
+    transcript_id: int = None,
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_db)
+):
+    """회의별 최신 요약의 주제 조회 (keyword: 포함 검색)"""
+    topics = crud.search_topics(db, keyword, transcript_id, skip=skip, limit=min(limit, 1000))
+    return {"success": True, "count": len(topics), "topics": topics}
+
+
+
+# ============================================
+# 프로파일링 (관리자 전용)
+# ============================================
+
+def require_admin(x_admin_token: str):
+    """프로파일링이 꺼져 있으면 404, 토큰이 틀리면 403"""
+    if not request_profiler.enabled:
+        raise HTTPException(status_code=404, detail="프로파일링이 활성화되어 있지 않습니다 (PROFILING_ADMIN_TOKEN)")
+    if not request_profiler.is_authorized(x_admin_token):
+        raise HTTPException(status_code=403, detail="관리자 토큰이 올바르지 않습니다")
+
+
+@app.get("/admin/profiles")
+async def list_profiles(x_admin_token: str = Header(None)):
+    """저장된 요청 프로파일 목록 (최신순)"""
+    require_admin(x_admin_token)
+    profiles = await run_in_threadpool(request_profiler.list)
+    return {"success": True, "count": len(profiles), "profiles": profiles}
+
+
+@app.get("/admin/profiles/{profile_id}")
+async def get_profile(profile_id: str, x_admin_token: str = Header(None)):
+    """요청 프로파일 결과 (단계별 시간, 메모리 diff 상위 할당 위치)"""
+    require_admin(x_admin_token)
+    result = request_profiler.get(profile_id)
+    if not result:
+        raise HTTPException(status_code=404, detail="프로파일을 찾을 수 없습니다")
+    return {"success": True, "profile": result}
+
+
+@app.get("/admin/profiles/{profile_id}/download")
+async def download_profile(profile_id: str, kind: str = "prof", x_admin_token: str = Header(None)):
+    """
+    프로파일 파일 다운로드
+
+    Args:
+        kind: prof (pstats 바이너리, snakeviz 등으로 열기), txt (누적 시간 상위 함수), json (전체 결과)
+    """
+    require_admin(x_admin_token)
+    path = request_profiler.file_path(profile_id, kind)
+    if not path:
+        raise HTTPException(status_code=404, detail="프로파일 파일을 찾을 수 없습니다 (CPU 프로파일이 없는 요청은 json만 제공)")
+    return FileResponse(path, filename=os.path.basename(path))
+
+
+@app.get("/admin/profiling/flamegraph")
+async def get_flamegraph(reset: bool = False, x_admin_token: str = Header(None)):
+    """
+    샘플링 프로파일러의 collapsed stack (flamegraph.pl, speedscope 입력 형식)
+
+    Args:
+        reset: 반환 후 누적된 샘플 초기화
+    """
+    require_admin(x_admin_token)
+    if not sampling_profiler.running:
+        raise HTTPException(status_code=404, detail="샘플링 프로파일러가 실행 중이 아닙니다 (PROFILING_SAMPLER=true)")
+    return PlainTextResponse(sampling_profiler.collapsed(reset=reset))
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("api:app", host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,371 @@
+"""
+오래된 회의 기록 보관 (hot/cold 계층화)
+
+transcript_records/summary_records에 모든 기록이 계속 쌓이면 본문과 세그먼트 블롭 때문에 테이블과
+캐시에 올라가는 작업 집합이 커지고 created_at 정렬 목록 조회도 느려집니다.
+정책 기준(ARCHIVE_AFTER_DAYS)보다 오래된 회의는 본문/세그먼트/요약 본문을 회의 단위로 묶어
+높은 압축 레벨로 record_archive 테이블에 옮기고, 원래 행은 메타데이터만 남은 포인터로 둡니다.
+
+- 보관 대상: created_at이 기준일보다 오래되었고, 기준일 이후에 만든 요약도 없는 STT 레코드
+- 포인터 행: 본문은 빈 문자열, segment_data는 NULL, archived_at에 보관 시각 (search_signature는 유지)
+- 읽기: crud.get_transcript_record 등이 archived_at을 보고 record_archive에서 필요할 때만 풀어서 채움
+- 키워드 검색은 포인터 행의 블룸 필터를 통과한 후보만 보관본을 풀어 확인하므로 보관된 회의도 찾음
+- 배치마다 묶음 삽입과 포인터 갱신을 같은 트랜잭션으로 커밋하므로 중간에 멈춰도 다시 실행하면 이어서 진행
+
+실행 (먼저 python migrate_db.py --yes로 archived_at 컬럼/record_archive 테이블 생성):
+    python archive.py run                       # ARCHIVE_AFTER_DAYS(기본 180일)보다 오래된 회의 보관
+    python archive.py run --days 365 --dry-run  # 대상 수와 예상 압축률만 확인
+    python archive.py run --vacuum              # 보관 후 SQLite 파일 정리
+    python archive.py restore 12 34             # 다시 hot 테이블로 복원
+    python archive.py status
+"""
+import argparse
+import json
+import os
+import threading
+import time
+import zlib
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import bindparam, func, select
+
+from models import RecordArchive, SummaryRecord, TranscriptRecord
+from text_compression import MARKER_ZLIB, MARKER_ZSTD, search_signature
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "180"))
+# 보관본은 거의 읽지 않으므로 hot 본문(레벨 6)보다 압축률 우선 (19는 15보다 5배 느리고 2% 정도 더 작음)
+ARCHIVE_COMPRESSION_LEVEL = int(os.getenv("ARCHIVE_COMPRESSION_LEVEL", "15"))
+DEFAULT_BATCH_SIZE = 500
+
+_local = threading.local()
+
+
+def _get_engine():
+    from database import engine
+    return engine
+
+
+# ============================================
+# 묶음 형식
+# ============================================
+
+def pack_bundle(transcript: str, segment_data: Optional[bytes], summaries: Dict[int, str]) -> tuple:
+    """
+    회의 하나의 본문 묶음을 압축
+
+    형식: JSON 헤더(본문, 요약 {ID: 본문}, 세그먼트 블롭 유무) + "\\n" + 세그먼트 블롭,
+    전체를 zstd(zstandard가 없으면 zlib)로 압축하고 첫 바이트에 text_compression과 같은 마커를 붙임
+
+    Returns:
+        tuple: (압축된 묶음, 압축 전 크기)
+    """
+    header = json.dumps({
+        "transcript": transcript,
+        "summaries": {str(summary_id): summary for summary_id, summary in summaries.items()},
+        "segments": segment_data is not None,
+    }, ensure_ascii=False).encode("utf-8")
+    raw = header + b"\n" + (bytes(segment_data) if segment_data is not None else b"")
+    if zstandard is None:
+        return bytes([MARKER_ZLIB]) + zlib.compress(raw, 9), len(raw)
+    # zstd 객체는 스레드 간에 공유하지 않음
+    compressor = getattr(_local, "compressor", None)
+    if compressor is None:
+        compressor = _local.compressor = zstandard.ZstdCompressor(level=ARCHIVE_COMPRESSION_LEVEL)
+    return bytes([MARKER_ZSTD]) + compressor.compress(raw), len(raw)
+
+
+def unpack_bundle(payload) -> dict:
+    """pack_bundle의 역 - {"transcript", "segment_data", "summaries": {ID: 본문}}"""
+    data = bytes(payload)
+    if data[0] == MARKER_ZLIB:
+        raw = zlib.decompress(data[1:])
+    elif data[0] == MARKER_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstd로 압축된 보관본을 읽으려면 zstandard 패키지가 필요합니다 (pip install zstandard)")
+        raw = zstandard.ZstdDecompressor().decompress(data[1:])
+    else:
+        raise ValueError(f"알 수 없는 보관 형식입니다 (마커 {data[0]})")
+    header, _, segment_data = raw.partition(b"\n")
+    bundle = json.loads(header)
+    return {
+        "transcript": bundle["transcript"],
+        "segment_data": segment_data if bundle["segments"] else None,
+        "summaries": {int(summary_id): summary for summary_id, summary in bundle["summaries"].items()},
+    }
+
+
+def load_bundles(db, transcript_ids: List[int]) -> Dict[int, dict]:
+    """보관된 회의 묶음을 한 번의 쿼리로 읽어서 풀기 ({transcript_id: 묶음})"""
+    if not transcript_ids:
+        return {}
+    rows = db.query(RecordArchive.transcript_id, RecordArchive.payload).filter(
+        RecordArchive.transcript_id.in_(set(transcript_ids))
+    ).all()
+    return {transcript_id: unpack_bundle(payload) for transcript_id, payload in rows}
+
+
+# ============================================
+# 보관 / 복원
+# ============================================
+
+def _candidates_query(cutoff: datetime):
+    """보관 대상 STT 레코드 ID (ID 순, keyset 페이지네이션)"""
+    transcripts = TranscriptRecord.__table__
+    summaries = SummaryRecord.__table__
+    # 기준일 이후에 요약을 새로 만든 회의는 아직 사용 중인 것으로 보고 제외
+    recent = select(summaries.c.transcript_id).where(summaries.c.created_at >= cutoff)
+    return select(transcripts.c.id).where(
+        transcripts.c.archived_at.is_(None),
+        transcripts.c.created_at < cutoff,
+        transcripts.c.id.not_in(recent),
+        transcripts.c.id > bindparam("last_id"),
+    ).order_by(transcripts.c.id)
+
+
+def archive_records(
+    engine=None,
+    older_than_days: int = ARCHIVE_AFTER_DAYS,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    limit: Optional[int] = None,
+    dry_run: bool = False,
+    workers: Optional[int] = None
+) -> dict:
+    """
+    오래된 회의를 record_archive로 옮기고 원래 행을 포인터로 바꿈 (재실행 시 남은 대상만 처리)
+
+    Args:
+        older_than_days: 이 일수보다 오래된 회의만 보관
+        batch_size: 트랜잭션 하나에 처리할 회의 수
+        limit: 이번 실행에서 보관할 최대 회의 수 (None이면 전부)
+        dry_run: 압축까지만 하고 저장하지 않음 (대상 수/예상 압축률 확인)
+        workers: 압축 스레드 수 (zstd는 압축 중 GIL을 놓음, 기본값: CPU 수)
+
+    Returns:
+        dict: {"transcripts", "summaries", "bytes_before", "bytes_after", "seconds"}
+    """
+    engine = engine or _get_engine()
+    transcripts = TranscriptRecord.__table__
+    summaries = SummaryRecord.__table__
+    cutoff = datetime.now() - timedelta(days=older_than_days)
+    if not dry_run:
+        fill_missing_signatures(engine, batch_size)
+    candidates = _candidates_query(cutoff)
+
+    with engine.connect() as conn:
+        total = conn.execute(
+            select(func.count()).select_from(candidates.order_by(None).subquery()),
+            {"last_id": 0}
+        ).scalar()
+    if limit is not None:
+        total = min(total, limit)
+    print(f"보관 대상: {cutoff:%Y-%m-%d} 이전 회의 {total:,}건" + (" (dry run)" if dry_run else ""))
+
+    stats = {"transcripts": 0, "summaries": 0, "bytes_before": 0, "bytes_after": 0}
+    started = time.perf_counter()
+    last_id = 0
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as executor:
+        while limit is None or stats["transcripts"] < limit:
+            size = batch_size if limit is None else min(batch_size, limit - stats["transcripts"])
+            # 배치마다 한 트랜잭션: 묶음 삽입 + 포인터 갱신이 함께 커밋되거나 함께 롤백됨
+            with engine.begin() as conn:
+                ids = [row.id for row in conn.execute(candidates.limit(size), {"last_id": last_id})]
+                if not ids:
+                    break
+                bodies = conn.execute(
+                    select(transcripts.c.id, transcripts.c.transcript, transcripts.c.segment_data)
+                    .where(transcripts.c.id.in_(ids)).order_by(transcripts.c.id)
+                ).all()
+                summary_rows = conn.execute(
+                    select(summaries.c.id, summaries.c.transcript_id, summaries.c.summary)
+                    .where(summaries.c.transcript_id.in_(ids), summaries.c.archived_at.is_(None))
+                ).all()
+                by_transcript = defaultdict(dict)
+                for row in summary_rows:
+                    by_transcript[row.transcript_id][row.id] = row.summary
+
+                packed = list(executor.map(
+                    lambda row: pack_bundle(row.transcript, row.segment_data, by_transcript[row.id]), bodies
+                ))
+                archives = [{
+                    "transcript_id": row.id,
+                    "payload": payload,
+                    "original_bytes": original,
+                    "summary_count": len(by_transcript[row.id]),
+                } for row, (payload, original) in zip(bodies, packed)]
+
+                if not dry_run:
+                    conn.execute(RecordArchive.__table__.insert(), archives)
+                    conn.execute(
+                        transcripts.update().where(transcripts.c.id.in_(ids), transcripts.c.archived_at.is_(None)).values(
+                            transcript="", segment_data=None, archived_at=func.now()
+                        )
+                    )
+                    if summary_rows:
+                        conn.execute(
+                            summaries.update().where(summaries.c.id.in_([row.id for row in summary_rows])).values(
+                                summary="", archived_at=func.now()
+                            )
+                        )
+                last_id = ids[-1]
+
+            stats["transcripts"] += len(ids)
+            stats["summaries"] += len(summary_rows)
+            stats["bytes_before"] += sum(original for _, original in packed)
+            stats["bytes_after"] += sum(len(payload) for payload, _ in packed)
+            elapsed = time.perf_counter() - started
+            print(f"  보관: {stats['transcripts']:,}/{total:,} ({stats['transcripts'] / elapsed:,.0f} rows/s)")
+
+    stats["seconds"] = time.perf_counter() - started
+    if stats["bytes_before"]:
+        print(
+            f"✓ 회의 {stats['transcripts']:,}건 (요약 {stats['summaries']:,}건) "
+            f"{stats['bytes_before'] / 1024 ** 2:.1f}MB → {stats['bytes_after'] / 1024 ** 2:.1f}MB "
+            f"({stats['seconds']:.1f}초)"
+        )
+    return stats
+
+
+def fill_missing_signatures(engine=None, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """
+    시그니처 없이 보관된 포인터 행에 보관본으로 검색 시그니처 채움 (재실행 시 남은 행만 처리)
+
+    시그니처가 없으면 키워드 검색마다 항상 후보가 되어 보관본을 풀어야 합니다.
+
+    Returns:
+        int: 시그니처를 채운 회의 수
+    """
+    engine = engine or _get_engine()
+    transcripts = TranscriptRecord.__table__
+    summaries = SummaryRecord.__table__
+    archive = RecordArchive.__table__
+    missing = select(transcripts.c.id).where(
+        transcripts.c.archived_at.isnot(None),
+        transcripts.c.search_signature.is_(None),
+        transcripts.c.id > bindparam("last_id"),
+    ).order_by(transcripts.c.id)
+
+    filled = 0
+    last_id = 0
+    while True:
+        with engine.begin() as conn:
+            ids = [row.id for row in conn.execute(missing.limit(batch_size), {"last_id": last_id})]
+            if not ids:
+                break
+            last_id = ids[-1]
+            rows = conn.execute(
+                select(archive.c.transcript_id, archive.c.payload).where(archive.c.transcript_id.in_(ids))
+            ).all()
+            for transcript_id, payload in rows:
+                bundle = unpack_bundle(payload)
+                conn.execute(transcripts.update().where(transcripts.c.id == transcript_id).values(
+                    search_signature=search_signature(bundle["transcript"])
+                ))
+                for summary_id, summary in bundle["summaries"].items():
+                    conn.execute(summaries.update().where(summaries.c.id == summary_id).values(
+                        search_signature=search_signature(summary)
+                    ))
+        filled += len(rows)
+    if filled:
+        print(f"✓ 보관된 회의 {filled:,}건에 검색 시그니처 채움")
+    return filled
+
+
+def restore_records(transcript_ids: List[int], engine=None) -> List[int]:
+    """
+    보관된 회의를 다시 hot 테이블로 복원 (본문/세그먼트/검색 시그니처 채우고 보관본 삭제)
+
+    Returns:
+        list: 복원된 STT 레코드 ID (보관되어 있지 않은 ID는 제외)
+    """
+    engine = engine or _get_engine()
+    transcripts = TranscriptRecord.__table__
+    summaries = SummaryRecord.__table__
+    archive = RecordArchive.__table__
+
+    with engine.begin() as conn:
+        rows = conn.execute(
+            select(archive.c.transcript_id, archive.c.payload).where(archive.c.transcript_id.in_(transcript_ids))
+        ).all()
+        for transcript_id, payload in rows:
+            bundle = unpack_bundle(payload)
+            conn.execute(transcripts.update().where(transcripts.c.id == transcript_id).values(
+                transcript=bundle["transcript"],
+                segment_data=bundle["segment_data"],
+                search_signature=search_signature(bundle["transcript"]),
+                archived_at=None
+            ))
+            # 보관 후 삭제된 요약은 UPDATE 대상이 없으므로 자연히 건너뜀
+            for summary_id, summary in bundle["summaries"].items():
+                conn.execute(summaries.update().where(summaries.c.id == summary_id).values(
+                    summary=summary, search_signature=search_signature(summary), archived_at=None
+                ))
+        restored = [transcript_id for transcript_id, _ in rows]
+        if restored:
+            conn.execute(archive.delete().where(archive.c.transcript_id.in_(restored)))
+    return restored
+
+
+def archive_status(engine=None) -> dict:
+    """hot/보관 레코드 수와 보관본 크기"""
+    engine = engine or _get_engine()
+    with engine.connect() as conn:
+        hot, archived = conn.execute(select(
+            func.count(TranscriptRecord.id).filter(TranscriptRecord.archived_at.is_(None)),
+            func.count(TranscriptRecord.id).filter(TranscriptRecord.archived_at.isnot(None)),
+        )).one()
+        archived_summaries = conn.execute(
+            select(func.count(SummaryRecord.id)).where(SummaryRecord.archived_at.isnot(None))
+        ).scalar()
+        original_bytes, stored_bytes = conn.execute(select(
+            func.coalesce(func.sum(RecordArchive.original_bytes), 0),
+            func.coalesce(func.sum(func.length(RecordArchive.payload)), 0),
+        )).one()
+    return {
+        "hot_transcripts": hot,
+        "archived_transcripts": archived,
+        "archived_summaries": archived_summaries,
+        "original_bytes": int(original_bytes),
+        "archive_bytes": int(stored_bytes),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="오래된 회의 기록 보관 (hot/cold 계층화)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="정책 기준보다 오래된 회의 보관")
+    run.add_argument("--days", type=int, default=ARCHIVE_AFTER_DAYS, help=f"이 일수보다 오래된 회의 (기본값: {ARCHIVE_AFTER_DAYS})")
+    run.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help=f"트랜잭션당 회의 수 (기본값: {DEFAULT_BATCH_SIZE})")
+    run.add_argument("--limit", type=int, help="이번 실행에서 보관할 최대 회의 수")
+    run.add_argument("--dry-run", action="store_true", help="저장하지 않고 대상 수/예상 압축률만 확인")
+    run.add_argument("--vacuum", action="store_true", help="완료 후 SQLite VACUUM (비워진 페이지 반환)")
+
+    restore = sub.add_parser("restore", help="보관된 회의를 hot 테이블로 복원")
+    restore.add_argument("transcript_ids", type=int, nargs="+")
+
+    sub.add_parser("status", help="hot/보관 레코드 수와 보관본 크기")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        archive_records(older_than_days=args.days, batch_size=args.batch_size, limit=args.limit, dry_run=args.dry_run)
+        if args.vacuum and not args.dry_run:
+            from migrate_db import vacuum
+            vacuum()
+    elif args.command == "restore":
+        restored = restore_records(args.transcript_ids)
+        missing = sorted(set(args.transcript_ids) - set(restored))
+        print(f"✓ 복원: {restored}" + (f" (보관되어 있지 않음: {missing})" if missing else ""))
+    else:
+        print(json.dumps(archive_status(), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+디코딩된 오디오 캐시
+
+업로드된 음성 파일을 ffmpeg로 한 번만 디코딩하여 16kHz mono float32 PCM으로
+디스크에 저장하고, 이후에는 메모리 맵(np.memmap)으로 복사 없이 읽습니다.
+같은 회의를 다른 Whisper 모델/설정으로 다시 변환할 때 재업로드와 재디코딩이 필요 없습니다.
+
+키는 업로드 파일 내용의 SHA-256이며, 전체 크기가 max_bytes를 넘으면
+가장 오래 사용되지 않은 항목부터 삭제합니다.
+"""
+import os
+import threading
+import uuid
+from typing import Optional
+
+import numpy as np
+import whisper
+
+PCM_DTYPE = np.float32
+PCM_SUFFIX = ".f32"
+
+
+class AudioCache:
+    def __init__(self, cache_dir: str = "audio_cache", max_bytes: int = 5 * 1024 ** 3):
+        """
+        Args:
+            cache_dir: PCM 파일을 저장할 디렉토리
+            max_bytes: 캐시 최대 크기 (bytes, 기본값: 5GB)
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @classmethod
+    def from_env(cls):
+        """환경 변수(AUDIO_CACHE_DIR, AUDIO_CACHE_MAX_MB)로 캐시 생성"""
+        return cls(
+            cache_dir=os.getenv("AUDIO_CACHE_DIR", "audio_cache"),
+            max_bytes=int(os.getenv("AUDIO_CACHE_MAX_MB", "5120")) * 1024 ** 2,
+        )
+
+    def _path(self, audio_hash: str) -> str:
+        return os.path.join(self.cache_dir, audio_hash + PCM_SUFFIX)
+
+    def contains(self, audio_hash: str) -> bool:
+        return os.path.exists(self._path(audio_hash))
+
+    def get(self, audio_hash: str) -> Optional[np.ndarray]:
+        """
+        캐시된 PCM을 메모리 맵으로 반환 (없으면 None)
+
+        copy-on-write 모드('c')로 열어 torch.from_numpy가 복사 없이 사용할 수 있고,
+        실수로 값을 바꿔도 캐시 파일에는 반영되지 않습니다.
+        """
+        path = self._path(audio_hash)
+        try:
+            if os.path.getsize(path) == 0:
+                return np.zeros(0, dtype=PCM_DTYPE)
+            audio = np.memmap(path, dtype=PCM_DTYPE, mode="c")
+        except FileNotFoundError:
+            return None
+        # LRU 순서 갱신
+        os.utime(path)
+        return audio
+
+    def put(self, audio_file_path: str, audio_hash: str) -> np.ndarray:
+        """
+        음성 파일을 디코딩하여 캐시에 저장하고 메모리 맵을 반환 (이미 있으면 디코딩 생략)
+
+        Args:
+            audio_file_path: 원본 음성 파일 경로
+            audio_hash: 원본 파일 내용의 SHA-256
+        """
+        cached = self.get(audio_hash)
+        if cached is not None:
+            print(f"디코딩 캐시 사용: {audio_hash[:12]}")
+            return cached
+
+        audio = whisper.load_audio(audio_file_path)
+        if audio.nbytes > self.max_bytes:
+            # 캐시 한도보다 큰 파일은 저장해도 바로 삭제되므로 디코딩 결과만 반환
+            return audio
+
+        # 임시 파일에 쓴 뒤 교체하여 동시에 읽는 쪽이 반쯤 쓰인 파일을 보지 않도록 함
+        path = self._path(audio_hash)
+        tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+        audio.astype(PCM_DTYPE, copy=False).tofile(tmp_path)
+        os.replace(tmp_path, path)
+        print(f"디코딩 캐시 저장: {audio_hash[:12]} ({audio.nbytes / 1024 ** 2:.1f}MB)")
+
+        self.evict(keep=path)
+        cached = self.get(audio_hash)
+        return cached if cached is not None else audio
+
+    def evict(self, keep: Optional[str] = None):
+        """
+        전체 크기가 max_bytes 이하가 될 때까지 오래 사용되지 않은 항목부터 삭제
+
+        Args:
+            keep: 삭제하지 않을 캐시 파일 경로 (방금 저장한 항목)
+        """
+        with self._lock:
+            entries = []
+            for name in os.listdir(self.cache_dir):
+                if not name.endswith(PCM_SUFFIX):
+                    continue
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                try:
+                    # 이미 열린 메모리 맵은 파일 삭제 후에도 유효함 (POSIX)
+                    os.remove(path)
+                    total -= size
+                    print(f"디코딩 캐시 삭제: {os.path.basename(path)}")
+                except FileNotFoundError:
+                    pass
@@ -0,0 +1,84 @@
+"""
+음성 파일 메타데이터 확인 (전체 디코딩 없이 컨테이너 헤더만 읽음)
+
+클라이언트가 보낸 audio_duration 대신 서버에서 직접 길이와 코덱을 확인하여
+처리 시간 예측과 부하 제어에 사용합니다.
+ffprobe(ffmpeg에 포함)를 사용하고, 없으면 WAV만 표준 라이브러리로 읽습니다.
+"""
+import json
+import subprocess
+import wave
+
+
+class AudioProbeError(Exception):
+    """음성 파일 정보를 읽을 수 없음 (손상된 파일 또는 지원하지 않는 형식)"""
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _probe_wav(path: str) -> dict:
+    try:
+        with wave.open(path, "rb") as f:
+            frames, rate = f.getnframes(), f.getframerate()
+            return {
+                "duration": frames / rate if rate else None,
+                "codec": "pcm",
+                "format": "wav",
+                "sample_rate": rate,
+                "channels": f.getnchannels(),
+                "bit_rate": rate * f.getnchannels() * f.getsampwidth() * 8,
+            }
+    except (wave.Error, EOFError) as e:
+        raise AudioProbeError(f"WAV 헤더를 읽을 수 없습니다: {e}")
+
+
+def probe_audio(path: str, timeout: float = 10.0) -> dict:
+    """
+    음성 파일의 길이와 코덱 정보를 반환
+
+    Args:
+        path: 음성 파일 경로
+        timeout: ffprobe 최대 실행 시간 (초)
+
+    Returns:
+        dict: {"duration": 초, "codec", "format", "sample_rate", "channels", "bit_rate"}
+              (헤더에 없는 값은 None)
+    """
+    command = [
+        "ffprobe", "-v", "error",
+        "-select_streams", "a:0",
+        "-show_entries", "format=duration,format_name,bit_rate:stream=codec_name,sample_rate,channels,duration",
+        "-of", "json",
+        path,
+    ]
+    try:
+        result = subprocess.run(command, capture_output=True, timeout=timeout)
+    except FileNotFoundError:
+        if path.lower().endswith(".wav"):
+            return _probe_wav(path)
+        raise AudioProbeError("ffprobe를 찾을 수 없습니다. ffmpeg를 설치해주세요.")
+    except subprocess.TimeoutExpired:
+        raise AudioProbeError("음성 파일 정보 확인 시간 초과")
+
+    if result.returncode != 0:
+        raise AudioProbeError(f"음성 파일 정보를 읽을 수 없습니다: {result.stderr.decode(errors='ignore').strip()}")
+
+    info = json.loads(result.stdout or b"{}")
+    streams = info.get("streams") or []
+    if not streams:
+        raise AudioProbeError("오디오 스트림이 없는 파일입니다")
+    stream, container = streams[0], info.get("format", {})
+
+    return {
+        "duration": _to_float(container.get("duration")) or _to_float(stream.get("duration")),
+        "codec": stream.get("codec_name"),
+        "format": container.get("format_name"),
+        "sample_rate": int(stream["sample_rate"]) if stream.get("sample_rate") else None,
+        "channels": stream.get("channels"),
+        "bit_rate": int(container["bit_rate"]) if container.get("bit_rate") else None,
+    }
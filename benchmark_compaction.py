@@ -0,0 +1,84 @@
+"""
+텍스트 압축(transcript_compactor) 처리량 벤치마크
+
+사용법:
+    python benchmark_compaction.py                         # 합성 회의 텍스트 (1MB, 4MB, 16MB)
+    python benchmark_compaction.py --sizes 0.5 8           # 크기 지정 (MB)
+    python benchmark_compaction.py --file output/transcript_xxx.txt
+"""
+import argparse
+import random
+import time
+
+from transcript_compactor import compact_transcript
+
+SENTENCES = [
+    "이번 분기 매출 목표는 전년 대비 십오 퍼센트 증가입니다.",
+    "마케팅 예산은 다음 주까지 재검토하기로 했습니다.",
+    "신규 기능 배포 일정은 개발팀과 다시 조율하겠습니다.",
+    "고객 문의가 늘어난 원인을 먼저 분석해야 할 것 같습니다.",
+    "회의록은 제가 정리해서 공유드리겠습니다.",
+    "그 부분은 법무팀 검토가 필요합니다.",
+]
+FILLERS = ["음", "어", "그,", "뭐,", "에", "이제,"]
+
+
+def synthetic_transcript(target_chars: int, seed: int = 0) -> str:
+    """추임새, 단어 반복, 문장 반복 환각이 섞인 Whisper 스타일 텍스트 생성"""
+    rng = random.Random(seed)
+    parts = []
+    length = 0
+    while length < target_chars:
+        sentence = rng.choice(SENTENCES)
+        words = sentence.split()
+        if rng.random() < 0.5:
+            words.insert(rng.randrange(len(words)), rng.choice(FILLERS))
+        if rng.random() < 0.2:
+            i = rng.randrange(len(words))
+            words.insert(i, words[i])
+        text = " ".join(words)
+        # 가끔 같은 문장을 여러 번 반복 (Whisper 반복 환각)
+        if rng.random() < 0.05:
+            text = " ".join([text] * rng.randint(3, 10))
+        if rng.random() < 0.01:
+            text += " 시청해주셔서 감사합니다."
+        parts.append(text)
+        length += len(text) + 1
+    return " ".join(parts)
+
+
+def run(text: str, label: str, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        _, stats = compact_transcript(text)
+        best = min(best, time.perf_counter() - start)
+
+    megabytes = len(text.encode("utf-8")) / 1024 ** 2
+    print(
+        f"{label:>12} | {megabytes:7.2f}MB | {best * 1000:9.1f}ms | {megabytes / best:7.2f}MB/s | "
+        f"{len(text) / best / 1e6:6.2f}M자/s | 토큰 {stats['tokens_before']:>9,} -> {stats['tokens_after']:>9,} "
+        f"({stats['saved_ratio'] * 100:.1f}% 절감)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="텍스트 압축 처리량 벤치마크")
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1, 4, 16], help="합성 텍스트 크기 (MB)")
+    parser.add_argument("--file", help="실제 STT 텍스트 파일 경로")
+    parser.add_argument("--repeat", type=int, default=3, help="반복 횟수 (가장 빠른 값 사용)")
+    args = parser.parse_args()
+
+    print(f"{'입력':>12} | {'크기':>9} | {'시간':>11} | {'처리량':>9} | {'':>10} | 토큰 절감")
+    if args.file:
+        with open(args.file, encoding="utf-8") as f:
+            run(f.read(), "file", args.repeat)
+        return
+    for size in args.sizes:
+        # 한국어 UTF-8은 글자당 약 3바이트
+        text = synthetic_transcript(int(size * 1024 ** 2 / 3))
+        run(text, "합성", args.repeat)
+
+
+if __name__ == "__main__":
+    main()
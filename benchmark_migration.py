@@ -0,0 +1,107 @@
+"""
+migrate_db 배치 마이그레이션 처리량 벤치마크
+
+임시 SQLite 파일에 합성 meeting_records 테이블을 만들고
+transcript_records/summary_records로 옮기는 데 걸리는 시간을 측정합니다.
+
+사용법:
+    python benchmark_migration.py                          # 10k, 100k 행
+    python benchmark_migration.py --rows 1000000 --batch-size 10000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, text
+
+from models import Base
+from migrate_db import migrate_meeting_records
+
+SENTENCES = [
+    "이번 분기 매출 목표는 전년 대비 십오 퍼센트 증가입니다.",
+    "마케팅 예산은 다음 주까지 재검토하기로 했습니다.",
+    "신규 기능 배포 일정은 개발팀과 다시 조율하겠습니다.",
+    "회의록은 제가 정리해서 공유드리겠습니다.",
+]
+
+
+def create_legacy_table(engine, rows: int, seed: int = 0):
+    """이전 스키마(meeting_records)와 합성 데이터 생성 (절반은 요약 포함)"""
+    rng = random.Random(seed)
+    started = datetime(2024, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(text("""
+            CREATE TABLE meeting_records (
+                id INTEGER PRIMARY KEY,
+                filename VARCHAR(500) NOT NULL,
+                file_size INTEGER NOT NULL,
+                audio_duration FLOAT,
+                transcript TEXT NOT NULL,
+                whisper_model VARCHAR(50),
+                stt_processing_time FLOAT,
+                summary TEXT,
+                gpt_model VARCHAR(50),
+                gpt_processing_time FLOAT,
+                created_at DATETIME
+            )
+        """))
+        insert = text("""
+            INSERT INTO meeting_records VALUES
+            (:id, :filename, :file_size, :audio_duration, :transcript, :whisper_model,
+             :stt_processing_time, :summary, :gpt_model, :gpt_processing_time, :created_at)
+        """)
+        batch = []
+        for i in range(1, rows + 1):
+            has_summary = i % 2 == 0
+            batch.append({
+                "id": i,
+                "filename": f"meeting_{i}.m4a",
+                "file_size": rng.randint(10 ** 6, 10 ** 8),
+                "audio_duration": rng.uniform(60, 7200),
+                "transcript": " ".join(rng.choices(SENTENCES, k=20)),
+                "whisper_model": "base",
+                "stt_processing_time": rng.uniform(5, 600),
+                "summary": "## 회의 요약\n" + rng.choice(SENTENCES) if has_summary else None,
+                "gpt_model": "gpt-4o-mini" if has_summary else None,
+                "gpt_processing_time": rng.uniform(1, 30) if has_summary else None,
+                "created_at": (started + timedelta(minutes=i)).isoformat(sep=" "),
+            })
+            if len(batch) >= 10000:
+                conn.execute(insert, batch)
+                batch = []
+        if batch:
+            conn.execute(insert, batch)
+
+
+def run(rows: int, batch_size: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        create_legacy_table(engine, rows)
+        Base.metadata.create_all(bind=engine)
+
+        start = time.perf_counter()
+        result = migrate_meeting_records(engine, batch_size)
+        elapsed = time.perf_counter() - start
+        engine.dispose()
+
+    print(
+        f"{rows:>10,}행 | 배치 {batch_size:>6,} | {elapsed:8.2f}s | {rows / elapsed:>10,.0f} rows/s | "
+        f"요약 {result['summaries']:,}개"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="배치 마이그레이션 처리량 벤치마크")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000], help="합성 행 수")
+    parser.add_argument("--batch-size", type=int, default=5000, help="배치당 행 수")
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        run(rows, args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+의미 검색 인덱스(semantic_search) 벤치마크 - 임베딩 모델 없이 합성 벡터로 검색 지연 측정
+
+회의마다 주제 벡터를 하나 정하고 그 주변에 청크 벡터를 만들어(실제 회의처럼 청크끼리 비슷함)
+임시 디렉토리의 인덱스에 넣은 뒤 다음을 비교합니다.
+- 인덱스 생성 처리량, 파일 크기
+- 전체 청크 정확 계산(exact) vs centroid 2단계(two-stage) 검색 지연 (p50/p95)
+- 2단계 검색의 recall@k (정확 계산 결과 대비 상위 회의 일치율)
+
+사용법:
+    python benchmark_semantic_search.py                          # 회의 10,000개 × 청크 30개
+    python benchmark_semantic_search.py --meetings 50000 --candidates 512
+"""
+import argparse
+import statistics
+import tempfile
+import time
+
+import numpy as np
+
+from semantic_search import SemanticIndex
+
+
+def synthetic_meeting(rng, dim: int, chunks: int) -> np.ndarray:
+    topic = rng.standard_normal(dim).astype(np.float32)
+    vectors = topic + rng.standard_normal((chunks, dim)).astype(np.float32) * 1.2
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _meetings(hits, k: int) -> list:
+    seen = []
+    for hit in hits:
+        if hit["transcript_id"] not in seen:
+            seen.append(hit["transcript_id"])
+    return seen[:k]
+
+
+def _timed(index, queries, k: int):
+    timings, results = [], []
+    for query in queries:
+        start = time.perf_counter()
+        results.append(_meetings(index.search(query, k=k * 12), k))
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return timings, results
+
+
+def run(args):
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        index = SemanticIndex(tmp)
+        index.load(dim=args.dim, model="synthetic")
+        queries = []
+        batch = []
+        start = time.perf_counter()
+        for meeting_id in range(1, args.meetings + 1):
+            vectors = synthetic_meeting(rng, args.dim, args.chunks)
+            batch.append(("transcript", meeting_id, meeting_id, vectors))
+            if len(batch) >= 500 or meeting_id == args.meetings:
+                index.add_batch(batch)
+                batch = []
+            if len(queries) < args.queries and meeting_id % max(1, args.meetings // args.queries) == 0:
+                query = vectors[0] + rng.standard_normal(args.dim).astype(np.float32) * 0.8
+                queries.append(query / np.linalg.norm(query))
+        build_seconds = time.perf_counter() - start
+        status = index.status()
+        print(
+            f"회의 {args.meetings:,}개, 청크 {status['chunks']:,}개 ({args.dim}차원) | "
+            f"생성 {args.meetings / build_seconds:,.0f}회의/s | 파일 {status['megabytes']:.0f}MB\n"
+        )
+
+        index.exact_limit = status["chunks"]
+        exact_timings, exact_results = _timed(index, queries, args.k)
+        index.exact_limit = 0
+        index.candidates = args.candidates
+        staged_timings, staged_results = _timed(index, queries, args.k)
+
+        recall = statistics.mean(
+            len(set(exact) & set(staged)) / max(1, len(exact)) for exact, staged in zip(exact_results, staged_results)
+        )
+        for label, timings in (("exact", exact_timings), ("two-stage", staged_timings)):
+            print(
+                f"{label:>9} | p50 {statistics.median(timings):7.2f}ms | p95 {timings[int(len(timings) * 0.95)]:7.2f}ms"
+            )
+        print(f"\n2단계 검색 recall@{args.k}: {recall * 100:.1f}% (후보 {args.candidates}개)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="의미 검색 인덱스 벤치마크")
+    parser.add_argument("--meetings", type=int, default=10000, help="회의 수")
+    parser.add_argument("--chunks", type=int, default=30, help="회의당 청크 수")
+    parser.add_argument("--dim", type=int, default=384, help="임베딩 차원")
+    parser.add_argument("--queries", type=int, default=100, help="질의 수")
+    parser.add_argument("--candidates", type=int, default=512, help="2단계 검색 후보 레코드 수")
+    parser.add_argument("-k", type=int, default=10, help="결과 회의 수")
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
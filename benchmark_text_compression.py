@@ -0,0 +1,202 @@
+"""
+본문 압축 저장(text_compression) 벤치마크 - 압축 없는 TEXT 컬럼과 비교
+
+임시 SQLite 파일 두 개에 같은 STT 텍스트를 넣고 다음을 비교합니다.
+- DB 파일 크기 (VACUUM 후)
+- 삽입 처리량 (압축 + 검색 시그니처 계산 포함)
+- 단건 조회 지연 (p50/p95), 전체 본문 스캔 처리량
+- 키워드 검색 지연 (LIKE vs 블룸 필터 + 후보만 압축 해제)
+
+사용법:
+    python benchmark_text_compression.py                     # 합성 회의 텍스트 2,000건
+    python benchmark_text_compression.py --rows 20000 --chars 30000
+    python benchmark_text_compression.py --from-db           # DATABASE_URL의 실제 STT 결과를 표본으로 사용
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, Text, create_engine, select, text
+from sqlalchemy.orm import sessionmaker
+
+import crud
+from models import Base, CompressionDictionary, TranscriptRecord
+from text_compression import registry, search_signature, train_dictionary
+
+SUBJECTS = ["이번 분기", "마케팅 예산", "신규 기능", "고객 문의", "채용 계획", "서버 비용", "보안 점검", "디자인 시안"]
+PREDICATES = [
+    "은 다음 주까지 다시 검토하기로 했습니다.",
+    "에 대해서는 개발팀과 일정을 조율하겠습니다.",
+    "관련해서 {n}건 정도 추가로 확인이 필요합니다.",
+    "은 전년 대비 {n} 퍼센트 정도 늘었습니다.",
+    "부분은 법무팀 검토가 먼저 필요할 것 같습니다.",
+    "은 {name} 님이 정리해서 공유해 주시기로 했습니다.",
+]
+NAMES = ["김민수", "이서연", "박지훈", "최유진", "정하늘", "강도윤"]
+KEYWORD = "분기별회고"
+
+
+def synthetic_transcript(rng: random.Random, chars: int) -> str:
+    parts = []
+    length = 0
+    while length < chars:
+        sentence = rng.choice(SUBJECTS) + rng.choice(PREDICATES).format(
+            n=rng.randint(1, 99), name=rng.choice(NAMES)
+        )
+        if rng.random() < 0.3:
+            sentence = rng.choice(["음 ", "어 ", "그러니까 "]) + sentence
+        parts.append(sentence)
+        length += len(sentence) + 1
+    return " ".join(parts)
+
+
+def load_samples(args) -> list:
+    rng = random.Random(0)
+    if args.from_db:
+        from database import SessionLocal
+        db = SessionLocal()
+        try:
+            texts = [row[0] for row in db.query(TranscriptRecord.transcript).limit(args.rows).all()]
+        finally:
+            db.close()
+        if not texts:
+            raise SystemExit("DB에 STT 레코드가 없습니다")
+        return [texts[i % len(texts)] for i in range(args.rows)]
+    samples = [synthetic_transcript(rng, args.chars) for _ in range(args.rows)]
+    # 1%의 레코드에만 검색어 포함
+    for i in range(0, args.rows, 100):
+        samples[i] += f" {KEYWORD} 진행"
+    return samples
+
+
+def _rows(samples, with_signature: bool):
+    for i, body in enumerate(samples, start=1):
+        row = {
+            "id": i,
+            "filename": f"meeting_{i}.m4a",
+            "file_size": 0,
+            "transcript": body,
+            "whisper_model": "base",
+        }
+        if with_signature:
+            row["search_signature"] = search_signature(body)
+        yield row
+
+
+def _insert(engine, table, samples, with_signature: bool, batch_size: int = 500) -> float:
+    start = time.perf_counter()
+    batch = []
+    with engine.begin() as conn:
+        for row in _rows(samples, with_signature):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                conn.execute(table.insert(), batch)
+                batch = []
+        if batch:
+            conn.execute(table.insert(), batch)
+    return time.perf_counter() - start
+
+
+def _file_size(engine, path: str) -> int:
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM"))
+    return os.path.getsize(path)
+
+
+def _point_reads(engine, column, id_column, count: int, lookups: int = 500) -> list:
+    rng = random.Random(1)
+    timings = []
+    with engine.connect() as conn:
+        for _ in range(lookups):
+            start = time.perf_counter()
+            conn.execute(select(column).where(id_column == rng.randint(1, count))).scalar()
+            timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def _scan(engine, column) -> float:
+    start = time.perf_counter()
+    with engine.connect() as conn:
+        for _ in conn.execute(select(column)):
+            pass
+    return time.perf_counter() - start
+
+
+def run(args):
+    samples = load_samples(args)
+    raw_bytes = sum(len(body.encode("utf-8")) for body in samples)
+    print(f"표본 {len(samples):,}건, 원문 {raw_bytes / 1024 ** 2:.1f}MB\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # 기준: 압축 없는 TEXT 컬럼
+        plain_path = os.path.join(tmp, "plain.db")
+        plain_engine = create_engine(f"sqlite:///{plain_path}")
+        plain_table = Table(
+            "transcript_records", MetaData(),
+            Column("id", Integer, primary_key=True),
+            Column("filename", String(500)),
+            Column("file_size", Integer),
+            Column("transcript", Text),
+            Column("whisper_model", String(50)),
+        )
+        plain_table.metadata.create_all(plain_engine)
+
+        # 압축: 실제 모델 + 표본으로 학습한 사전
+        packed_path = os.path.join(tmp, "compressed.db")
+        packed_engine = create_engine(f"sqlite:///{packed_path}")
+        Base.metadata.create_all(packed_engine)
+        dictionary = train_dictionary(body[:4000] for body in samples[:1000])
+        if dictionary:
+            with packed_engine.begin() as conn:
+                conn.execute(CompressionDictionary.__table__.insert(), {"dict_data": dictionary, "sample_count": 1000})
+        registry.configure(packed_engine)
+
+        results = {}
+        for label, engine, path, table, column, id_column, signed in (
+            ("TEXT", plain_engine, plain_path, plain_table, plain_table.c.transcript, plain_table.c.id, False),
+            ("zstd", packed_engine, packed_path, TranscriptRecord.__table__,
+             TranscriptRecord.transcript, TranscriptRecord.id, True),
+        ):
+            insert_seconds = _insert(engine, table, samples, signed)
+            size = _file_size(engine, path)
+            reads = _point_reads(engine, column, id_column, len(samples))
+            scan_seconds = _scan(engine, column)
+
+            start = time.perf_counter()
+            if signed:
+                db = sessionmaker(bind=engine)()
+                matched = len(crud.search_transcript_records(db, KEYWORD, limit=1000))
+                db.close()
+            else:
+                with engine.connect() as conn:
+                    matched = len(conn.execute(
+                        select(plain_table.c.id).where(plain_table.c.transcript.ilike(f"%{KEYWORD}%"))
+                    ).all())
+            search_ms = (time.perf_counter() - start) * 1000
+
+            results[label] = size
+            reads.sort()
+            print(
+                f"{label:>5} | DB {size / 1024 ** 2:8.1f}MB | 삽입 {len(samples) / insert_seconds:8,.0f}행/s "
+                f"({raw_bytes / 1024 ** 2 / insert_seconds:6.1f}MB/s) | 단건 조회 p50 {statistics.median(reads):.3f}ms "
+                f"p95 {reads[int(len(reads) * 0.95)]:.3f}ms | 전체 스캔 {raw_bytes / 1024 ** 2 / scan_seconds:7.1f}MB/s | "
+                f"검색 {search_ms:7.1f}ms ({matched}건)"
+            )
+        print(f"\nDB 크기: {results['zstd'] / results['TEXT'] * 100:.1f}% (사전 {len(dictionary or b'') / 1024:.0f}KB)")
+        plain_engine.dispose()
+        packed_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="본문 압축 저장 벤치마크")
+    parser.add_argument("--rows", type=int, default=2000, help="레코드 수")
+    parser.add_argument("--chars", type=int, default=20000, help="합성 텍스트 길이 (글자)")
+    parser.add_argument("--from-db", action="store_true", help="DATABASE_URL의 STT 결과를 표본으로 사용")
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,392 @@
+"""
+일괄 재요약
+
+프롬프트를 바꾸거나 새 GPT 모델로 옮길 때 기존 TranscriptRecord 수천 건의 회의록을 다시 만듭니다.
+
+- 대상: ID 목록 또는 조건(검색어, 생성 기간, Whisper 모델, 특정 GPT 모델 요약이 없는 것)
+- GPT 호출: 작업별 동시 호출 수 / RPM / TPM 한도 (ModelRateLimiter)
+- DB 쓰기: batch_size건씩 한 트랜잭션으로 SummaryRecord 생성 (구조화 옵션이면 주제/결정/액션 아이템도 함께)
+- 체크포인트: 커밋된 건은 <job_id>.done에 기록되어 중단 후 재개 시 건너뜀
+- 진행 상황: 처리량(건/분), 토큰 사용량, 추정 비용을 <job_id>.json에 기록
+
+실행:
+    python bulk_resummarize.py --model gpt-5-mini --keyword 주간회의 --concurrency 8 --rpm 300
+    python bulk_resummarize.py --ids 1,2,3 --model gpt-5
+    python bulk_resummarize.py --resume <job_id>
+    python bulk_resummarize.py --status <job_id>
+
+로컬 mock 서버로 테스트:
+    python mock_openai_server.py --port 8100 --rate-429 0.2 &
+    OPENAI_BASE_URL=http://localhost:8100/v1 OPENAI_API_KEY=test python bulk_resummarize.py --all --model gpt-5-mini
+"""
+import argparse
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
+from typing import Callable, List, Optional
+
+from dotenv import load_dotenv
+
+import crud
+from diarization import format_speaker_transcript
+from segment_store import SegmentIndex
+from profiling import profiled
+from transcript_compactor import compact_transcript
+
+DEFAULT_JOB_DIR = os.path.join("output", "bulk_jobs")
+
+
+class BulkResummarizer:
+    def __init__(self, job_dir: str = DEFAULT_JOB_DIR):
+        self.job_dir = job_dir
+        os.makedirs(job_dir, exist_ok=True)
+
+    def _path(self, job_id: str, suffix: str) -> str:
+        if not job_id.isalnum():
+            raise ValueError("잘못된 작업 ID입니다")
+        return os.path.join(self.job_dir, job_id + suffix)
+
+    def _save(self, job: dict):
+        # 임시 파일에 쓴 뒤 교체하여 상태 조회가 반쯤 쓰인 파일을 읽지 않도록 함
+        path = self._path(job["job_id"], ".json")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(job, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def get(self, job_id: str) -> dict:
+        try:
+            with open(self._path(job_id, ".json"), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise KeyError(job_id)
+
+    def done_ids(self, job_id: str) -> dict:
+        """체크포인트 {transcript_id: summary_id}"""
+        done = {}
+        path = self._path(job_id, ".done")
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    parts = line.split()
+                    if len(parts) == 2:
+                        done[int(parts[0])] = int(parts[1])
+        return done
+
+    def create_job(
+        self,
+        db,
+        gpt_model: str,
+        ids: Optional[List[int]] = None,
+        keyword: Optional[str] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        whisper_model: Optional[str] = None,
+        only_missing: bool = False,
+        concurrency: int = 4,
+        rpm: Optional[int] = None,
+        tpm: Optional[int] = None,
+        batch_size: int = 20,
+        compact: bool = True,
+        structured: bool = True
+    ) -> dict:
+        """
+        대상 ID를 확정하여 작업 생성 (재개 시에도 같은 대상 집합을 사용)
+
+        Args:
+            db: 데이터베이스 세션
+            gpt_model: 사용할 GPT 모델
+            ids / keyword / created_after / created_before / whisper_model: 대상 조건
+            only_missing: gpt_model로 만든 요약이 아직 없는 레코드만
+            concurrency: GPT 동시 호출 수
+            rpm / tpm: 이 작업의 분당 요청/토큰 한도 (기본값: OPENAI_RPM / OPENAI_TPM)
+            batch_size: 한 트랜잭션에 저장할 요약 수
+            compact: GPT 전달 전 텍스트 압축 여부
+            structured: 주제/결정/액션 아이템을 구조화하여 함께 저장
+        """
+        transcript_ids = crud.select_transcript_ids(
+            db,
+            ids=ids,
+            keyword=keyword,
+            created_after=created_after,
+            created_before=created_before,
+            whisper_model=whisper_model,
+            without_summary_model=gpt_model if only_missing else None
+        )
+        job = {
+            "job_id": uuid.uuid4().hex[:12],
+            "gpt_model": gpt_model,
+            "transcript_ids": transcript_ids,
+            "options": {
+                "concurrency": concurrency,
+                "rpm": rpm,
+                "tpm": tpm,
+                "batch_size": batch_size,
+                "compact": compact,
+                "structured": structured,
+            },
+            "status": "pending",
+            "total": len(transcript_ids),
+            "completed": 0,
+            "failed": {},
+            "created_at": time.time(),
+        }
+        self._save(job)
+        open(self._path(job["job_id"], ".done"), "a").close()
+        print(f"일괄 재요약 작업 생성: {job['job_id']} ({len(transcript_ids)}건, {gpt_model})")
+        return job
+
+    def status(self, job_id: str) -> dict:
+        job = self.get(job_id)
+        job.pop("transcript_ids", None)
+        return job
+
+    def _prepare(self, transcript: str, segment_data: Optional[bytes], compact: bool):
+        """화자 라벨이 있으면 "[화자 N] ..." 형태로, 압축 옵션이면 압축 후 GPT 입력 생성"""
+        speaker_labeled = False
+        text = transcript
+        if segment_data:
+            segments = SegmentIndex(segment_data).segments()
+            if any(seg.get("speaker") for seg in segments):
+                speaker_labeled = True
+                text = format_speaker_transcript(segments)
+        if compact:
+            text, _ = compact_transcript(text)
+        return text, speaker_labeled
+
+    def run(
+        self,
+        job_id: str,
+        session_factory,
+        summarizer=None,
+        stop_event: Optional[threading.Event] = None,
+        on_saved: Optional[Callable[[int, dict], None]] = None,
+    ) -> dict:
+        """
+        작업 실행 (체크포인트에 없는 레코드만 처리)
+
+        Args:
+            job_id: 작업 ID
+            session_factory: DB 세션 생성 함수 (SessionLocal)
+            summarizer: GPTSummarizer (기본값: 작업 한도를 적용한 새 인스턴스)
+            stop_event: 설정되면 진행 중인 호출만 마치고 저장 후 중단
+            on_saved: 요약이 저장될 때마다 (Summary ID, 저장한 행)으로 호출 (예: 검색 인덱스 갱신)
+
+        Returns:
+            dict: 최종 작업 상태
+        """
+        job = self.get(job_id)
+        options = job["options"]
+        model = job["gpt_model"]
+        concurrency = max(1, options["concurrency"])
+        batch_size = max(1, options["batch_size"])
+
+        if summarizer is None:
+            from gpt_summarizer import GPTSummarizer
+            from openai_client import ModelRateLimiter
+
+            # 이 작업 전용 한도 (웹 요청과 별도의 버킷)
+            env_limiter = ModelRateLimiter.from_env()
+            custom = options["rpm"] or options["tpm"]
+            summarizer = GPTSummarizer(limiter=ModelRateLimiter(
+                default_rpm=options["rpm"] or env_limiter.default_rpm,
+                default_tpm=options["tpm"] or env_limiter.default_tpm,
+                max_concurrency=concurrency,
+                overrides=None if custom else env_limiter.overrides,
+            ))
+
+        done = self.done_ids(job_id)
+        pending = [tid for tid in job["transcript_ids"] if tid not in done]
+        job.update(status="running", completed=len(done), failed={}, started_at=time.time())
+        self._save(job)
+        print(f"일괄 재요약 시작: {job_id} (전체 {job['total']}건, 완료 {len(done)}건, 남은 {len(pending)}건)")
+
+        db = session_factory()
+        checkpoint = open(self._path(job_id, ".done"), "a", encoding="utf-8")
+        buffer = []
+        processed = 0
+        started = time.time()
+
+        def flush():
+            nonlocal processed
+            if not buffer:
+                return
+            summary_ids = crud.create_summary_records(db, [row for row, _ in buffer])
+            for (row, _), summary_id in zip(buffer, summary_ids):
+                checkpoint.write(f"{row['transcript_id']} {summary_id}\n")
+                if on_saved:
+                    on_saved(summary_id, row)
+            checkpoint.flush()
+            os.fsync(checkpoint.fileno())
+            processed += len(buffer)
+            buffer.clear()
+
+            elapsed = time.time() - started
+            usage = summarizer.chat.usage_summary()
+            job.update(
+                completed=len(done) + processed,
+                elapsed=elapsed,
+                throughput_per_min=processed / elapsed * 60 if elapsed else 0.0,
+                usage=usage["models"],
+                cost_usd=usage["cost_usd"],
+            )
+            self._save(job)
+            print(f"일괄 재요약 진행: {job['completed']}/{job['total']} ({job['throughput_per_min']:.1f}건/분, ${usage['cost_usd']:.4f})")
+
+        # 이 기능 이전에 만든 작업은 구조화하지 않음
+        structured = options.get("structured", False)
+
+        def summarize_one(transcript_id, transcript, segment_data, meeting_date):
+            text, speaker_labeled = self._prepare(transcript, segment_data, options["compact"])
+            call_start = time.time()
+            structure = None
+            if structured:
+                summary, structure = summarizer.summarize_structured(
+                    text, model=model, speaker_labeled=speaker_labeled, meeting_date=meeting_date
+                )
+            else:
+                summary = summarizer.summarize(text, model=model, speaker_labeled=speaker_labeled)
+            return {
+                "transcript_id": transcript_id,
+                "summary": summary,
+                "gpt_model": model,
+                "gpt_processing_time": time.time() - call_start,
+                "structure": structure,
+            }
+
+        def collect(finished):
+            for future in finished:
+                try:
+                    buffer.append((future.result(), future.transcript_id))
+                except Exception as e:
+                    print(f"재요약 실패 (Transcript ID: {future.transcript_id}): {str(e)}")
+                    job["failed"][str(future.transcript_id)] = str(e)
+
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+        in_flight = set()
+        try:
+            for offset in range(0, len(pending), batch_size):
+                if stop_event and stop_event.is_set():
+                    break
+                # 본문은 배치 단위로만 로드하여 메모리를 일정하게 유지
+                batch_ids = pending[offset:offset + batch_size]
+                dates = crud.get_transcript_dates(db, batch_ids) if structured else {}
+                for transcript_id, transcript, segment_data in crud.get_transcript_texts(db, batch_ids):
+                    future = executor.submit(
+                        profiled("gpt-bulk", summarize_one), transcript_id, transcript, segment_data, dates.get(transcript_id)
+                    )
+                    future.transcript_id = transcript_id
+                    in_flight.add(future)
+
+                # 진행 중인 호출이 동시 호출 수의 2배를 넘지 않도록 대기
+                while len(in_flight) > concurrency * 2 or (in_flight and offset + batch_size >= len(pending)):
+                    finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    collect(finished)
+                    if len(buffer) >= batch_size:
+                        flush()
+
+            # 중단 요청 시 이미 보낸 호출은 결과를 받아 저장
+            finished, in_flight = wait(in_flight)
+            collect(finished)
+            executor.shutdown()
+            flush()
+        except BaseException:
+            # 오류/Ctrl+C: 아직 시작하지 않은 GPT 호출은 취소하고 (비용 절감) 기다리지 않음
+            executor.shutdown(wait=False, cancel_futures=True)
+            try:
+                # 이미 끝난 호출의 결과는 저장하고 체크포인트를 남김 (--resume으로 재개)
+                collect([future for future in in_flight if future.done() and not future.cancelled()])
+                # flush 중 DB 오류였다면 세션이 실패 상태이므로 롤백 후 다시 시도
+                db.rollback()
+                flush()
+            finally:
+                job.update(status="interrupted", finished_at=time.time())
+                self._save(job)
+            raise
+        finally:
+            checkpoint.close()
+            db.close()
+
+        stopped = stop_event is not None and stop_event.is_set()
+        job.update(
+            status="stopped" if stopped else ("completed_with_errors" if job["failed"] else "completed"),
+            finished_at=time.time(),
+        )
+        self._save(job)
+        print(f"일괄 재요약 종료: {job_id} ({job['status']}, 완료 {job['completed']}건, 실패 {len(job['failed'])}건)")
+        return self.status(job_id)
+
+
+def _parse_date(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="기존 STT 레코드 일괄 재요약")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--ids", help="대상 Transcript ID (쉼표 구분)")
+    target.add_argument("--keyword", help="파일명/내용 검색어")
+    target.add_argument("--all", action="store_true", help="전체 (또는 --after/--before 기간)")
+    target.add_argument("--resume", metavar="JOB_ID", help="중단된 작업 재개")
+    target.add_argument("--status", metavar="JOB_ID", help="작업 상태 조회")
+    parser.add_argument("--model", default="gpt-5-mini", help="GPT 모델 (기본값: gpt-5-mini)")
+    parser.add_argument("--after", help="이 시각 이후 생성된 레코드 (예: 2025-01-01)")
+    parser.add_argument("--before", help="이 시각 이전 생성된 레코드")
+    parser.add_argument("--whisper-model", help="특정 Whisper 모델로 변환된 레코드만")
+    parser.add_argument("--only-missing", action="store_true", help="--model로 만든 요약이 없는 레코드만")
+    parser.add_argument("--concurrency", type=int, default=4, help="GPT 동시 호출 수")
+    parser.add_argument("--rpm", type=int, help="분당 요청 한도")
+    parser.add_argument("--tpm", type=int, help="분당 토큰 한도")
+    parser.add_argument("--batch-size", type=int, default=20, help="트랜잭션당 저장 건수")
+    parser.add_argument("--no-compact", action="store_true", help="텍스트 압축 없이 원문 전달")
+    parser.add_argument("--no-structured", action="store_true", help="주제/결정/액션 아이템 구조화 없이 회의록만 저장")
+    parser.add_argument("--job-dir", default=DEFAULT_JOB_DIR, help="체크포인트 디렉토리")
+    args = parser.parse_args()
+
+    load_dotenv()
+    from database import SessionLocal
+
+    runner = BulkResummarizer(args.job_dir)
+    if args.status:
+        print(json.dumps(runner.status(args.status), ensure_ascii=False, indent=2))
+        return
+
+    if args.resume:
+        job_id = args.resume
+    else:
+        db = SessionLocal()
+        try:
+            job = runner.create_job(
+                db,
+                gpt_model=args.model,
+                ids=[int(i) for i in args.ids.split(",")] if args.ids else None,
+                keyword=args.keyword,
+                created_after=_parse_date(args.after),
+                created_before=_parse_date(args.before),
+                whisper_model=args.whisper_model,
+                only_missing=args.only_missing,
+                concurrency=args.concurrency,
+                rpm=args.rpm,
+                tpm=args.tpm,
+                batch_size=args.batch_size,
+                compact=not args.no_compact,
+                structured=not args.no_structured,
+            )
+        finally:
+            db.close()
+        job_id = job["job_id"]
+
+    try:
+        result = runner.run(job_id, SessionLocal)
+    except KeyboardInterrupt:
+        print(f"중단됨. 'python bulk_resummarize.py --resume {job_id}'로 이어서 실행할 수 있습니다.")
+        return
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+진행 중인 작업 취소 (클라이언트 연결 끊김 / DELETE /jobs/{id})
+
+브라우저 탭이 닫혀도 서버는 Whisper와 GPT 호출을 끝까지 실행하고 아무도 읽지 않을 파일과 DB 레코드를
+만들었습니다. 요청마다 CancelToken을 만들어 현재 컨텍스트(contextvars)에 연결하고, 파이프라인 곳곳에서
+협력적으로 확인합니다.
+
+- 이벤트 루프: 토큰이 취소되면 요청 태스크를 취소 → 대기/실행 중인 스케줄러 슬롯을 바로 반납하고
+  finally 블록에서 임시 파일 정리
+- 스레드(Whisper, GPT 호출 등): check()로 취소 여부를 확인하여 JobCancelled 발생,
+  add_callback()으로 등록한 함수(배치 윈도우 Future 취소, OpenAI 스트림 종료 등)는 취소 즉시 호출
+- run_in_threadpool은 컨텍스트를 복사하므로 스레드 안에서도 current()/check()로 같은 토큰을 봄
+"""
+import asyncio
+import contextvars
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional
+
+_current_token = contextvars.ContextVar("current_cancel_token", default=None)
+
+
+class JobCancelled(Exception):
+    """작업이 취소되어 더 진행하지 않음"""
+
+
+class CancelToken:
+    def __init__(self):
+        self._event = threading.Event()
+        self._callbacks: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+        self.reason = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, reason: str = "취소됨") -> bool:
+        """취소하고 등록된 콜백 실행 (이미 취소되었으면 False)"""
+        with self._lock:
+            if self._event.is_set():
+                return False
+            self.reason = reason
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"취소 콜백 오류: {str(e)}")
+        return True
+
+    def add_callback(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """
+        취소 시 호출할 함수 등록 (이미 취소되었으면 바로 호출)
+
+        Returns:
+            등록을 해제하는 함수 (작업이 정상적으로 끝나면 호출)
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._remove(callback)
+        callback()
+        return lambda: None
+
+    def _remove(self, callback):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def check(self):
+        if self._event.is_set():
+            raise JobCancelled(self.reason)
+
+    def wait(self, timeout: float) -> bool:
+        """최대 timeout초 대기 (취소되면 바로 True 반환)"""
+        return self._event.wait(timeout)
+
+
+def activate(token: Optional[CancelToken]):
+    """현재 컨텍스트(요청)에 토큰 연결, reset()용 토큰 반환"""
+    return _current_token.set(token)
+
+
+def reset(context_token):
+    _current_token.reset(context_token)
+
+
+def current() -> Optional[CancelToken]:
+    return _current_token.get()
+
+
+def check():
+    """현재 요청이 취소되었으면 JobCancelled (토큰이 없으면 아무것도 하지 않음)"""
+    token = _current_token.get()
+    if token is not None:
+        token.check()
+
+
+def sleep(seconds: float):
+    """time.sleep과 같지만 현재 요청이 취소되면 바로 깨어나 JobCancelled"""
+    token = _current_token.get()
+    if token is None:
+        time.sleep(seconds)
+        return
+    token.wait(seconds)
+    token.check()
+
+
+class Job:
+    """취소 가능한 요청 하나"""
+
+    def __init__(self, job_id: str, kind: str, client: str):
+        self.id = job_id
+        self.kind = kind
+        self.client = client
+        self.token = CancelToken()
+        self.started_at = time.time()
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "elapsed": round(time.time() - self.started_at, 1),
+            "cancelled": self.token.cancelled,
+            "cancel_reason": self.token.reason,
+        }
+
+
+class JobRegistry:
+    """진행 중인 취소 가능 작업 목록 (API 워커 프로세스마다 하나)"""
+
+    def __init__(self):
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self.stats = {"completed": 0, "cancelled": 0, "disconnected": 0}
+
+    def register(self, kind: str, client: str, job_id: Optional[str] = None) -> Job:
+        """
+        작업 등록 (job_id를 주지 않으면 생성)
+
+        클라이언트가 X-Job-Id로 ID를 미리 정해 보내면 응답을 기다리는 동안에도 DELETE /jobs/{id}로 취소할 수 있습니다.
+        """
+        job_id = job_id or uuid.uuid4().hex[:16]
+        with self._lock:
+            if job_id in self._jobs:
+                raise ValueError(f"이미 진행 중인 작업 ID입니다: {job_id}")
+            job = Job(job_id, kind, client)
+            self._jobs[job_id] = job
+        return job
+
+    def unregister(self, job: Job):
+        with self._lock:
+            self._jobs.pop(job.id, None)
+            if job.token.cancelled:
+                self.stats["cancelled"] += 1
+            else:
+                self.stats["completed"] += 1
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self, client: Optional[str] = None) -> List[dict]:
+        with self._lock:
+            jobs = [job for job in self._jobs.values() if client is None or job.client == client]
+        return [job.to_dict() for job in sorted(jobs, key=lambda job: job.started_at)]
+
+    def status(self) -> dict:
+        with self._lock:
+            running = len(self._jobs)
+        return {"running": running, **self.stats}
+
+
+async def watch_disconnect(request, job: Job, registry: JobRegistry, interval: float = 1.0):
+    """클라이언트 연결이 끊기면 작업 취소 (요청 처리가 끝나면 취소되는 백그라운드 태스크)"""
+    while not job.token.cancelled:
+        await asyncio.sleep(interval)
+        if await request.is_disconnected():
+            if job.token.cancel("클라이언트 연결 끊김"):
+                registry.stats["disconnected"] += 1
+                print(f"클라이언트 연결 끊김으로 작업 취소: {job.id} ({job.kind})")
+            return
@@ -1,9 +1,19 @@
 """
 CRUD (Create, Read, Update, Delete) 작업
 """
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
-from models import TranscriptRecord, SummaryRecord
-from typing import List, Optional
+from sqlalchemy.orm.attributes import set_committed_value
+from datetime import date, datetime, timedelta
+from archive import load_bundles
+from models import (
+    TranscriptRecord, SummaryRecord, SummaryChunkCache, RecordArchive, MeetingTopic, MeetingDecision, ActionItem
+)
+from segment_store import SegmentIndex, pack_segments
+from text_compression import search_signature, signature_may_contain, normalize_for_search
+from typing import Dict, Iterator, List, Optional
 
 
 # ========== TranscriptRecord CRUD ==========
@@ -15,14 +25,19 @@ def create_transcript_record(
     transcript: str,
     whisper_model: str = "base",
     audio_duration: Optional[float] = None,
-    stt_processing_time: Optional[float] = None
+    stt_processing_time: Optional[float] = None,
+    segments: Optional[List[dict]] = None,
+    audio_hash: Optional[str] = None
 ) -> TranscriptRecord:
-    """새 STT 변환 레코드 생성"""
+    """새 STT 변환 레코드 생성 (segments: Whisper 세그먼트 목록, 화자 라벨 선택)"""
     record = TranscriptRecord(
         filename=filename,
         file_size=file_size,
         audio_duration=audio_duration,
+        audio_hash=audio_hash,
         transcript=transcript,
+        search_signature=search_signature(transcript),
+        segment_data=pack_segments(segments) if segments is not None else None,
         whisper_model=whisper_model,
         stt_processing_time=stt_processing_time
     )
@@ -33,8 +48,38 @@ def create_transcript_record(
 
 
 def get_transcript_record(db: Session, transcript_id: int) -> Optional[TranscriptRecord]:
-    """특정 STT 레코드 조회"""
-    return db.query(TranscriptRecord).filter(TranscriptRecord.id == transcript_id).first()
+    """특정 STT 레코드 조회 (보관된 레코드는 보관본에서 본문을 채움)"""
+    record = db.query(TranscriptRecord).filter(TranscriptRecord.id == transcript_id).first()
+    return _fill_archived_transcripts(db, [record])[0] if record else None
+
+
+def get_transcript_segment_index(db: Session, transcript_id: int) -> Optional[SegmentIndex]:
+    """세그먼트 블롭만 조회하여 SegmentIndex로 반환 (transcript 본문은 로드하지 않음)"""
+    row = db.query(TranscriptRecord.segment_data, TranscriptRecord.archived_at).filter(
+        TranscriptRecord.id == transcript_id
+    ).first()
+    if row is None:
+        return None
+    blob = row.segment_data
+    if row.archived_at is not None:
+        bundle = load_bundles(db, [transcript_id]).get(transcript_id)
+        blob = bundle["segment_data"] if bundle else None
+    if not blob:
+        return None
+    return SegmentIndex(blob)
+
+
+def get_transcript_segments(
+    db: Session,
+    transcript_id: int,
+    start: Optional[float] = None,
+    end: Optional[float] = None
+) -> Optional[List[dict]]:
+    """특정 STT 레코드의 세그먼트 조회 (start/end 초 구간과 겹치는 것만, 없으면 None)"""
+    index = get_transcript_segment_index(db, transcript_id)
+    if index is None:
+        return None
+    return index.range(start, end)
 
 
 def get_all_transcript_records(
@@ -43,15 +88,18 @@ def get_all_transcript_records(
     limit: int = 100
 ) -> List[TranscriptRecord]:
     """모든 STT 레코드 조회 (페이지네이션)"""
-    return db.query(TranscriptRecord).order_by(
+    records = db.query(TranscriptRecord).order_by(
         TranscriptRecord.created_at.desc()
     ).offset(skip).limit(limit).all()
+    return _fill_archived_transcripts(db, records)
 
 
 def delete_transcript_record(db: Session, transcript_id: int) -> bool:
-    """STT 레코드 삭제 (cascade로 관련 summary도 삭제됨)"""
+    """STT 레코드 삭제 (cascade로 관련 summary도 삭제됨, 보관본도 함께 삭제)"""
     record = db.query(TranscriptRecord).filter(TranscriptRecord.id == transcript_id).first()
     if record:
+        if record.archived_at is not None:
+            db.query(RecordArchive).filter(RecordArchive.transcript_id == transcript_id).delete()
         db.delete(record)
         db.commit()
         return True
@@ -64,12 +112,99 @@ def search_transcript_records(
     skip: int = 0,
     limit: int = 100
 ) -> List[TranscriptRecord]:
-    """키워드로 STT 레코드 검색 (파일명 또는 내용)"""
-    search_pattern = f"%{keyword}%"
-    return db.query(TranscriptRecord).filter(
-        (TranscriptRecord.filename.ilike(search_pattern)) |
-        (TranscriptRecord.transcript.ilike(search_pattern))
-    ).order_by(TranscriptRecord.created_at.desc()).offset(skip).limit(limit).all()
+    """키워드로 STT 레코드 검색 (파일명 또는 내용, 보관된 레코드는 보관본으로 확인)"""
+    query = db.query(TranscriptRecord.id, TranscriptRecord.search_signature, TranscriptRecord.filename).order_by(
+        TranscriptRecord.created_at.desc(), TranscriptRecord.id.desc()
+    )
+    ids = _take(_keyword_matches(query, keyword, lambda ids: _transcript_text_map(db, ids)), skip, limit)
+    return _fill_archived_transcripts(db, _load_in_order(db, TranscriptRecord, ids))
+
+
+def get_stt_speed_ratios(db: Session, days: int = 30, min_samples: int = 3) -> Dict[str, float]:
+    """
+    Whisper 모델별 평균 처리 속도 비율 (stt_processing_time / audio_duration)
+    레코드의 whisper_model은 실제로 실행한 모델이므로 같은 모델 이력끼리만 묶임
+
+    Args:
+        days: 최근 며칠 동안의 레코드만 사용 (하드웨어/설정 변경 반영)
+        min_samples: 이보다 적은 모델은 제외
+
+    Returns:
+        dict: {whisper_model: 비율}, 모든 모델 평균은 "*" 키
+    """
+    ratio = TranscriptRecord.stt_processing_time / TranscriptRecord.audio_duration
+    since = datetime.now() - timedelta(days=days)
+    rows = db.query(
+        TranscriptRecord.whisper_model, func.avg(ratio), func.count(TranscriptRecord.id)
+    ).filter(
+        TranscriptRecord.audio_duration > 0,
+        TranscriptRecord.stt_processing_time.isnot(None),
+        TranscriptRecord.created_at >= since
+    ).group_by(TranscriptRecord.whisper_model).all()
+
+    ratios = {model: float(avg) for model, avg, count in rows if count >= min_samples}
+    total = sum(count for _, _, count in rows)
+    if total >= min_samples:
+        ratios["*"] = sum(float(avg) * count for _, avg, count in rows) / total
+    return ratios
+
+
+def select_transcript_ids(
+    db: Session,
+    ids: Optional[List[int]] = None,
+    keyword: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    whisper_model: Optional[str] = None,
+    without_summary_model: Optional[str] = None
+) -> List[int]:
+    """
+    조건에 맞는 STT 레코드 ID만 조회 (본문은 로드하지 않음, ID 오름차순)
+
+    Args:
+        ids: 대상 ID 목록 (None이면 전체)
+        keyword: 파일명 또는 내용 검색어
+        created_after / created_before: 생성 시각 범위
+        whisper_model: 특정 Whisper 모델로 변환된 레코드만
+        without_summary_model: 이 GPT 모델로 만든 요약이 아직 없는 레코드만
+    """
+    query = db.query(TranscriptRecord.id)
+    if ids is not None:
+        query = query.filter(TranscriptRecord.id.in_(ids))
+    if created_after:
+        query = query.filter(TranscriptRecord.created_at >= created_after)
+    if created_before:
+        query = query.filter(TranscriptRecord.created_at < created_before)
+    if whisper_model:
+        query = query.filter(TranscriptRecord.whisper_model == whisper_model)
+    if without_summary_model:
+        summarized = db.query(SummaryRecord.transcript_id).filter(SummaryRecord.gpt_model == without_summary_model)
+        query = query.filter(~TranscriptRecord.id.in_(summarized))
+    query = query.order_by(TranscriptRecord.id)
+    if keyword:
+        query = query.add_columns(TranscriptRecord.search_signature, TranscriptRecord.filename)
+        return list(_keyword_matches(query, keyword, lambda ids: _transcript_text_map(db, ids)))
+    return [row[0] for row in query.all()]
+
+
+def get_transcript_texts(db: Session, ids: List[int]) -> List[tuple]:
+    """여러 STT 레코드의 (id, transcript, segment_data)를 한 번의 쿼리로 조회 (보관된 레코드는 보관본에서)"""
+    rows = db.query(
+        TranscriptRecord.id, TranscriptRecord.transcript, TranscriptRecord.segment_data, TranscriptRecord.archived_at
+    ).filter(TranscriptRecord.id.in_(ids)).order_by(TranscriptRecord.id).all()
+    bundles = load_bundles(db, [row.id for row in rows if row.archived_at is not None])
+    texts = []
+    for record_id, transcript, segment_data, _ in rows:
+        if record_id in bundles:
+            transcript, segment_data = bundles[record_id]["transcript"], bundles[record_id]["segment_data"]
+        texts.append((record_id, transcript, segment_data))
+    return texts
+
+
+def get_transcript_dates(db: Session, ids: List[int]) -> Dict[int, date]:
+    """여러 STT 레코드의 회의 날짜 (생성 시각 기준, 본문은 로드하지 않음)"""
+    rows = db.query(TranscriptRecord.id, TranscriptRecord.created_at).filter(TranscriptRecord.id.in_(ids)).all()
+    return {record_id: created_at.date() for record_id, created_at in rows if created_at}
 
 
 # ========== SummaryRecord CRUD ==========
@@ -79,24 +214,56 @@ def create_summary_record(
     transcript_id: int,
     summary: str,
     gpt_model: str,
-    gpt_processing_time: Optional[float] = None
+    gpt_processing_time: Optional[float] = None,
+    structure: Optional[dict] = None
 ) -> SummaryRecord:
-    """새 GPT 요약 레코드 생성"""
+    """새 GPT 요약 레코드 생성 (structure: 주제/결정/액션 아이템, 같은 트랜잭션으로 저장)"""
     record = SummaryRecord(
         transcript_id=transcript_id,
         summary=summary,
+        search_signature=search_signature(summary),
         gpt_model=gpt_model,
         gpt_processing_time=gpt_processing_time
     )
     db.add(record)
+    if structure is not None:
+        db.flush()
+        save_summary_structure(db, record, structure)
     db.commit()
     db.refresh(record)
     return record
 
 
+def create_summary_records(db: Session, rows: List[dict]) -> List[int]:
+    """
+    GPT 요약 레코드 여러 개를 한 트랜잭션으로 생성
+
+    Args:
+        rows: [{"transcript_id", "summary", "gpt_model", "gpt_processing_time"[, "structure"]}, ...]
+
+    Returns:
+        list: 생성된 SummaryRecord ID (rows 순서)
+    """
+    records = [
+        SummaryRecord(search_signature=search_signature(row["summary"]),
+                      **{key: value for key, value in row.items() if key != "structure"})
+        for row in rows
+    ]
+    db.add_all(records)
+    # commit 후에는 레코드가 만료되어 id 접근마다 SELECT가 나가므로 flush 시점에 ID를 읽어 둠
+    db.flush()
+    record_ids = [record.id for record in records]
+    for record, row in zip(records, rows):
+        if row.get("structure") is not None:
+            save_summary_structure(db, record, row["structure"])
+    db.commit()
+    return record_ids
+
+
 def get_summary_record(db: Session, summary_id: int) -> Optional[SummaryRecord]:
-    """특정 요약 레코드 조회"""
-    return db.query(SummaryRecord).filter(SummaryRecord.id == summary_id).first()
+    """특정 요약 레코드 조회 (보관된 레코드는 보관본에서 본문을 채움)"""
+    record = db.query(SummaryRecord).filter(SummaryRecord.id == summary_id).first()
+    return _fill_archived_summaries(db, [record])[0] if record else None
 
 
 def get_summaries_by_transcript(
@@ -104,9 +271,65 @@ def get_summaries_by_transcript(
     transcript_id: int
 ) -> List[SummaryRecord]:
     """특정 STT 레코드에 대한 모든 요약 조회"""
-    return db.query(SummaryRecord).filter(
+    records = db.query(SummaryRecord).filter(
         SummaryRecord.transcript_id == transcript_id
     ).order_by(SummaryRecord.created_at.desc()).all()
+    return _fill_archived_summaries(db, records)
+
+
+def get_summary_ids_by_transcript(db: Session, transcript_id: int) -> List[int]:
+    """특정 STT 레코드에 대한 요약 ID 목록 (본문은 로드하지 않음)"""
+    rows = db.query(SummaryRecord.id).filter(SummaryRecord.transcript_id == transcript_id).all()
+    return [summary_id for (summary_id,) in rows]
+
+
+def get_summary_version(db: Session, transcript_id: int) -> tuple:
+    """
+    특정 STT 레코드의 요약 목록 버전 (개수, 최대 ID, 최근 구조화 시각, 최근 보관 시각, 보관 수)
+
+    요약 본문은 수정되지 않지만 구조화 백필/보관 CLI가 structured_at, archived_at을 바꾸므로 함께 비교합니다.
+    본문을 읽지 않는 집계 쿼리라 응답 캐시 검증에 사용합니다.
+    """
+    count, max_id, structured_at, archived_at, archived = db.query(
+        func.count(SummaryRecord.id),
+        func.max(SummaryRecord.id),
+        func.max(SummaryRecord.structured_at),
+        func.max(SummaryRecord.archived_at),
+        func.count(SummaryRecord.archived_at)
+    ).filter(SummaryRecord.transcript_id == transcript_id).one()
+    return count, max_id or 0, structured_at, archived_at, archived
+
+
+def get_transcript_record_version(db: Session, transcript_id: int) -> Optional[tuple]:
+    """
+    특정 STT 레코드의 응답 캐시 버전 (보관 시각), 레코드가 없으면 None
+
+    본문은 수정되지 않고 보관/복원 시에만 archived_at이 바뀌므로 이 값만 비교하면 됩니다.
+    """
+    row = db.query(TranscriptRecord.archived_at).filter(TranscriptRecord.id == transcript_id).first()
+    return tuple(row) if row is not None else None
+
+
+def get_summary_record_version(db: Session, summary_id: int) -> Optional[tuple]:
+    """특정 요약 레코드의 응답 캐시 버전 (보관 시각, 구조화 시각), 레코드가 없으면 None"""
+    row = db.query(SummaryRecord.archived_at, SummaryRecord.structured_at).filter(
+        SummaryRecord.id == summary_id
+    ).first()
+    return tuple(row) if row is not None else None
+
+
+def get_summary_texts(db: Session, ids: List[int]) -> List[tuple]:
+    """여러 요약 레코드의 (id, transcript_id, summary)를 한 번의 쿼리로 조회 (보관된 레코드는 보관본에서)"""
+    rows = db.query(
+        SummaryRecord.id, SummaryRecord.transcript_id, SummaryRecord.summary, SummaryRecord.archived_at
+    ).filter(SummaryRecord.id.in_(ids)).order_by(SummaryRecord.id).all()
+    bundles = load_bundles(db, [row.transcript_id for row in rows if row.archived_at is not None])
+    texts = []
+    for record_id, transcript_id, summary, archived_at in rows:
+        if archived_at is not None and transcript_id in bundles:
+            summary = bundles[transcript_id]["summaries"].get(record_id, summary)
+        texts.append((record_id, transcript_id, summary))
+    return texts
 
 
 def get_all_summary_records(
@@ -115,16 +338,21 @@ def get_all_summary_records(
     limit: int = 100
 ) -> List[SummaryRecord]:
     """모든 요약 레코드 조회 (페이지네이션)"""
-    return db.query(SummaryRecord).order_by(
+    records = db.query(SummaryRecord).order_by(
         SummaryRecord.created_at.desc()
     ).offset(skip).limit(limit).all()
+    return _fill_archived_summaries(db, records)
 
 
 def delete_summary_record(db: Session, summary_id: int) -> bool:
-    """요약 레코드 삭제"""
+    """요약 레코드 삭제 (구조화 항목도 삭제되고, 같은 회의의 이전 요약 항목이 최신이 됨)"""
     record = db.query(SummaryRecord).filter(SummaryRecord.id == summary_id).first()
     if record:
+        transcript_id, structured = record.transcript_id, record.structured_at is not None
         db.delete(record)
+        if structured:
+            db.flush()
+            _refresh_current_structure(db, transcript_id)
         db.commit()
         return True
     return False
@@ -136,8 +364,325 @@ def search_summary_records(
     skip: int = 0,
     limit: int = 100
 ) -> List[SummaryRecord]:
-    """키워드로 요약 레코드 검색"""
-    search_pattern = f"%{keyword}%"
-    return db.query(SummaryRecord).filter(
-        SummaryRecord.summary.ilike(search_pattern)
-    ).order_by(SummaryRecord.created_at.desc()).offset(skip).limit(limit).all()
+    """키워드로 요약 레코드 검색 (보관된 레코드는 보관본으로 확인)"""
+    query = db.query(SummaryRecord.id, SummaryRecord.search_signature).order_by(
+        SummaryRecord.created_at.desc(), SummaryRecord.id.desc()
+    )
+    ids = _take(_keyword_matches(query, keyword, lambda ids: _summary_text_map(db, ids)), skip, limit)
+    return _fill_archived_summaries(db, _load_in_order(db, SummaryRecord, ids))
+
+
+# ========== 구조화된 회의록 (주제/결정/액션 아이템) ==========
+
+_STRUCTURE_MODELS = (MeetingTopic, MeetingDecision, ActionItem)
+
+
+def save_summary_structure(db: Session, summary: SummaryRecord, structure: dict):
+    """
+    요약에서 추출한 주제/결정/액션 아이템을 행으로 추가 (커밋은 호출하는 쪽에서)
+
+    회의의 최신 요약이면 이전 요약 항목의 is_current를 내리고, 이전에 완료 처리한 할 일과 내용이 같은
+    액션 아이템은 완료 상태를 이어받습니다. 더 최근 요약이 이미 구조화되어 있으면(백필) 이전 항목으로만 저장합니다.
+
+    Args:
+        summary: ID가 할당된(flush된) SummaryRecord
+        structure: gpt_summarizer.normalize_structure 형식
+    """
+    db.flush()
+    newer = db.query(SummaryRecord.id).filter(
+        SummaryRecord.transcript_id == summary.transcript_id,
+        SummaryRecord.id > summary.id,
+        SummaryRecord.structured_at.isnot(None)
+    ).first()
+    is_current = newer is None
+
+    completed = {}
+    if is_current:
+        rows = db.query(ActionItem.task, ActionItem.completed_at).filter(
+            ActionItem.transcript_id == summary.transcript_id,
+            ActionItem.is_current.is_(True),
+            ActionItem.status == "done"
+        ).all()
+        completed = {normalize_for_search(task): completed_at for task, completed_at in rows}
+        for model in _STRUCTURE_MODELS:
+            db.query(model).filter(
+                model.transcript_id == summary.transcript_id, model.is_current.is_(True)
+            ).update({"is_current": False}, synchronize_session=False)
+
+    keys = {"summary_id": summary.id, "transcript_id": summary.transcript_id, "is_current": is_current}
+    db.add_all([MeetingTopic(position=i, title=title, **keys) for i, title in enumerate(structure["topics"])])
+    db.add_all([MeetingDecision(position=i, text=text, **keys) for i, text in enumerate(structure["decisions"])])
+    for i, item in enumerate(structure["action_items"]):
+        completed_at = completed.get(normalize_for_search(item["task"]))
+        db.add(ActionItem(
+            position=i,
+            task=item["task"],
+            owner=item["owner"],
+            team=item["team"],
+            due_date=date.fromisoformat(item["due_date"]) if item["due_date"] else None,
+            status="done" if completed_at else "open",
+            completed_at=completed_at,
+            **keys
+        ))
+    summary.structured_at = func.now()
+
+
+def _refresh_current_structure(db: Session, transcript_id: int):
+    """회의의 가장 최근 구조화 요약 항목만 is_current로 표시 (요약 삭제 후)"""
+    latest = db.query(func.max(SummaryRecord.id)).filter(
+        SummaryRecord.transcript_id == transcript_id, SummaryRecord.structured_at.isnot(None)
+    ).scalar()
+    for model in _STRUCTURE_MODELS:
+        db.query(model).filter(model.transcript_id == transcript_id).update(
+            {"is_current": model.summary_id == latest}, synchronize_session=False
+        )
+
+
+def get_summary_structure(db: Session, summary_id: int) -> Optional[dict]:
+    """특정 요약의 주제/결정/액션 아이템 (요약이 없으면 None, 구조화 전이면 structured_at이 None)"""
+    summary = db.query(SummaryRecord.transcript_id, SummaryRecord.structured_at).filter(
+        SummaryRecord.id == summary_id
+    ).first()
+    if summary is None:
+        return None
+    topics = db.query(MeetingTopic.title).filter(MeetingTopic.summary_id == summary_id).order_by(MeetingTopic.position)
+    decisions = db.query(MeetingDecision.text).filter(MeetingDecision.summary_id == summary_id).order_by(MeetingDecision.position)
+    return {
+        "summary_id": summary_id,
+        "transcript_id": summary.transcript_id,
+        "structured_at": summary.structured_at,
+        "topics": [title for (title,) in topics],
+        "decisions": [text for (text,) in decisions],
+        "action_items": db.query(ActionItem).filter(ActionItem.summary_id == summary_id).order_by(ActionItem.position).all(),
+    }
+
+
+def get_unstructured_summary_ids(db: Session, limit: int = 1000, after_id: int = 0) -> List[int]:
+    """구조화되지 않은 요약 ID (구조화 이전에 만든 요약 백필용, ID 오름차순)"""
+    rows = db.query(SummaryRecord.id).filter(
+        SummaryRecord.structured_at.is_(None), SummaryRecord.id > after_id
+    ).order_by(SummaryRecord.id).limit(limit).all()
+    return [summary_id for (summary_id,) in rows]
+
+
+def get_action_items(
+    db: Session,
+    team: Optional[str] = None,
+    owner: Optional[str] = None,
+    status: Optional[str] = "open",
+    transcript_id: Optional[int] = None,
+    due_before: Optional[date] = None,
+    include_history: bool = False,
+    skip: int = 0,
+    limit: int = 100
+) -> List[ActionItem]:
+    """
+    회의를 가로지르는 액션 아이템 조회 (기한순, 기한 없는 항목은 뒤로)
+
+    Args:
+        team / owner: 담당 팀 / 담당자 (정확히 일치)
+        status: "open", "done" (None이면 전체)
+        transcript_id: 특정 회의만
+        due_before: 이 날짜 이전 기한만 (기한 없는 항목 제외)
+        include_history: 같은 회의의 이전 요약 항목도 포함
+    """
+    query = db.query(ActionItem)
+    if not include_history:
+        query = query.filter(ActionItem.is_current.is_(True))
+    if status:
+        query = query.filter(ActionItem.status == status)
+    if team:
+        query = query.filter(ActionItem.team == team)
+    if owner:
+        query = query.filter(ActionItem.owner == owner)
+    if transcript_id is not None:
+        query = query.filter(ActionItem.transcript_id == transcript_id)
+    if due_before:
+        query = query.filter(ActionItem.due_date < due_before)
+    return query.order_by(
+        ActionItem.due_date.is_(None), ActionItem.due_date, ActionItem.id
+    ).offset(skip).limit(limit).all()
+
+
+def update_action_item_status(db: Session, item_id: int, status: str) -> Optional[ActionItem]:
+    """액션 아이템 진행 상태 변경 ("open" | "done")"""
+    item = db.query(ActionItem).filter(ActionItem.id == item_id).first()
+    if item:
+        item.status = status
+        item.completed_at = func.now() if status == "done" else None
+        db.commit()
+        db.refresh(item)
+    return item
+
+
+def search_decisions(
+    db: Session,
+    keyword: Optional[str] = None,
+    transcript_id: Optional[int] = None,
+    skip: int = 0,
+    limit: int = 100
+) -> List[MeetingDecision]:
+    """회의별 최신 요약의 결정 사항 조회 (keyword: 포함 검색, 최근 회의부터)"""
+    return _current_items(db, MeetingDecision, MeetingDecision.text, keyword, transcript_id, skip, limit)
+
+
+def search_topics(
+    db: Session,
+    keyword: Optional[str] = None,
+    transcript_id: Optional[int] = None,
+    skip: int = 0,
+    limit: int = 100
+) -> List[MeetingTopic]:
+    """회의별 최신 요약의 주제 조회 (keyword: 포함 검색, 최근 회의부터)"""
+    return _current_items(db, MeetingTopic, MeetingTopic.title, keyword, transcript_id, skip, limit)
+
+
+def _current_items(db: Session, model, text_column, keyword, transcript_id, skip: int, limit: int) -> list:
+    # 항목 텍스트는 짧은 비압축 컬럼이라 요약 본문 대신 이 테이블만 훑음
+    query = db.query(model).filter(model.is_current.is_(True))
+    if transcript_id is not None:
+        query = query.filter(model.transcript_id == transcript_id)
+    if keyword:
+        query = query.filter(text_column.ilike(f"%{keyword}%"))
+    return query.order_by(model.transcript_id.desc(), model.position).offset(skip).limit(limit).all()
+
+
+# ========== 보관된 기록 (archive.py) ==========
+
+def _fill_archived_transcripts(db: Session, records: List[TranscriptRecord]) -> List[TranscriptRecord]:
+    """
+    보관된(포인터) STT 레코드의 본문을 보관본에서 채움
+
+    set_committed_value로 설정하므로 세션이 변경으로 보지 않아 커밋해도 hot 테이블에 다시 쓰지 않습니다.
+    """
+    archived = [record for record in records if record.archived_at is not None]
+    bundles = load_bundles(db, [record.id for record in archived])
+    for record in archived:
+        if record.id in bundles:
+            set_committed_value(record, "transcript", bundles[record.id]["transcript"])
+    return records
+
+
+def _fill_archived_summaries(db: Session, records: List[SummaryRecord]) -> List[SummaryRecord]:
+    """보관된(포인터) 요약 레코드의 본문을 보관본에서 채움"""
+    archived = [record for record in records if record.archived_at is not None]
+    bundles = load_bundles(db, [record.transcript_id for record in archived])
+    for record in archived:
+        summary = bundles.get(record.transcript_id, {}).get("summaries", {}).get(record.id)
+        if summary is not None:
+            set_committed_value(record, "summary", summary)
+    return records
+
+
+# ========== 압축된 본문 검색 ==========
+
+def _transcript_text_map(db: Session, ids: List[int]) -> Dict[int, str]:
+    return {record_id: transcript for record_id, transcript, _ in get_transcript_texts(db, ids)}
+
+
+def _summary_text_map(db: Session, ids: List[int]) -> Dict[int, str]:
+    return {record_id: summary for record_id, _, summary in get_summary_texts(db, ids)}
+
+
+def _keyword_matches(query, keyword: str, load_texts, batch_size: int = 50) -> Iterator[int]:
+    """
+    query 순서대로 keyword가 포함된 레코드 ID 반환 (대소문자/공백 차이 무시)
+
+    본문은 압축되어 있어 DB에서 LIKE로 찾을 수 없으므로, (id, search_signature[, filename]) 행을 훑으며
+    블룸 필터를 통과한 후보만 batch_size개씩 load_texts(ids) -> {id: 본문}으로 풀어 확인합니다
+    (보관된 포인터 행도 시그니처를 유지하므로 후보만 보관본에서 읽음).
+    search_signature가 없는 행(마이그레이션 전)은 항상 후보로 봅니다.
+    """
+    needle = normalize_for_search(keyword)
+    pending = []
+
+    def flush():
+        to_check = [record_id for record_id, matched in pending if not matched]
+        texts = load_texts(to_check) if to_check else {}
+        for record_id, matched in pending:
+            if matched or needle in normalize_for_search(texts.get(record_id)):
+                yield record_id
+        pending.clear()
+
+    for row in query.yield_per(500):
+        filename = row[2] if len(row) > 2 else None
+        if filename and needle in normalize_for_search(filename):
+            pending.append((row[0], True))
+        elif row[1] is None or signature_may_contain(row[1], needle):
+            pending.append((row[0], False))
+        else:
+            continue
+        if len(pending) >= batch_size:
+            yield from flush()
+    yield from flush()
+
+
+def _take(ids: Iterator[int], skip: int, limit: int) -> List[int]:
+    """skip개를 건너뛰고 limit개만 (필요한 만큼만 검색을 진행)"""
+    taken = []
+    for index, record_id in enumerate(ids):
+        if index < skip:
+            continue
+        taken.append(record_id)
+        if len(taken) >= limit:
+            break
+    return taken
+
+
+def _load_in_order(db: Session, model, ids: List[int]) -> list:
+    if not ids:
+        return []
+    records = {record.id: record for record in db.query(model).filter(model.id.in_(ids)).all()}
+    return [records[record_id] for record_id in ids if record_id in records]
+
+
+# ========== SummaryChunkCache (증분 재요약) ==========
+
+# 키가 겹치는 행을 건너뛰는 INSERT ... ON CONFLICT DO NOTHING을 지원하는 DB
+_ON_CONFLICT_INSERT = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+class ChunkSummaryCache:
+    """GPTSummarizer.summarize_incremental에 전달하는 DB 기반 청크 요약 캐시"""
+
+    def __init__(self, db: Session, prompt_version: str):
+        self.db = db
+        self.prompt_version = prompt_version
+
+    def get_many(self, hashes: List[str], gpt_model: str) -> Dict[str, str]:
+        """해시 목록 중 캐시에 있는 청크 요약 조회"""
+        if not hashes:
+            return {}
+        rows = self.db.query(SummaryChunkCache.content_hash, SummaryChunkCache.partial_summary).filter(
+            SummaryChunkCache.content_hash.in_(set(hashes)),
+            SummaryChunkCache.gpt_model == gpt_model,
+            SummaryChunkCache.prompt_version == self.prompt_version
+        ).all()
+        return {row.content_hash: row.partial_summary for row in rows}
+
+    def put_many(self, summaries: Dict[str, str], gpt_model: str):
+        """
+        새로 만든 청크 요약 저장 (한 번에 커밋)
+
+        같은 회의를 동시에 요약한 요청이 먼저 같은 청크를 저장했을 수 있으므로 키가 겹치면 건너뛰고,
+        캐시 저장 실패는 요청 실패로 이어지지 않도록 롤백 후 무시합니다 (GPT 호출은 이미 끝난 상태).
+        """
+        if not summaries:
+            return
+        rows = [{
+            "content_hash": content_hash,
+            "gpt_model": gpt_model,
+            "prompt_version": self.prompt_version,
+            "partial_summary": partial_summary
+        } for content_hash, partial_summary in summaries.items()]
+        dialect = self.db.get_bind().dialect.name
+        try:
+            if dialect in _ON_CONFLICT_INSERT:
+                self.db.execute(_ON_CONFLICT_INSERT[dialect](SummaryChunkCache).on_conflict_do_nothing(), rows)
+            else:
+                existing = self.get_many(list(summaries), gpt_model)
+                self.db.add_all([SummaryChunkCache(**row) for row in rows if row["content_hash"] not in existing])
+            self.db.commit()
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            print(f"청크 요약 캐시 저장 건너뜀: {str(e)}")
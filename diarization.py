@@ -0,0 +1,205 @@
+"""
+화자 분리 (Speaker Diarization) 모듈
+
+pyannote.audio 파이프라인으로 "누가 언제 말했는지"를 구하고,
+Whisper 세그먼트에 화자 라벨을 붙입니다.
+pyannote.audio는 선택 의존성이며 DIARIZATION_ENABLED=true일 때만 로드됩니다.
+
+torch 스레드 수는 프로세스 전체 설정이라 같은 프로세스의 Whisper까지 줄어들므로,
+파이프라인은 별도 워커 프로세스(spawn)에 로드하고 그 프로세스에서만 스레드 수를 제한합니다.
+"""
+import importlib.util
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+import numpy as np
+from dotenv import load_dotenv
+
+# 워커 프로세스에 로드된 파이프라인
+_pipeline = None
+
+
+def _init_worker(model_name: str, hf_token: str, num_threads: int):
+    """워커 프로세스 초기화: 이 프로세스에서만 torch 스레드 수를 제한하고 파이프라인 로드"""
+    global _pipeline
+    import torch
+    from pyannote.audio import Pipeline
+
+    torch.set_num_threads(num_threads)
+    _pipeline = Pipeline.from_pretrained(model_name, use_auth_token=hf_token)
+    if torch.cuda.is_available():
+        _pipeline.to(torch.device("cuda"))
+
+
+def _audio_payload(audio):
+    """파일 경로 / 메모리 맵은 경로만, 일반 배열은 bytes로 워커에 전달 (긴 회의의 PCM 복사 방지)"""
+    if isinstance(audio, str):
+        return {"path": os.path.abspath(audio)}
+    if isinstance(audio, np.memmap) and audio.filename:
+        return {"pcm_path": audio.filename}
+    return {"pcm": np.ascontiguousarray(audio, dtype=np.float32).tobytes()}
+
+
+def _diarize_in_worker(payload: dict, min_speakers: Optional[int], max_speakers: Optional[int]) -> List[dict]:
+    import torch
+    import whisper
+
+    if "path" in payload:
+        # mp3/m4a 등도 처리할 수 있도록 Whisper와 동일하게 ffmpeg로 16kHz mono 디코딩
+        audio = whisper.load_audio(payload["path"])
+    elif "pcm_path" in payload:
+        audio = np.memmap(payload["pcm_path"], dtype=np.float32, mode="c")
+    else:
+        audio = np.frombuffer(payload["pcm"], dtype=np.float32).copy()
+    waveform = torch.from_numpy(np.asarray(audio)).unsqueeze(0)
+
+    diarization = _pipeline(
+        {"waveform": waveform, "sample_rate": whisper.audio.SAMPLE_RATE},
+        min_speakers=min_speakers,
+        max_speakers=max_speakers,
+    )
+
+    # pyannote 라벨(SPEAKER_00 등)을 등장 순서대로 "화자 1", "화자 2"로 변환
+    labels = {}
+    turns = []
+    for turn, _, label in diarization.itertracks(yield_label=True):
+        if label not in labels:
+            labels[label] = f"화자 {len(labels) + 1}"
+        turns.append({"start": turn.start, "end": turn.end, "speaker": labels[label]})
+    return turns
+
+
+class SpeakerDiarizer:
+    def __init__(
+        self,
+        model_name: str = "pyannote/speaker-diarization-3.1",
+        num_threads: Optional[int] = None,
+        min_speakers: Optional[int] = None,
+        max_speakers: Optional[int] = None,
+    ):
+        """
+        pyannote 화자 분리 파이프라인을 초기화합니다.
+        기본값은 CPU 환경 기준입니다 (GPU가 있으면 자동으로 사용).
+
+        Args:
+            model_name: Hugging Face 파이프라인 이름
+            num_threads: 워커 프로세스의 torch CPU 스레드 수 (기본값: 코어 수의 절반, Whisper와 나눠 씀)
+            min_speakers: 최소 화자 수 (알고 있다면 지정 시 정확도/속도 향상)
+            max_speakers: 최대 화자 수
+        """
+        load_dotenv()
+        # 설치 여부만 확인 (모델은 워커 프로세스에서 로드)
+        if importlib.util.find_spec("pyannote") is None or importlib.util.find_spec("pyannote.audio") is None:
+            raise ImportError(
+                "화자 분리를 사용하려면 pyannote.audio가 필요합니다. "
+                "pip install pyannote.audio 로 설치해주세요."
+            )
+
+        hf_token = os.getenv("HUGGINGFACE_TOKEN")
+        if not hf_token:
+            raise ValueError(
+                "HUGGINGFACE_TOKEN이 설정되지 않았습니다. "
+                ".env 파일에 Hugging Face 토큰을 추가해주세요."
+            )
+
+        # STT와 병렬로 돌기 때문에 CPU 코어를 모두 점유하지 않도록 워커 프로세스의 스레드만 제한
+        if num_threads is None:
+            num_threads = max(1, (os.cpu_count() or 2) // 2)
+
+        self.min_speakers = min_speakers
+        self.max_speakers = max_speakers
+
+        print(f"화자 분리 모델 로딩 중 ({model_name}, 워커 프로세스 스레드 {num_threads}개)...")
+        # fork는 torch/OpenMP 스레드 상태를 물려받아 멈출 수 있으므로 spawn 사용
+        self._executor = ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(model_name, hf_token, num_threads),
+        )
+        # 로딩 오류(토큰 권한 등)를 첫 요청이 아니라 시작 시점에 드러냄
+        self._executor.submit(os.getpid).result()
+        print("화자 분리 모델 로딩 완료!")
+
+    @classmethod
+    def from_env(cls):
+        """환경 변수(DIARIZATION_*)로 화자 분리기 생성"""
+        def _int_env(name):
+            value = os.getenv(name)
+            return int(value) if value else None
+
+        return cls(
+            model_name=os.getenv("DIARIZATION_MODEL", "pyannote/speaker-diarization-3.1"),
+            num_threads=_int_env("DIARIZATION_NUM_THREADS"),
+            min_speakers=_int_env("DIARIZATION_MIN_SPEAKERS"),
+            max_speakers=_int_env("DIARIZATION_MAX_SPEAKERS"),
+        )
+
+    def diarize(self, audio_file_path) -> List[dict]:
+        """
+        음성 파일의 화자 구간을 구합니다.
+
+        Args:
+            audio_file_path: 음성 파일 경로 또는 디코딩된 16kHz mono float32 배열
+
+        Returns:
+            list: [{"start": 초, "end": 초, "speaker": "화자 1"}, ...] (시간순)
+        """
+        if isinstance(audio_file_path, str) and not os.path.exists(audio_file_path):
+            raise FileNotFoundError(f"파일을 찾을 수 없습니다: {audio_file_path}")
+
+        print("화자 분리 중...")
+        return self._executor.submit(
+            _diarize_in_worker, _audio_payload(audio_file_path), self.min_speakers, self.max_speakers
+        ).result()
+
+    def shutdown(self):
+        """워커 프로세스 종료"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def assign_speakers(segments: List[dict], turns: List[dict]) -> List[dict]:
+    """
+    각 STT 세그먼트에 가장 많이 겹치는 화자 구간의 라벨을 붙입니다.
+
+    Args:
+        segments: [{"start", "end", "text"}, ...] STT 세그먼트
+        turns: diarize()가 반환한 화자 구간
+
+    Returns:
+        list: "speaker" 키가 추가된 세그먼트 (겹치는 화자가 없으면 None)
+    """
+    labeled = []
+    for segment in segments:
+        overlaps = {}
+        for turn in turns:
+            if turn["start"] >= segment["end"]:
+                break
+            overlap = min(segment["end"], turn["end"]) - max(segment["start"], turn["start"])
+            if overlap > 0:
+                overlaps[turn["speaker"]] = overlaps.get(turn["speaker"], 0.0) + overlap
+        speaker = max(overlaps, key=overlaps.get) if overlaps else None
+        labeled.append({**segment, "speaker": speaker})
+    return labeled
+
+
+def format_speaker_transcript(segments: List[dict]) -> str:
+    """
+    화자 라벨이 붙은 세그먼트를 "[화자 1] ..." 형태의 텍스트로 만듭니다.
+    같은 화자의 연속된 발화는 한 줄로 합칩니다.
+    """
+    lines = []
+    current_speaker = None
+    for segment in segments:
+        text = segment["text"].strip()
+        if not text:
+            continue
+        speaker = segment.get("speaker") or "화자 미상"
+        if speaker == current_speaker:
+            lines[-1] += " " + text
+        else:
+            lines.append(f"[{speaker}] {text}")
+            current_speaker = speaker
+    return "\n".join(lines)
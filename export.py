@@ -0,0 +1,265 @@
+"""
+회의 기록 일괄 내보내기 (NDJSON / ZIP 스트리밍)
+
+DB에서 서버 측 커서(yield_per + stream_results)로 레코드를 batch_size건씩 읽어
+바로 응답/파일로 흘려보내므로, 보관된 기록이 아무리 많아도 메모리 사용량이 일정합니다.
+
+- ndjson: 한 줄에 레코드 하나 (JSON)
+- zip: transcripts/<id>_<파일명>.txt, summaries/<id>_<모델>.txt 텍스트 파일 묶음
+       (ZIP은 중앙 디렉터리용으로 항목당 파일명 정도의 메타데이터만 메모리에 남음)
+
+실행:
+    python export.py transcripts --format ndjson -o transcripts.ndjson --after 2025-01-01
+    python export.py summaries --format zip -o summaries.zip --gpt-model gpt-5-mini
+    python export.py all --format zip -o archive.zip
+"""
+import argparse
+import io
+import json
+import re
+import zipfile
+from datetime import datetime
+from typing import Iterator, List, Optional
+
+from archive import load_bundles
+from models import TranscriptRecord, SummaryRecord
+
+EXPORT_KINDS = ("transcripts", "summaries", "all")
+EXPORT_FORMATS = ("ndjson", "zip")
+
+# 파일명에 쓸 수 없는 문자
+_UNSAFE_RE = re.compile(r"[^\w.\-가-힣]+")
+
+_TRANSCRIPT_COLUMNS = (
+    TranscriptRecord.id,
+    TranscriptRecord.filename,
+    TranscriptRecord.file_size,
+    TranscriptRecord.audio_duration,
+    TranscriptRecord.whisper_model,
+    TranscriptRecord.stt_processing_time,
+    TranscriptRecord.created_at,
+    TranscriptRecord.transcript,
+    TranscriptRecord.archived_at,
+)
+
+_SUMMARY_COLUMNS = (
+    SummaryRecord.id,
+    SummaryRecord.transcript_id,
+    SummaryRecord.gpt_model,
+    SummaryRecord.gpt_processing_time,
+    SummaryRecord.created_at,
+    SummaryRecord.summary,
+    SummaryRecord.archived_at,
+)
+
+
+def _row_dict(row) -> dict:
+    data = dict(row._mapping)
+    if data.get("created_at"):
+        data["created_at"] = data["created_at"].isoformat()
+    return data
+
+
+def _with_archived_bodies(db, rows, body_key: str, batch_size: int) -> Iterator[dict]:
+    """보관된(포인터) 레코드의 본문을 batch_size건마다 한 번의 쿼리로 보관본에서 채워 반환"""
+    batch = []
+    for row in rows:
+        batch.append(_row_dict(row))
+        if len(batch) >= batch_size:
+            yield from _fill_batch(db, batch, body_key)
+            batch = []
+    yield from _fill_batch(db, batch, body_key)
+
+
+def _fill_batch(db, records: List[dict], body_key: str) -> List[dict]:
+    archived = []
+    for record in records:
+        if record.pop("archived_at") is not None:
+            archived.append(record)
+    if not archived:
+        return records
+    id_key = "id" if body_key == "transcript" else "transcript_id"
+    bundles = load_bundles(db, [record[id_key] for record in archived])
+    for record in archived:
+        bundle = bundles.get(record[id_key])
+        if bundle is None:
+            continue
+        if body_key == "transcript":
+            record["transcript"] = bundle["transcript"]
+        else:
+            record["summary"] = bundle["summaries"].get(record["id"], record["summary"])
+    return records
+
+
+def iter_transcripts(
+    db,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    whisper_model: Optional[str] = None,
+    batch_size: int = 500
+) -> Iterator[dict]:
+    """STT 레코드를 ID 순으로 하나씩 반환 (ORM 객체/세그먼트 블롭은 로드하지 않음, 보관된 본문 포함)"""
+    query = db.query(*_TRANSCRIPT_COLUMNS)
+    if created_after:
+        query = query.filter(TranscriptRecord.created_at >= created_after)
+    if created_before:
+        query = query.filter(TranscriptRecord.created_at < created_before)
+    if whisper_model:
+        query = query.filter(TranscriptRecord.whisper_model == whisper_model)
+    query = query.order_by(TranscriptRecord.id).execution_options(stream_results=True).yield_per(batch_size)
+    yield from _with_archived_bodies(db, query, "transcript", batch_size)
+
+
+def iter_summaries(
+    db,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    gpt_model: Optional[str] = None,
+    batch_size: int = 500
+) -> Iterator[dict]:
+    """요약 레코드를 ID 순으로 하나씩 반환"""
+    query = db.query(*_SUMMARY_COLUMNS)
+    if created_after:
+        query = query.filter(SummaryRecord.created_at >= created_after)
+    if created_before:
+        query = query.filter(SummaryRecord.created_at < created_before)
+    if gpt_model:
+        query = query.filter(SummaryRecord.gpt_model == gpt_model)
+    query = query.order_by(SummaryRecord.id).execution_options(stream_results=True).yield_per(batch_size)
+    yield from _with_archived_bodies(db, query, "summary", batch_size)
+
+
+def iter_records(db, kind: str, filters: dict) -> Iterator[tuple]:
+    """("transcript" | "summary", 레코드) 순서로 반환"""
+    if kind in ("transcripts", "all"):
+        for record in iter_transcripts(
+            db,
+            created_after=filters.get("created_after"),
+            created_before=filters.get("created_before"),
+            whisper_model=filters.get("whisper_model"),
+        ):
+            yield "transcript", record
+    if kind in ("summaries", "all"):
+        for record in iter_summaries(
+            db,
+            created_after=filters.get("created_after"),
+            created_before=filters.get("created_before"),
+            gpt_model=filters.get("gpt_model"),
+        ):
+            yield "summary", record
+
+
+def stream_ndjson(db, kind: str, filters: dict, lines_per_chunk: int = 100) -> Iterator[bytes]:
+    """NDJSON 바이트 스트림 (lines_per_chunk 줄씩 묶어서 반환)"""
+    lines = []
+    for record_type, record in iter_records(db, kind, filters):
+        lines.append(json.dumps({"type": record_type, **record}, ensure_ascii=False))
+        if len(lines) >= lines_per_chunk:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+            lines = []
+    if lines:
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+class _ZipStream(io.RawIOBase):
+    """ZipFile이 쓴 바이트를 모아 두었다가 꺼내 가는 seek 불가 버퍼"""
+
+    def __init__(self):
+        self._chunks = []
+        self._offset = 0
+
+    def writable(self):
+        return True
+
+    def seekable(self):
+        return False
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._offset
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _entry_name(record_type: str, record: dict) -> str:
+    if record_type == "transcript":
+        base = _UNSAFE_RE.sub("_", record["filename"] or "")[:80]
+        return f"transcripts/{record['id']}_{base}.txt"
+    return f"summaries/{record['id']}_transcript{record['transcript_id']}_{record['gpt_model']}.txt"
+
+
+def stream_zip(db, kind: str, filters: dict) -> Iterator[bytes]:
+    """텍스트 파일 ZIP 바이트 스트림 (파일 하나를 쓸 때마다 압축된 바이트를 바로 반환)"""
+    buffer = _ZipStream()
+    with zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for record_type, record in iter_records(db, kind, filters):
+            body = record.pop("transcript", None) if record_type == "transcript" else record.pop("summary", None)
+            info = zipfile.ZipInfo(_entry_name(record_type, record))
+            info.compress_type = zipfile.ZIP_DEFLATED
+            with archive.open(info, mode="w") as entry:
+                # 파일 앞부분에 메타데이터를 주석처럼 남김
+                header = "".join(f"# {key}: {value}\n" for key, value in record.items())
+                entry.write((header + "\n" + (body or "")).encode("utf-8"))
+            data = buffer.drain()
+            if data:
+                yield data
+    # 중앙 디렉터리
+    data = buffer.drain()
+    if data:
+        yield data
+
+
+def stream_export(session_factory, kind: str, export_format: str, filters: dict) -> Iterator[bytes]:
+    """
+    내보내기 스트림 (응답이 끝날 때까지 전용 DB 세션을 유지)
+
+    Args:
+        session_factory: DB 세션 생성 함수 (SessionLocal)
+        kind: "transcripts", "summaries", "all"
+        export_format: "ndjson" 또는 "zip"
+        filters: created_after, created_before, whisper_model, gpt_model
+    """
+    db = session_factory()
+    try:
+        stream = stream_zip if export_format == "zip" else stream_ndjson
+        yield from stream(db, kind, filters)
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="회의 기록 내보내기")
+    parser.add_argument("kind", choices=EXPORT_KINDS, help="내보낼 대상")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="ndjson", help="출력 형식 (기본값: ndjson)")
+    parser.add_argument("-o", "--output", required=True, help="출력 파일 경로")
+    parser.add_argument("--after", help="이 시각 이후 생성된 레코드 (예: 2025-01-01)")
+    parser.add_argument("--before", help="이 시각 이전 생성된 레코드")
+    parser.add_argument("--whisper-model", help="Whisper 모델 필터 (transcripts)")
+    parser.add_argument("--gpt-model", help="GPT 모델 필터 (summaries)")
+    args = parser.parse_args()
+
+    from database import SessionLocal
+
+    filters = {
+        "created_after": datetime.fromisoformat(args.after) if args.after else None,
+        "created_before": datetime.fromisoformat(args.before) if args.before else None,
+        "whisper_model": args.whisper_model,
+        "gpt_model": args.gpt_model,
+    }
+    written = 0
+    with open(args.output, "wb") as f:
+        for chunk in stream_export(SessionLocal, args.kind, args.format, filters):
+            f.write(chunk)
+            written += len(chunk)
+    print(f"내보내기 완료: {args.output} ({written / 1024 ** 2:.1f}MB)")
+
+
+if __name__ == "__main__":
+    main()
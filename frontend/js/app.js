@@ -1,6 +1,11 @@
 // API 엔드포인트 설정
 const API_BASE_URL = 'http://localhost:8000';
 
+// 분할 업로드 설정
+const CHUNK_SIZE = 8 * 1024 * 1024; // 8MB
+const UPLOAD_CONCURRENCY = 4; // 동시에 전송할 청크 수
+const CHUNK_MAX_RETRIES = 3; // 실패한 청크 재전송 횟수
+
 // 전역 변수
 let selectedFile = null;
 let transcriptData = null;
@@ -204,26 +209,16 @@ async function handleConvert() {
             audioDurationMessage = ` | 오디오: ${audioDurationMinutes}분 ${audioDurationSeconds}초`;
         }
 
-        // FormData 생성
-        const formData = new FormData();
-        formData.append('file', selectedFile);
-        formData.append('whisper_model', document.getElementById('whisperModel').value);
-        formData.append('audio_duration', audioDuration || 0);
-        formData.append('file_size', selectedFile.size);
-
-        // 1단계: 업로드 (0-15%)
-        updateStepProgress(1, 10, 'active', '파일 업로드 중...');
-        updateProgress(10);
-
-        await simulateProgress(1, 10, 30, 800);
-
-        // API 호출 시작
-        updateStepProgress(1, 50, 'active', '서버로 전송 완료');
-        updateProgress(15);
-
         const startTime = Date.now();
 
-        // 2단계: STT 시작 (15-100%)
+        // 1단계: 분할 업로드 (0-20%, 실제 전송량 기준)
+        updateStepProgress(1, 0, 'active', '파일 업로드 중...');
+        const uploadId = await uploadInChunks(selectedFile, (ratio) => {
+            updateStepProgress(1, ratio * 100, 'active', `파일 업로드 중... (${formatFileSize(Math.round(ratio * selectedFile.size))} / ${formatFileSize(selectedFile.size)})`);
+            updateProgress(ratio * 20);
+        });
+
+        // 2단계: STT 시작 (20-100%)
         updateStepProgress(1, 100, 'completed', '완료!');
         updateStepProgress(2, 2, 'active', `서버에서 음성을 텍스트로 변환 중입니다... (${timeMessage}${audioDurationMessage})`);
         updateProgress(20);
@@ -232,9 +227,8 @@ async function handleConvert() {
         // 실제 처리 시간보다 약간 여유를 두기 위해 예상 시간의 110%를 duration으로 사용
         const progressInterval = simulateSlowStepProgress(2, 2, 95, estimatedSeconds * 1000 * 1.1);
 
-        const response = await fetch(`${API_BASE_URL}/transcribe-only`, {
-            method: 'POST',
-            body: formData
+        const response = await fetch(`${API_BASE_URL}/uploads/${uploadId}/complete`, {
+            method: 'POST'
         });
 
         if (!response.ok) {
@@ -273,7 +267,8 @@ async function handleConvert() {
 
         // 리뷰 섹션으로 이동
         await new Promise(resolve => setTimeout(resolve, 500));
-        showReview(data.transcript);
+        // 화자 분리 결과가 있으면 화자별로 표시
+        showReview(data.speaker_transcript || data.transcript);
 
     } catch (error) {
         console.error('Error:', error);
@@ -282,6 +277,76 @@ async function handleConvert() {
     }
 }
 
+// 청크 SHA-256 계산 (crypto.subtle은 HTTPS/localhost에서만 사용 가능)
+async function sha256Hex(buffer) {
+    if (!window.crypto || !window.crypto.subtle) return null;
+    const digest = await window.crypto.subtle.digest('SHA-256', buffer);
+    return Array.from(new Uint8Array(digest)).map(b => b.toString(16).padStart(2, '0')).join('');
+}
+
+// 재개 가능한 분할 업로드 (세션 생성 → 청크 병렬 PUT → 빠진 청크 재전송)
+async function uploadInChunks(file, onProgress) {
+    const formData = new FormData();
+    formData.append('filename', file.name);
+    formData.append('file_size', file.size);
+    formData.append('chunk_size', CHUNK_SIZE);
+    formData.append('whisper_model', document.getElementById('whisperModel').value);
+    formData.append('audio_duration', audioDuration || 0);
+
+    const createResponse = await fetch(`${API_BASE_URL}/uploads`, {
+        method: 'POST',
+        body: formData
+    });
+    if (!createResponse.ok) {
+        const error = await createResponse.json();
+        throw new Error(error.detail || '업로드 세션 생성 중 오류가 발생했습니다');
+    }
+    const session = await createResponse.json();
+    const uploadId = session.upload_id;
+
+    let pending = Array.from({ length: session.total_chunks }, (_, i) => i);
+    let uploadedBytes = 0;
+
+    for (let attempt = 0; attempt <= CHUNK_MAX_RETRIES && pending.length > 0; attempt++) {
+        const queue = [...pending];
+
+        const worker = async () => {
+            while (queue.length > 0) {
+                const index = queue.shift();
+                const buffer = await file.slice(index * CHUNK_SIZE, (index + 1) * CHUNK_SIZE).arrayBuffer();
+                const hash = await sha256Hex(buffer);
+                try {
+                    const response = await fetch(`${API_BASE_URL}/uploads/${uploadId}/chunks/${index}`, {
+                        method: 'PUT',
+                        headers: hash ? { 'X-Chunk-SHA256': hash } : {},
+                        body: buffer
+                    });
+                    if (response.ok) {
+                        uploadedBytes += buffer.byteLength;
+                        onProgress(Math.min(uploadedBytes / file.size, 1));
+                    }
+                } catch (error) {
+                    // 실패한 청크는 수신 현황을 다시 조회해 재전송
+                    console.warn(`청크 ${index} 전송 실패:`, error);
+                }
+            }
+        };
+        await Promise.all(Array.from({ length: UPLOAD_CONCURRENCY }, worker));
+
+        // 서버 기준 수신 현황으로 빠진 청크 확인
+        const statusResponse = await fetch(`${API_BASE_URL}/uploads/${uploadId}`);
+        const status = await statusResponse.json();
+        pending = status.missing_chunks;
+        uploadedBytes = status.bytes_received;
+        onProgress(uploadedBytes / file.size);
+    }
+
+    if (pending.length > 0) {
+        throw new Error(`업로드하지 못한 청크가 ${pending.length}개 있습니다. 네트워크 상태를 확인해주세요.`);
+    }
+    return uploadId;
+}
+
 // 리뷰 화면 표시
 function showReview(transcript) {
     progressSection.style.display = 'none';
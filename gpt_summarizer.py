@@ -1,13 +1,231 @@
-from openai import OpenAI
+from openai_client import build_openai_client, ResilientChatClient
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+import contextvars
+import hashlib
+import json
 import os
+import re
 from dotenv import load_dotenv
 
+SYSTEM_PROMPT = "당신은 전문적인 회의록 작성 비서입니다. 회의 내용을 명확하고 체계적으로 정리합니다."
+
+MINUTES_FORMAT = """다음 형식으로 작성해주세요:
+1. **회의 주제**: 회의의 주요 목적과 주제
+2. **주요 논의 사항**: 토론된 핵심 내용들을 bullet point로 정리
+3. **결정 사항**: 회의에서 내린 결정들
+4. **액션 아이템**: 향후 진행해야 할 작업들 (담당자가 언급되었다면 포함)
+"""
+
+SPEAKER_NOTE = (
+    "각 발화 앞의 [화자 N] 표시는 자동 화자 분리 결과입니다. "
+    "이름이 언급되지 않은 담당자는 화자 번호로 표기해주세요.\n"
+)
+
+# 작업별 고정 지시문은 system 메시지에, 회의 내용은 user 메시지 끝에 둡니다.
+# 요청마다 앞부분이 바이트 단위로 같아야 OpenAI 프롬프트 캐시가 적용됩니다.
+SUMMARY_INSTRUCTIONS = f"""다음에 주어지는 내용은 회의 중 녹음된 음성을 텍스트로 변환한 것입니다.
+이를 읽기 쉽고 체계적인 회의록으로 정리해주세요.
+
+{MINUTES_FORMAT}"""
+
+CHUNK_INSTRUCTIONS = """다음에 주어지는 내용은 긴 회의 녹음의 일부를 텍스트로 변환한 것입니다.
+나중에 다른 구간의 요약과 합쳐 회의록을 만들 수 있도록,
+이 구간의 논의 내용, 결정 사항, 액션 아이템(담당자 포함)을 빠짐없이 bullet point로 정리해주세요.
+"""
+
+MERGE_INSTRUCTIONS = f"""다음에 주어지는 내용은 한 회의를 시간순 구간으로 나누어 각각 요약한 것입니다.
+중복을 정리하고 구간 간 흐름을 반영하여 하나의 체계적인 회의록으로 작성해주세요.
+
+{MINUTES_FORMAT}"""
+
+# 구조화 출력: 회의록 마크다운과 함께 주제/결정/액션 아이템을 JSON 스키마로 받아 DB 행으로 저장
+STRUCTURED_NOTE = """
+응답은 JSON으로 작성합니다. minutes 필드에는 위 형식의 마크다운 회의록을 그대로 쓰고,
+같은 내용을 topics(회의 주제), decisions(결정 사항), action_items(액션 아이템)에도 나누어 담아주세요.
+action_items의 owner는 담당자 이름(없으면 화자 번호), team은 담당 팀/부서,
+due_date는 기한(YYYY-MM-DD)입니다. 회의 날짜가 주어지면 "다음 주 금요일" 같은 표현은 그 날짜 기준으로 바꾸고,
+언급되지 않았거나 알 수 없는 값은 null로 두세요.
+"""
+
+EXTRACT_INSTRUCTIONS = """다음에 주어지는 내용은 이미 작성된 회의록입니다.
+회의록에 적힌 내용만으로 topics(회의 주제), decisions(결정 사항), action_items(액션 아이템)를 JSON으로 정리해주세요.
+action_items의 owner는 담당자 이름, team은 담당 팀/부서, due_date는 기한(YYYY-MM-DD)입니다.
+회의 날짜가 주어지면 상대적인 기한은 그 날짜 기준으로 바꾸고, 언급되지 않았거나 알 수 없는 값은 null로 두세요.
+"""
+
+_NULLABLE_STRING = {"type": ["string", "null"]}
+_STRUCTURE_PROPERTIES = {
+    "topics": {"type": "array", "items": {"type": "string"}},
+    "decisions": {"type": "array", "items": {"type": "string"}},
+    "action_items": {
+        "type": "array",
+        "items": {
+            "type": "object",
+            "additionalProperties": False,
+            "required": ["task", "owner", "team", "due_date"],
+            "properties": {
+                "task": {"type": "string"},
+                "owner": _NULLABLE_STRING,
+                "team": _NULLABLE_STRING,
+                "due_date": {"type": ["string", "null"], "description": "YYYY-MM-DD"},
+            },
+        },
+    },
+}
+
+
+def structure_response_format(with_minutes=True):
+    """Chat Completions response_format (strict JSON 스키마, with_minutes면 마크다운 회의록 필드 포함)"""
+    properties = dict(_STRUCTURE_PROPERTIES)
+    if with_minutes:
+        properties = {"minutes": {"type": "string"}, **properties}
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "meeting_minutes" if with_minutes else "meeting_structure",
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "additionalProperties": False,
+                "required": list(properties),
+                "properties": properties,
+            },
+        },
+    }
+
+
+def _clean(value, max_chars):
+    if not isinstance(value, str):
+        return None
+    value = value.strip()
+    return value[:max_chars] if value else None
+
+
+def normalize_structure(data):
+    """
+    모델이 돌려준 구조를 저장 가능한 형태로 정리 (빈 항목 제거, 기한은 날짜로 읽을 수 있을 때만 유지)
+
+    Returns:
+        dict: {"topics": [str], "decisions": [str], "action_items": [{"task", "owner", "team", "due_date"}]}
+    """
+    items = []
+    for item in data.get("action_items") or []:
+        if not isinstance(item, dict) or not _clean(item.get("task"), 2000):
+            continue
+        due_date = _clean(item.get("due_date"), 10)
+        try:
+            due_date = date.fromisoformat(due_date).isoformat() if due_date else None
+        except ValueError:
+            due_date = None
+        items.append({
+            "task": _clean(item["task"], 2000),
+            "owner": _clean(item.get("owner"), 100),
+            "team": _clean(item.get("team"), 100),
+            "due_date": due_date,
+        })
+    return {
+        "topics": [topic for topic in (_clean(t, 500) for t in data.get("topics") or []) if topic],
+        "decisions": [decision for decision in (_clean(d, 2000) for d in data.get("decisions") or []) if decision],
+        "action_items": items,
+    }
+
+
+# 길이 제한으로 잘린 JSON에서도 앞쪽의 minutes 문자열은 복구 (스키마상 첫 필드)
+_MINUTES_RE = re.compile(r'"minutes"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+
+def _salvage_minutes(content):
+    match = _MINUTES_RE.search(content) if isinstance(content, str) else None
+    if not match:
+        return None
+    try:
+        minutes = json.loads(f'"{match.group(1)}"').strip()
+    except ValueError:
+        return None
+    return minutes or None
+
+
+def parse_structured(content, with_minutes=True):
+    """
+    구조화 응답 파싱
+
+    Returns:
+        tuple: (마크다운 회의록, 정리된 구조)
+            JSON이 아니면(잘림, 거절로 content가 None 등) 구조는 None이고, 회의록은 복구할 수 있을 때만
+            (None이면 호출하는 쪽에서 일반 요약으로 다시 요청 - JSON 원문을 회의록으로 저장하지 않음)
+    """
+    try:
+        data = json.loads(content)
+        if not isinstance(data, dict):
+            raise ValueError("JSON 객체가 아닙니다")
+        minutes = data.get("minutes") if with_minutes else None
+        if with_minutes and not (isinstance(minutes, str) and minutes.strip()):
+            raise ValueError("minutes 필드가 없습니다")
+        return minutes, normalize_structure(data)
+    except (TypeError, ValueError) as e:
+        print(f"구조화 응답 파싱 실패 (구조 없이 회의록만 저장): {str(e)}")
+        return (_salvage_minutes(content) if with_minutes else None), None
+
+
+# 청크 요약 프롬프트가 바뀌면 올려서 기존 캐시를 무효화
+CHUNK_PROMPT_VERSION = "2"
+
+# 문장 경계 (마침표/물음표/느낌표 또는 줄바꿈)
+_SENTENCE_RE = re.compile(r"[^.?!\n]*(?:[.?!]+|\n|$)")
+
+
+def split_chunks(text, min_chars=1500, max_chars=4000, boundary_modulus=8):
+    """
+    텍스트를 내용 기반 경계로 청크 분할합니다.
+
+    경계는 앞에서부터의 글자 수가 아니라 문장 해시로 정해지므로,
+    중간 한 구간을 고치거나 뒤에 내용을 덧붙여도 나머지 청크는 그대로 유지됩니다.
+
+    Args:
+        text: 원본 텍스트
+        min_chars: 청크 최소 길이 (이보다 짧으면 경계로 자르지 않음)
+        max_chars: 청크 최대 길이 (넘으면 강제로 자름)
+        boundary_modulus: 문장 해시가 이 값으로 나누어떨어지면 경계로 사용
+
+    Returns:
+        list: 청크 문자열 목록
+    """
+    chunks = []
+    current = []
+    current_len = 0
+    for sentence in _SENTENCE_RE.findall(text):
+        stripped = sentence.strip()
+        if not stripped:
+            continue
+        current.append(stripped)
+        current_len += len(stripped)
+
+        digest = hashlib.blake2b(stripped.encode("utf-8"), digest_size=4).digest()
+        is_boundary = int.from_bytes(digest, "big") % boundary_modulus == 0
+        if (current_len >= min_chars and is_boundary) or current_len >= max_chars:
+            chunks.append(" ".join(current))
+            current = []
+            current_len = 0
+
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def chunk_hash(chunk):
+    """청크 캐시 키 (내용 SHA-256)"""
+    return hashlib.sha256(chunk.encode("utf-8")).hexdigest()
+
 
 class GPTSummarizer:
-    def __init__(self):
+    def __init__(self, limiter=None):
         """
         OpenAI GPT API를 초기화합니다.
         .env 파일에서 OPENAI_API_KEY를 불러옵니다.
+
+        Args:
+            limiter: ModelRateLimiter (기본값: OPENAI_RPM 등 환경 변수 한도)
         """
         load_dotenv()
         api_key = os.getenv("OPENAI_API_KEY")
@@ -18,55 +236,180 @@ class GPTSummarizer:
                 ".env 파일에 API 키를 추가해주세요."
             )
 
-        self.client = OpenAI(api_key=api_key)
+        self.client = build_openai_client(api_key)
+        # 모델별 RPM/TPM 한도 + 429/5xx 재시도
+        self.chat = ResilientChatClient.from_env(self.client, limiter=limiter)
 
-    def summarize(self, text, model="gpt-5-mini"):
+    def _complete(self, instructions, content, model, response_format=None):
         """
-        회의 내용을 GPT를 사용하여 정리된 회의록으로 변환합니다.
+        고정 지시문(system) + 가변 내용(user)으로 Chat Completions를 호출하고 응답 텍스트를 반환
 
         Args:
-            text: STT로 변환된 원본 텍스트
-            model: 사용할 GPT 모델 (기본값: gpt-5-mini)
-
-        Returns:
-            str: 정리된 회의록
+            instructions: 작업별 고정 지시문 (SUMMARY_INSTRUCTIONS 등)
+            content: 회의 텍스트 등 요청마다 달라지는 내용
+            model: 사용할 GPT 모델
+            response_format: 구조화 출력 스키마 (structure_response_format)
         """
-        print("GPT를 사용하여 회의록 작성 중...")
-
-        prompt = f"""
-다음은 회의 중 녹음된 음성을 텍스트로 변환한 내용입니다.
-이를 읽기 쉽고 체계적인 회의록으로 정리해주세요.
-
-다음 형식으로 작성해주세요:
-1. **회의 주제**: 회의의 주요 목적과 주제
-2. **주요 논의 사항**: 토론된 핵심 내용들을 bullet point로 정리
-3. **결정 사항**: 회의에서 내린 결정들
-4. **액션 아이템**: 향후 진행해야 할 작업들 (담당자가 언급되었다면 포함)
-
-원본 텍스트:
-{text}
-"""
-
         # GPT-5 모델들은 temperature를 지원하지 않음 (기본값 1만 사용 가능)
         # 다른 모델들은 temperature=0.3 사용
         api_params = {
             "model": model,
             "messages": [
-                {
-                    "role": "system",
-                    "content": "당신은 전문적인 회의록 작성 비서입니다. 회의 내용을 명확하고 체계적으로 정리합니다.",
-                },
-                {"role": "user", "content": prompt},
+                {"role": "system", "content": f"{SYSTEM_PROMPT}\n\n{instructions}"},
+                {"role": "user", "content": content},
             ],
         }
 
         # GPT-5 모델이 아닌 경우에만 temperature 설정
         if not model.startswith("gpt-5"):
             api_params["temperature"] = 0.3
+        if response_format:
+            api_params["response_format"] = response_format
+
+        response = self.chat.create(**api_params)
+        return response.choices[0].message.content
+
+    @staticmethod
+    def _source_text(text, speaker_labeled):
+        """user 메시지 본문 (화자 라벨 안내는 회의 텍스트 바로 앞에 둠)"""
+        speaker_note = SPEAKER_NOTE if speaker_labeled else ""
+        return f"{speaker_note}원본 텍스트:\n{text}"
+
+    @staticmethod
+    def _dated(content, meeting_date):
+        """상대적인 기한을 날짜로 바꿀 수 있도록 회의 날짜를 user 메시지 앞에 붙임"""
+        return f"회의 날짜: {meeting_date.isoformat()}\n{content}" if meeting_date else content
+
+    def summarize(self, text, model="gpt-5-mini", speaker_labeled=False):
+        """
+        회의 내용을 GPT를 사용하여 정리된 회의록으로 변환합니다.
 
-        response = self.client.chat.completions.create(**api_params)
+        Args:
+            text: STT로 변환된 원본 텍스트
+            model: 사용할 GPT 모델 (기본값: gpt-5-mini)
+            speaker_labeled: 텍스트의 각 줄이 "[화자 N]"으로 시작하는지 여부
+
+        Returns:
+            str: 정리된 회의록
+        """
+        print("GPT를 사용하여 회의록 작성 중...")
 
-        summary = response.choices[0].message.content
+        summary = self._complete(SUMMARY_INSTRUCTIONS, self._source_text(text, speaker_labeled), model)
         print("회의록 작성 완료!")
 
         return summary
+
+    def summarize_structured(self, text, model="gpt-5-mini", speaker_labeled=False, meeting_date=None):
+        """
+        회의록 마크다운과 함께 주제/결정 사항/액션 아이템을 JSON 스키마로 받습니다.
+
+        Args:
+            text: STT로 변환된 원본 텍스트
+            model: 사용할 GPT 모델 (기본값: gpt-5-mini)
+            speaker_labeled: 텍스트의 각 줄이 "[화자 N]"으로 시작하는지 여부
+            meeting_date: 회의 날짜 (date, 상대적인 기한 변환용)
+
+        Returns:
+            tuple: (정리된 회의록, 구조 dict - 응답이 스키마와 맞지 않으면 None)
+        """
+        print("GPT를 사용하여 회의록 작성 중 (구조화)...")
+
+        content = self._complete(
+            SUMMARY_INSTRUCTIONS + STRUCTURED_NOTE,
+            self._dated(self._source_text(text, speaker_labeled), meeting_date),
+            model,
+            response_format=structure_response_format()
+        )
+        summary, structure = parse_structured(content)
+        if summary is None:
+            summary = self._complete(SUMMARY_INSTRUCTIONS, self._source_text(text, speaker_labeled), model)
+        print("회의록 작성 완료!")
+
+        return summary, structure
+
+    def extract_structure(self, summary, model="gpt-5-mini", meeting_date=None):
+        """
+        이미 저장된 마크다운 회의록에서 구조만 추출합니다 (구조화 이전 요약 백필용, 원본 텍스트보다 입력이 짧음).
+
+        Returns:
+            dict: 구조 (응답이 스키마와 맞지 않으면 None)
+        """
+        content = self._complete(
+            EXTRACT_INSTRUCTIONS,
+            self._dated(f"회의록:\n{summary}", meeting_date),
+            model,
+            response_format=structure_response_format(with_minutes=False)
+        )
+        return parse_structured(content, with_minutes=False)[1]
+
+    def summarize_chunk(self, chunk, model="gpt-5-mini", speaker_labeled=False):
+        """회의 일부(청크)를 이후 병합에 쓸 중간 요약으로 정리합니다."""
+        return self._complete(CHUNK_INSTRUCTIONS, self._source_text(chunk, speaker_labeled), model)
+
+    def summarize_incremental(self, text, model="gpt-5-mini", speaker_labeled=False, cache=None, max_workers=4,
+                              structured=False, meeting_date=None):
+        """
+        청크별 중간 요약을 캐시하여 바뀐 청크만 다시 요약하고, 최종 병합 단계만 새로 실행합니다.
+
+        Args:
+            text: STT로 변환된 원본 텍스트
+            model: 사용할 GPT 모델
+            speaker_labeled: 텍스트의 각 줄이 "[화자 N]"으로 시작하는지 여부
+            cache: get_many(hashes, model) -> {hash: 요약}, put_many({hash: 요약}, model)을 제공하는 객체
+            max_workers: 새로 요약할 청크의 동시 호출 수
+            structured: 병합 단계에서 구조도 함께 받음 (summarize_structured와 같은 스키마)
+            meeting_date: 회의 날짜 (structured일 때 상대적인 기한 변환용)
+
+        Returns:
+            tuple: (정리된 회의록, {"chunks": 전체 청크 수, "reused": 캐시 재사용 수[, "structure": 구조]})
+        """
+        chunks = split_chunks(text)
+        if len(chunks) <= 1:
+            # 청크가 하나면 중간 요약 + 병합 두 번 호출할 이유가 없으므로 일반 요약 한 번으로 처리
+            stats = {"chunks": len(chunks), "reused": 0}
+            if structured:
+                summary, stats["structure"] = self.summarize_structured(
+                    text, model=model, speaker_labeled=speaker_labeled, meeting_date=meeting_date
+                )
+                return summary, stats
+            return self.summarize(text, model=model, speaker_labeled=speaker_labeled), stats
+
+        hashes = [chunk_hash(chunk) for chunk in chunks]
+        cached = cache.get_many(hashes, model) if cache else {}
+
+        missing = {h: chunk for h, chunk in zip(hashes, chunks) if h not in cached}
+        print(f"청크 {len(chunks)}개 중 {len(chunks) - len(missing)}개 재사용, {len(missing)}개 새로 요약")
+
+        if missing:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                # 호출 스레드의 컨텍스트(요청 취소 토큰, 프로파일)를 청크 호출마다 복사해서 전달
+                futures = [
+                    executor.submit(
+                        contextvars.copy_context().run,
+                        self.summarize_chunk, chunk, model=model, speaker_labeled=speaker_labeled
+                    )
+                    for chunk in missing.values()
+                ]
+                fresh = dict(zip(missing.keys(), [future.result() for future in futures]))
+            if cache:
+                cache.put_many(fresh, model)
+            cached = {**cached, **fresh}
+
+        partials = "\n\n".join(
+            f"[구간 {i + 1}]\n{cached[h]}" for i, h in enumerate(hashes)
+        )
+        stats = {"chunks": len(chunks), "reused": len(chunks) - len(missing)}
+        summary = None
+        if structured:
+            content = self._complete(
+                MERGE_INSTRUCTIONS + STRUCTURED_NOTE,
+                self._dated(f"구간별 요약:\n{partials}", meeting_date),
+                model,
+                response_format=structure_response_format()
+            )
+            summary, stats["structure"] = parse_structured(content)
+        if summary is None:
+            summary = self._complete(MERGE_INSTRUCTIONS, f"구간별 요약:\n{partials}", model)
+        print("회의록 작성 완료!")
+
+        return summary, stats
@@ -0,0 +1,299 @@
+"""
+Whisper 동적 배치 스케줄러
+
+여러 요청이 동시에 들어오면 각 요청의 다음 30초 mel 윈도우를 모아 하나의 배치 forward pass로 디코딩합니다.
+모델 사본을 늘리지 않고도 멀티코어 CPU에서 전체 처리량을 높이는 것이 목적입니다.
+
+- 윈도우 처리는 whisper.transcribe와 같음: 이전 윈도우 텍스트를 프롬프트로 사용, 온도 폴백,
+  압축률/평균 로그 확률/무음 확률 기준, 타임스탬프 토큰으로 세그먼트를 나누고 마지막 타임스탬프부터 다음 윈도우 시작
+- 요청마다 대기열에는 윈도우 하나만 올라가고 mel도 그때 계산하므로, 긴 파일도 mel 하나만 메모리에 두고
+  뒤에 들어온 짧은 요청은 긴 파일의 윈도우 하나만 기다림 (요청 간 라운드 로빈)
+- 옵션(온도, 프롬프트)이 같은 윈도우끼리 한 번에 디코딩하므로 30초 이하 클립과 각 파일의 첫 윈도우가 주로 배치로 묶임
+"""
+import os
+import queue
+import threading
+import time
+from concurrent.futures import CancelledError, Future
+from dataclasses import dataclass, field, replace
+
+import torch
+import whisper
+from whisper.audio import N_SAMPLES, N_SAMPLES_PER_TOKEN, SAMPLE_RATE
+from whisper.decoding import DecodingResult
+from whisper.tokenizer import get_tokenizer
+
+import cancellation
+import profiling
+
+# whisper.transcribe 기본값과 같은 품질 기준
+TEMPERATURES = (0.0, 0.2, 0.4, 0.6, 0.8, 1.0)
+COMPRESSION_RATIO_THRESHOLD = 2.4
+LOGPROB_THRESHOLD = -1.0
+NO_SPEECH_THRESHOLD = 0.6
+
+
+@dataclass
+class _WindowJob:
+    """배치 대기열에 들어가는 30초 윈도우 하나"""
+    mel: torch.Tensor
+    options: whisper.DecodingOptions
+    future: Future = field(default_factory=Future)
+
+    @property
+    def key(self) -> tuple:
+        """같은 DecodingOptions(온도, 프롬프트)로 디코딩할 수 있는 윈도우끼리 묶기 위한 키"""
+        return self.options.temperature, tuple(self.options.prompt or ())
+
+
+class InferenceScheduler:
+    def __init__(self, stt_processor, max_batch_size: int = 8, max_wait_ms: int = 50):
+        """
+        STTProcessor 앞단에서 동작하는 배치 스케줄러.
+
+        Args:
+            stt_processor: 모델이 로드된 STTProcessor
+            max_batch_size: 한 번의 forward pass에 묶을 최대 윈도우 수
+            max_wait_ms: 첫 윈도우 도착 후 배치를 채우기 위해 기다리는 최대 시간 (ms)
+        """
+        self.stt_processor = stt_processor
+        self.model = stt_processor.model
+        self.model_size = stt_processor.model_size
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0, max_wait_ms) / 1000.0
+
+        # CPU에서는 fp16 디코딩이 지원되지 않음
+        self.options = whisper.DecodingOptions(
+            task="transcribe",
+            language="ko",
+            fp16=self.model.device.type == "cuda",
+        )
+        self.tokenizer = get_tokenizer(
+            self.model.is_multilingual, num_languages=self.model.num_languages, language="ko", task="transcribe"
+        )
+
+        self._queue = queue.Queue()
+        self._running = True
+        self._worker = threading.Thread(target=self._run, name="whisper-batcher", daemon=True)
+        self._worker.start()
+        print(f"배치 스케줄러 시작 (max_batch_size={self.max_batch_size}, max_wait_ms={max_wait_ms})")
+
+    @classmethod
+    def from_env(cls, stt_processor):
+        """환경 변수(STT_MAX_BATCH_SIZE, STT_MAX_WAIT_MS)로 스케줄러 생성"""
+        return cls(
+            stt_processor,
+            max_batch_size=int(os.getenv("STT_MAX_BATCH_SIZE", "8")),
+            max_wait_ms=int(os.getenv("STT_MAX_WAIT_MS", "50")),
+        )
+
+    def transcribe(self, audio_file_path):
+        """
+        음성 파일을 30초 윈도우 단위로 배치 대기열에 넣어 변환합니다.
+        STTProcessor.transcribe와 같은 인터페이스이며 호출 스레드는 결과가 나올 때까지 대기합니다.
+
+        Args:
+            audio_file_path: 음성 파일 경로
+
+        Returns:
+            str: 변환된 텍스트
+        """
+        text, _ = self.transcribe_segments(audio_file_path)
+        return text
+
+    def transcribe_segments(self, audio_file_path):
+        """
+        STTProcessor.transcribe_segments와 같은 인터페이스.
+
+        윈도우를 하나씩 대기열에 넣고 결과를 받은 뒤 다음 윈도우의 mel을 계산합니다
+        (다음 윈도우의 시작 위치와 프롬프트가 이전 결과에 따라 정해지므로).
+
+        Returns:
+            tuple: (변환된 텍스트, [{"start": 초, "end": 초, "text": 문장}, ...])
+        """
+        if isinstance(audio_file_path, str):
+            if not os.path.exists(audio_file_path):
+                raise FileNotFoundError(f"파일을 찾을 수 없습니다: {audio_file_path}")
+            audio = whisper.load_audio(audio_file_path)
+        else:
+            # 디코딩된 16kHz mono float32 배열 (AudioCache 메모리 맵 등)
+            audio = audio_file_path
+
+        seek = 0
+        all_tokens = []
+        prompt_reset_since = 0
+        segments = []
+        while seek < len(audio):
+            cancellation.check()
+            segment_size = min(N_SAMPLES, len(audio) - seek)
+            window = whisper.pad_or_trim(torch.from_numpy(audio[seek:seek + N_SAMPLES].copy()))
+            mel = whisper.log_mel_spectrogram(window, self.model.dims.n_mels)
+            result = self._decode_with_fallback(mel, all_tokens[prompt_reset_since:])
+
+            # 무음 구간은 건너뜀 (환각 방지)
+            if result.no_speech_prob > NO_SPEECH_THRESHOLD and result.avg_logprob <= LOGPROB_THRESHOLD:
+                seek += segment_size
+                continue
+
+            window_segments, advance = self._split_segments(result, seek / SAMPLE_RATE, segment_size)
+            seek += advance
+            for segment in window_segments:
+                if segment["start"] == segment["end"] or not segment["text"].strip():
+                    continue
+                segments.append(segment)
+                all_tokens.extend(segment.pop("tokens"))
+            # 높은 온도로 얻은 결과는 다음 윈도우의 프롬프트로 쓰지 않음
+            if result.temperature > 0.5:
+                prompt_reset_since = len(all_tokens)
+
+        text = "".join(segment["text"] for segment in segments)
+        for segment in segments:
+            segment["text"] = segment["text"].strip()
+        return text, segments
+
+    def _decode_with_fallback(self, mel: torch.Tensor, prompt: list) -> DecodingResult:
+        """반복이 심하거나 확신이 낮은 결과는 온도를 올려 다시 디코딩 (무음이면 그대로 사용)"""
+        result = None
+        for temperature in TEMPERATURES:
+            options = replace(self.options, temperature=temperature, prompt=list(prompt) or None)
+            result = self._submit(_WindowJob(mel=mel, options=options))
+            needs_fallback = (
+                result.compression_ratio > COMPRESSION_RATIO_THRESHOLD
+                or result.avg_logprob < LOGPROB_THRESHOLD
+            )
+            if result.no_speech_prob > NO_SPEECH_THRESHOLD and result.avg_logprob < LOGPROB_THRESHOLD:
+                needs_fallback = False
+            if not needs_fallback:
+                break
+        return result
+
+    def _submit(self, job: _WindowJob) -> DecodingResult:
+        """윈도우 하나를 대기열에 넣고 결과를 기다림 (요청이 취소되면 대기열에서 빼서 다른 요청이 바로 사용)"""
+        if not self._running:
+            raise RuntimeError("배치 스케줄러가 종료되었습니다")
+        token = cancellation.current()
+        remove_callback = token.add_callback(job.future.cancel) if token else None
+        self._queue.put(job)
+        try:
+            return job.future.result()
+        except CancelledError:
+            raise cancellation.JobCancelled(token.reason if token else None)
+        finally:
+            if remove_callback:
+                remove_callback()
+
+    def _split_segments(self, result: DecodingResult, time_offset: float, segment_size: int):
+        """
+        타임스탬프 토큰으로 윈도우 결과를 세그먼트로 나눔 (whisper.transcribe와 같은 규칙)
+
+        Returns:
+            tuple: ([{"start", "end", "text", "tokens"}, ...], 다음 윈도우까지 이동할 샘플 수)
+        """
+        tokenizer = self.tokenizer
+        timestamp_begin = tokenizer.timestamp_begin
+        time_precision = N_SAMPLES_PER_TOKEN / SAMPLE_RATE
+        tokens = torch.tensor(result.tokens)
+
+        def new_segment(start, end, segment_tokens):
+            segment_tokens = segment_tokens.tolist()
+            text = tokenizer.decode([token for token in segment_tokens if token < tokenizer.eot])
+            return {"start": start, "end": end, "text": text, "tokens": segment_tokens}
+
+        timestamp_tokens = tokens.ge(timestamp_begin)
+        single_timestamp_ending = timestamp_tokens[-2:].tolist() == [False, True]
+        consecutive = torch.where(timestamp_tokens[:-1] & timestamp_tokens[1:])[0] + 1
+
+        if len(consecutive) > 0:
+            slices = consecutive.tolist()
+            if single_timestamp_ending:
+                slices.append(len(tokens))
+            segments = []
+            last_slice = 0
+            for current_slice in slices:
+                sliced = tokens[last_slice:current_slice]
+                segments.append(new_segment(
+                    time_offset + (sliced[0].item() - timestamp_begin) * time_precision,
+                    time_offset + (sliced[-1].item() - timestamp_begin) * time_precision,
+                    sliced,
+                ))
+                last_slice = current_slice
+            if single_timestamp_ending:
+                return segments, segment_size
+            # 마지막 타임스탬프 이후는 다음 윈도우에서 다시 디코딩 (30초 경계에서 단어가 잘리지 않도록)
+            last_timestamp_pos = tokens[last_slice - 1].item() - timestamp_begin
+            return segments, max(last_timestamp_pos * N_SAMPLES_PER_TOKEN, 1)
+
+        duration = segment_size / SAMPLE_RATE
+        timestamps = tokens[timestamp_tokens.nonzero().flatten()]
+        if len(timestamps) > 0 and timestamps[-1].item() != timestamp_begin:
+            duration = (timestamps[-1].item() - timestamp_begin) * time_precision
+        return [new_segment(time_offset, time_offset + duration, tokens)], segment_size
+
+    def shutdown(self):
+        """워커 스레드를 멈추고 남은 작업을 실패 처리합니다."""
+        self._running = False
+        self._queue.put(None)
+        self._worker.join(timeout=5)
+        while True:
+            try:
+                job = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is not None:
+                job.future.set_exception(RuntimeError("배치 스케줄러가 종료되었습니다"))
+
+    def _collect_batch(self):
+        """
+        첫 작업을 기다린 뒤 max_wait 동안 max_batch_size까지 윈도우를 모읍니다.
+
+        요청마다 대기열에는 윈도우가 하나뿐이고 결과를 받은 뒤에야 다음 윈도우를 넣으므로
+        도착 순서(FIFO)대로 모으면 요청 간 라운드 로빈이 됩니다.
+        """
+        first = self._queue.get()
+        if first is None:
+            return None
+
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                job = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is None:
+                self._queue.put(None)
+                break
+            batch.append(job)
+        return batch
+
+    def _run(self):
+        while self._running:
+            batch = self._collect_batch()
+            if batch is None:
+                break
+
+            # 취소된 작업(Future.cancel)은 디코딩하지 않음
+            batch = [job for job in batch if job.future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            # DecodingOptions는 배치 전체에 하나이므로 온도/프롬프트가 같은 윈도우끼리 디코딩
+            groups = {}
+            for job in batch:
+                groups.setdefault(job.key, []).append(job)
+            for jobs in groups.values():
+                self._decode(jobs)
+
+    def _decode(self, jobs):
+        try:
+            mel = torch.stack([job.mel for job in jobs]).to(self.model.device)
+            with self.stt_processor.lock, torch.no_grad(), profiling.stage("whisper-batch"):
+                results = whisper.decode(self.model, mel, jobs[0].options)
+        except Exception as e:
+            for job in jobs:
+                job.future.set_exception(e)
+            return
+
+        for job, result in zip(jobs, results):
+            job.future.set_result(result)
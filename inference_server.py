@@ -0,0 +1,279 @@
+"""
+로컬 추론 서버
+
+Whisper(및 선택적으로 화자 분리) 모델을 한 프로세스에만 로드하고,
+여러 uvicorn 워커가 Unix 소켓으로 변환 요청을 보내도록 합니다.
+워커 수를 늘려도 모델 메모리는 한 벌만 사용합니다.
+
+실행:
+    python inference_server.py                     # INFERENCE_SERVER_ADDRESS 기본값 사용
+    INFERENCE_SERVER_ADDRESS=/tmp/mmbot-infer.sock uvicorn api:app --workers 4
+
+오디오는 같은 노드의 디코딩 캐시(AudioCache) 파일 경로로 전달되므로 PCM을 소켓으로 복사하지 않습니다.
+연결은 pickle로 주고받으므로 INFERENCE_AUTHKEY(서버와 API 워커가 같은 임의의 값)를 반드시 설정해야 하며,
+TCP 포트 없이 소유자만 접근할 수 있는(0600) 로컬 Unix 소켓으로만 대기합니다.
+대기 중인 작업이 INFERENCE_MAX_PENDING을 넘으면 즉시 busy로 응답합니다 (백프레셔).
+"""
+import os
+import threading
+import time
+from multiprocessing.connection import Client, Listener
+
+import numpy as np
+from dotenv import load_dotenv
+
+DEFAULT_ADDRESS = "/tmp/meeting-minutes-inference.sock"
+
+# 예전 기본값/예시 값은 누구나 알 수 있으므로 인증 키로 허용하지 않음
+_PLACEHOLDER_AUTHKEYS = {"meeting-minutes-bot", "change-me"}
+
+
+class InferenceBusyError(Exception):
+    """추론 서버의 대기열이 가득 참"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"추론 서버가 혼잡합니다 ({retry_after}초 후 재시도)")
+        self.retry_after = retry_after
+
+
+class InferenceServerError(Exception):
+    """추론 서버에서 작업이 실패함"""
+
+
+def _authkey() -> bytes:
+    authkey = os.getenv("INFERENCE_AUTHKEY", "")
+    if not authkey or authkey in _PLACEHOLDER_AUTHKEYS:
+        raise ValueError(
+            "INFERENCE_AUTHKEY가 설정되지 않았습니다. "
+            ".env 파일에 추론 서버와 API 워커가 공유할 임의의 값을 추가해주세요 "
+            "(예: python -c \"import secrets; print(secrets.token_hex(32))\")."
+        )
+    return authkey.encode("utf-8")
+
+
+def _audio_payload(audio):
+    """파일 경로 / 메모리 맵은 경로만, 일반 배열은 bytes로 전달"""
+    if isinstance(audio, str):
+        return {"path": os.path.abspath(audio)}
+    if isinstance(audio, np.memmap) and audio.filename:
+        return {"pcm_path": audio.filename}
+    return {"pcm": np.ascontiguousarray(audio, dtype=np.float32).tobytes()}
+
+
+def _load_payload(payload):
+    if "path" in payload:
+        return payload["path"]
+    if "pcm_path" in payload:
+        return np.memmap(payload["pcm_path"], dtype=np.float32, mode="c")
+    return np.frombuffer(payload["pcm"], dtype=np.float32).copy()
+
+
+# ============================================
+# 서버
+# ============================================
+
+class InferenceServer:
+    def __init__(self, address: str, max_pending: int = 16):
+        """
+        Args:
+            address: Unix 소켓 경로
+            max_pending: 처리 중 + 대기 중 작업 최대 수 (넘으면 busy 응답)
+        """
+        from stt_module import STTProcessor
+        from inference_scheduler import InferenceScheduler
+        from diarization import SpeakerDiarizer
+
+        self.address = address
+        self.max_pending = max_pending
+        self._pending = threading.BoundedSemaphore(max_pending)
+        self._stats_lock = threading.Lock()
+        self.stats = {"pending": 0, "completed": 0, "failed": 0, "rejected": 0, "total_seconds": 0.0}
+        self.started_at = time.time()
+
+        print("추론 서버 모델 초기화 중...")
+        self.default_processor = STTProcessor(os.getenv("WHISPER_MODEL", "base"))
+        self.processors = {self.default_processor.model_size: self.default_processor}
+        self._processors_lock = threading.Lock()
+        self.scheduler = None
+        if os.getenv("STT_BATCHING", "false").lower() == "true":
+            self.scheduler = InferenceScheduler.from_env(self.default_processor)
+        self.diarizer = None
+        if os.getenv("DIARIZATION_ENABLED", "false").lower() == "true":
+            self.diarizer = SpeakerDiarizer.from_env()
+        print("추론 서버 모델 초기화 완료!")
+
+    def _transcriber(self, model_size):
+        from stt_module import STTProcessor
+
+        model_size = model_size or self.default_processor.model_size
+        if model_size == self.default_processor.model_size and self.scheduler:
+            return self.scheduler
+        with self._processors_lock:
+            if model_size not in self.processors:
+                self.processors[model_size] = STTProcessor(model_size)
+            return self.processors[model_size]
+
+    def health(self):
+        with self._stats_lock:
+            stats = dict(self.stats)
+        completed = stats["completed"] or 1
+        return {
+            "status": "healthy",
+            "pid": os.getpid(),
+            "uptime": time.time() - self.started_at,
+            "default_model": self.default_processor.model_size,
+            "loaded_models": sorted(self.processors),
+            "batching": self.scheduler is not None,
+            "diarization": self.diarizer is not None,
+            "max_pending": self.max_pending,
+            "pending": stats["pending"],
+            "completed": stats["completed"],
+            "failed": stats["failed"],
+            "rejected": stats["rejected"],
+            "avg_seconds": stats["total_seconds"] / completed,
+        }
+
+    def _execute(self, request):
+        op = request["op"]
+        audio = _load_payload(request["audio"])
+        if op == "transcribe_segments":
+            return self._transcriber(request.get("model_size")).transcribe_segments(audio)
+        if op == "diarize":
+            if not self.diarizer:
+                raise InferenceServerError("추론 서버에서 화자 분리가 비활성화되어 있습니다")
+            return self.diarizer.diarize(audio)
+        raise InferenceServerError(f"알 수 없는 작업: {op}")
+
+    def _handle(self, conn):
+        try:
+            request = conn.recv()
+            if request.get("op") == "health":
+                conn.send({"ok": True, "result": self.health()})
+                return
+
+            # 백프레셔: 대기열이 가득 차면 기다리지 않고 바로 거절
+            if not self._pending.acquire(blocking=False):
+                with self._stats_lock:
+                    self.stats["rejected"] += 1
+                    avg = self.stats["total_seconds"] / max(self.stats["completed"], 1)
+                conn.send({"ok": False, "busy": True, "retry_after": max(1, int(avg))})
+                return
+
+            with self._stats_lock:
+                self.stats["pending"] += 1
+            start = time.time()
+            try:
+                result = self._execute(request)
+                with self._stats_lock:
+                    self.stats["completed"] += 1
+                    self.stats["total_seconds"] += time.time() - start
+                conn.send({"ok": True, "result": result})
+            except Exception as e:
+                with self._stats_lock:
+                    self.stats["failed"] += 1
+                conn.send({"ok": False, "error": str(e)})
+            finally:
+                with self._stats_lock:
+                    self.stats["pending"] -= 1
+                self._pending.release()
+        except (EOFError, ConnectionError):
+            # 클라이언트가 먼저 연결을 끊음
+            pass
+        finally:
+            conn.close()
+
+    def serve_forever(self):
+        authkey = _authkey()
+        if os.path.exists(self.address):
+            os.remove(self.address)
+        # 소켓 파일이 생성되는 순간부터 소유자만 접근할 수 있도록 umask 적용 (chmod 전 경쟁 구간 제거)
+        old_umask = os.umask(0o177)
+        try:
+            listener = Listener(self.address, family="AF_UNIX", authkey=authkey)
+        finally:
+            os.umask(old_umask)
+        with listener:
+            os.chmod(self.address, 0o600)
+            print(f"추론 서버 대기 중: {self.address} (max_pending={self.max_pending})")
+            while True:
+                try:
+                    conn = listener.accept()
+                except Exception as e:
+                    print(f"연결 수락 실패: {e}")
+                    continue
+                threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+
+# ============================================
+# 클라이언트 (API 워커에서 사용)
+# ============================================
+
+def _call(address, request, timeout=None):
+    with Client(address, family="AF_UNIX", authkey=_authkey()) as conn:
+        conn.send(request)
+        if timeout is not None and not conn.poll(timeout):
+            raise InferenceServerError("추론 서버 응답 시간 초과")
+        response = conn.recv()
+    if response.get("busy"):
+        raise InferenceBusyError(response["retry_after"])
+    if not response["ok"]:
+        raise InferenceServerError(response["error"])
+    return response["result"]
+
+
+class RemoteSTTProcessor:
+    """STTProcessor와 같은 인터페이스로 추론 서버에 변환을 요청하는 클라이언트"""
+
+    def __init__(self, address: str, model_size: str = None):
+        self.address = address
+        health = self.health()
+        self.model_size = model_size or health["default_model"]
+        self.diarization = health["diarization"]
+        print(f"추론 서버 연결: {address} (Whisper {self.model_size})")
+
+    @classmethod
+    def from_env(cls):
+        return cls(os.getenv("INFERENCE_SERVER_ADDRESS", DEFAULT_ADDRESS))
+
+    def for_model(self, model_size: str):
+        """다른 Whisper 모델을 사용하는 클라이언트 (모델은 서버에서 로드)"""
+        client = object.__new__(RemoteSTTProcessor)
+        client.address = self.address
+        client.model_size = model_size
+        client.diarization = self.diarization
+        return client
+
+    def health(self):
+        return _call(self.address, {"op": "health"}, timeout=5)
+
+    def transcribe(self, audio_file_path):
+        text, _ = self.transcribe_segments(audio_file_path)
+        return text
+
+    def transcribe_segments(self, audio_file_path):
+        return _call(self.address, {
+            "op": "transcribe_segments",
+            "model_size": self.model_size,
+            "audio": _audio_payload(audio_file_path),
+        })
+
+
+class RemoteDiarizer:
+    """SpeakerDiarizer와 같은 인터페이스로 추론 서버에 화자 분리를 요청하는 클라이언트"""
+
+    def __init__(self, address: str):
+        self.address = address
+
+    def diarize(self, audio_file_path):
+        return _call(self.address, {"op": "diarize", "audio": _audio_payload(audio_file_path)})
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    # 모델을 로드하기 전에 인증 키부터 확인
+    _authkey()
+    server = InferenceServer(
+        address=os.getenv("INFERENCE_SERVER_ADDRESS", DEFAULT_ADDRESS),
+        max_pending=int(os.getenv("INFERENCE_MAX_PENDING", "16")),
+    )
+    server.serve_forever()
@@ -11,6 +11,9 @@ def init_database():
     print("✅ 데이터베이스 테이블 생성 완료!")
     print("   - transcript_records (STT 변환 레코드)")
     print("   - summary_records (GPT 요약 레코드)")
+    print("   - summary_chunk_cache (증분 재요약 청크 캐시)")
+    print("   - record_archive (오래된 회의 보관본)")
+    print("   - meeting_topics / meeting_decisions / action_items (구조화된 회의록)")
 
 if __name__ == "__main__":
     init_database()
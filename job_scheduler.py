@@ -0,0 +1,195 @@
+"""
+작업 우선순위 스케줄러 (STT / GPT 공용)
+
+도착 순서대로 처리하면 3시간짜리 회의 하나가 뒤에 들어온 2분짜리 녹음을 모두 막습니다.
+대기 중인 작업 중 다음 점수가 가장 낮은 작업부터 실행합니다.
+
+    점수 = 예상 처리 시간 (짧은 작업 우선, SJF)
+         + fairness_weight × 같은 사용자가 현재 실행 중인 작업의 예상 처리 시간 합 (사용자 간 공정성)
+         - aging_rate × 대기 시간 (오래 기다린 긴 작업도 결국 실행됨)
+
+예상 처리 시간이 heavy_cost 이상인 작업은 동시에 max_heavy개까지만 실행하여
+긴 작업이 모든 슬롯을 차지하지 않도록 합니다.
+API 워커 프로세스(이벤트 루프)마다 하나씩 생성합니다.
+"""
+import asyncio
+import hashlib
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
+# 오디오 길이를 모를 때 파일 크기로 추정 (128kbps 기준)
+BYTES_PER_AUDIO_SECOND = 16000
+
+
+def estimate_stt_cost(
+    audio_duration: Optional[float] = None,
+    file_size: Optional[int] = None,
+    ratio: Optional[float] = None
+) -> float:
+    """
+    STT 예상 처리 시간 (초)
+
+    Args:
+        audio_duration: 오디오 길이 (초, 없으면 file_size로 추정)
+        file_size: 파일 크기 (bytes)
+        ratio: 오디오 1초당 처리 시간 (기본값: STT_COST_RATIO, DB 이력이 있으면 그 값을 전달)
+    """
+    if not ratio:
+        ratio = float(os.getenv("STT_COST_RATIO", "0.3"))
+    if not audio_duration:
+        audio_duration = (file_size or 0) / BYTES_PER_AUDIO_SECOND
+    return audio_duration * ratio
+
+
+def estimate_gpt_cost(text: str) -> float:
+    """GPT 요약 예상 처리 시간 (초, 입력 글자 수 기준)"""
+    chars_per_second = float(os.getenv("GPT_CHARS_PER_SECOND", "200"))
+    return len(text or "") / chars_per_second
+
+
+def client_id(api_key: Optional[str], host: Optional[str]) -> str:
+    """공정성 판단에 사용할 사용자 식별자 (API 키는 해시로만 보관)"""
+    if api_key:
+        return "key:" + hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:12]
+    return f"ip:{host or 'unknown'}"
+
+
+class _Job:
+    __slots__ = ("user", "cost", "heavy", "enqueued_at", "started_at", "granted")
+
+    def __init__(self, user: str, cost: float, heavy: bool):
+        self.user = user
+        self.cost = cost
+        self.heavy = heavy
+        self.enqueued_at = time.monotonic()
+        self.started_at = None
+        self.granted = asyncio.Event()
+
+
+class JobScheduler:
+    def __init__(
+        self,
+        name: str,
+        max_concurrent: int = 2,
+        max_heavy: int = 1,
+        heavy_cost: float = 300.0,
+        aging_rate: float = 1.0,
+        fairness_weight: float = 1.0
+    ):
+        """
+        Args:
+            name: 로그/상태 표시용 이름 ("STT", "GPT")
+            max_concurrent: 동시에 실행할 작업 수
+            max_heavy: 동시에 실행할 무거운 작업 수
+            heavy_cost: 예상 처리 시간이 이 값(초) 이상이면 무거운 작업
+            aging_rate: 대기 1초당 점수 감소량 (클수록 긴 작업이 빨리 실행됨)
+            fairness_weight: 사용자별 실행 중인 작업량에 대한 가중치
+        """
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_heavy = max_heavy
+        self.heavy_cost = heavy_cost
+        self.aging_rate = aging_rate
+        self.fairness_weight = fairness_weight
+
+        self.waiting: List[_Job] = []
+        self.running: List[_Job] = []
+        self.stats = {"completed": 0, "total_wait": 0.0, "max_wait": 0.0}
+
+    @classmethod
+    def from_env(cls, name: str, prefix: str, max_concurrent: int = 2, max_heavy: int = 1, heavy_cost: float = 300.0):
+        """
+        환경 변수로 스케줄러 생성
+
+        {prefix}_MAX_CONCURRENT, {prefix}_MAX_HEAVY, {prefix}_HEAVY_COST, JOB_AGING_RATE, JOB_FAIRNESS_WEIGHT
+        """
+        return cls(
+            name,
+            max_concurrent=int(os.getenv(f"{prefix}_MAX_CONCURRENT", str(max_concurrent))),
+            max_heavy=int(os.getenv(f"{prefix}_MAX_HEAVY", str(max_heavy))),
+            heavy_cost=float(os.getenv(f"{prefix}_HEAVY_COST", str(heavy_cost))),
+            aging_rate=float(os.getenv("JOB_AGING_RATE", "1.0")),
+            fairness_weight=float(os.getenv("JOB_FAIRNESS_WEIGHT", "1.0")),
+        )
+
+    def _score(self, job: _Job, now: float) -> float:
+        user_running = sum(j.cost for j in self.running if j.user == job.user)
+        return job.cost + self.fairness_weight * user_running - self.aging_rate * (now - job.enqueued_at)
+
+    def _dispatch(self):
+        """빈 슬롯이 있으면 점수가 가장 낮은 대기 작업을 실행"""
+        now = time.monotonic()
+        while self.waiting and len(self.running) < self.max_concurrent:
+            heavy_running = sum(1 for j in self.running if j.heavy)
+            candidates = [j for j in self.waiting if not (j.heavy and heavy_running >= self.max_heavy)]
+            if not candidates:
+                break
+            job = min(candidates, key=lambda j: self._score(j, now))
+            self.waiting.remove(job)
+            job.started_at = now
+            self.running.append(job)
+            job.granted.set()
+
+    def _finish(self, job: _Job):
+        if job in self.running:
+            self.running.remove(job)
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, user: str, cost: float):
+        """
+        실행 차례가 올 때까지 기다린 뒤 작업 구간을 실행
+
+        Args:
+            user: 사용자 식별자 (client_id)
+            cost: 예상 처리 시간 (초)
+
+        사용 예:
+            async with stt_jobs.slot(user, estimate_stt_cost(duration)):
+                ...
+        """
+        job = _Job(user, cost, cost >= self.heavy_cost)
+        self.waiting.append(job)
+        self._dispatch()
+        try:
+            await job.granted.wait()
+        except asyncio.CancelledError:
+            # 대기 중 요청이 취소됨 (이미 슬롯을 받았으면 반납)
+            if job in self.waiting:
+                self.waiting.remove(job)
+            else:
+                self._finish(job)
+            raise
+
+        wait = job.started_at - job.enqueued_at
+        self.stats["total_wait"] += wait
+        self.stats["max_wait"] = max(self.stats["max_wait"], wait)
+        if wait >= 1:
+            print(f"{self.name} 작업 시작 (대기 {wait:.1f}초, 사용자 {user}, 예상 {cost:.0f}초)")
+        try:
+            yield wait
+        finally:
+            self.stats["completed"] += 1
+            self._finish(job)
+
+    def backlog_seconds(self) -> float:
+        """대기 중인 작업과 실행 중인 작업의 남은 예상 처리 시간 합 (슬롯 수로 나누지 않은 값)"""
+        now = time.monotonic()
+        running = sum(max(0.0, j.cost - (now - j.started_at)) for j in self.running)
+        return running + sum(j.cost for j in self.waiting)
+
+    def status(self) -> dict:
+        completed = self.stats["completed"] or 1
+        return {
+            "running": len(self.running),
+            "running_heavy": sum(1 for j in self.running if j.heavy),
+            "waiting": len(self.waiting),
+            "max_concurrent": self.max_concurrent,
+            "max_heavy": self.max_heavy,
+            "backlog_seconds": self.backlog_seconds(),
+            "completed": self.stats["completed"],
+            "avg_wait": self.stats["total_wait"] / completed,
+            "max_wait": self.stats["max_wait"],
+        }
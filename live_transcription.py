@@ -0,0 +1,292 @@
+"""
+실시간 회의 변환 (WebSocket)
+
+브라우저에서 보내는 오디오 스트림을 롤링 윈도우로 Whisper에 넣어
+임시(provisional) 결과와 확정(final) 세그먼트를 돌려줍니다.
+
+- 입력 형식: pcm16 (16kHz mono signed 16-bit little endian, 기본값)
+             opus (MediaRecorder의 webm/ogg Opus 스트림, ffmpeg로 디코딩)
+- 연결당 메모리: 아직 확정되지 않은 오디오만 보관하며 max_buffer_seconds의 2배를 넘지 않음
+- 여러 회의실: 전체 동시 Whisper 실행 수를 세마포어로 제한하여 한 CPU 노드를 공유
+"""
+import asyncio
+import os
+import queue
+import subprocess
+import threading
+import time
+from typing import List
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+
+class PCMDecoder:
+    """pcm16 바이트를 그대로 float32로 변환"""
+
+    def feed(self, data: bytes) -> np.ndarray:
+        usable = len(data) - len(data) % 2
+        return np.frombuffer(data[:usable], dtype="<i2").astype(np.float32) / 32768.0
+
+    def finish(self) -> np.ndarray:
+        return np.zeros(0, dtype=np.float32)
+
+    def close(self):
+        pass
+
+
+class OpusDecoder:
+    """
+    webm/ogg Opus 스트림을 ffmpeg 파이프로 16kHz mono PCM으로 디코딩
+
+    파이프 쓰기는 ffmpeg가 느리면 막힐 수 있으므로 전용 스레드에서 처리합니다
+    (feed는 이벤트 루프에서 호출되며, 막히면 모든 WebSocket 연결이 멈춤).
+    """
+
+    def __init__(self):
+        self.process = subprocess.Popen(
+            ["ffmpeg", "-loglevel", "quiet", "-i", "pipe:0", "-f", "s16le", "-ac", "1", "-ar", str(SAMPLE_RATE), "pipe:1"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+        )
+        self._chunks = []
+        self._lock = threading.Lock()
+        self._input = queue.Queue()
+        self._finished = False
+        self._writer = threading.Thread(target=self._write, daemon=True)
+        self._writer.start()
+        self._reader = threading.Thread(target=self._read, daemon=True)
+        self._reader.start()
+
+    def _write(self):
+        while True:
+            data = self._input.get()
+            if data is None:
+                break
+            try:
+                self.process.stdin.write(data)
+                self.process.stdin.flush()
+            except OSError:
+                # ffmpeg가 먼저 종료됨 (잘못된 스트림 등)
+                break
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+
+    def _read(self):
+        while True:
+            data = self.process.stdout.read(SAMPLE_RATE * 2 // 10)
+            if not data:
+                break
+            with self._lock:
+                self._chunks.append(data)
+
+    def _take(self) -> np.ndarray:
+        with self._lock:
+            pcm = b"".join(self._chunks)
+            self._chunks = []
+        return PCMDecoder().feed(pcm)
+
+    def feed(self, data: bytes) -> np.ndarray:
+        """입력을 쓰기 대기열에 넣고 지금까지 디코딩된 PCM 반환 (막히지 않음)"""
+        if not self._finished:
+            self._input.put(data)
+        return self._take()
+
+    def finish(self) -> np.ndarray:
+        """
+        입력을 닫고 ffmpeg가 버퍼에 남은 오디오까지 모두 내보내고 종료할 때까지 기다린 뒤 나머지 PCM 반환
+        (블로킹, 마지막 변환 전에 스레드에서 호출)
+        """
+        if not self._finished:
+            self._finished = True
+            self._input.put(None)
+            self._writer.join(timeout=5)
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+            self._reader.join(timeout=5)
+        return self._take()
+
+    def close(self):
+        """finish 없이 닫는 경우(오류 등) 남은 출력은 필요 없으므로 기다리지 않고 종료"""
+        if not self._finished:
+            self._finished = True
+            self._input.put(None)
+            self.process.kill()
+
+
+class LiveSession:
+    def __init__(self, room_id: str, audio_format: str = "pcm16", step_seconds: float = 2.0,
+                 max_buffer_seconds: float = 20.0, finalize_margin: float = 3.0):
+        """
+        Args:
+            room_id: 회의실 ID
+            audio_format: "pcm16" 또는 "opus"
+            step_seconds: 새 오디오가 이만큼 쌓일 때마다 Whisper 실행
+            max_buffer_seconds: 확정되지 않은 오디오가 이보다 길면 전부 확정
+            finalize_margin: 버퍼 끝에서 이 시간 이전에 끝난 세그먼트를 확정
+        """
+        if audio_format not in ("pcm16", "opus"):
+            raise ValueError(f"지원하지 않는 오디오 형식입니다: {audio_format}")
+
+        self.room_id = room_id
+        self.decoder = OpusDecoder() if audio_format == "opus" else PCMDecoder()
+        self.step_samples = int(step_seconds * SAMPLE_RATE)
+        self.max_buffer_samples = int(max_buffer_seconds * SAMPLE_RATE)
+        self.finalize_margin = finalize_margin
+
+        self.buffer = np.zeros(0, dtype=np.float32)
+        self.buffer_offset = 0.0  # buffer[0]의 회의 시작 기준 시각 (초)
+        self.pending_samples = 0  # 마지막 실행 이후 쌓인 샘플 수
+        self.total_samples = 0
+        self.bytes_received = 0
+        self.dropped_seconds = 0.0
+        self.processing_time = 0.0
+        self.finalized: List[dict] = []
+
+    @property
+    def duration(self) -> float:
+        return self.total_samples / SAMPLE_RATE
+
+    def add_audio(self, data: bytes):
+        """수신한 오디오를 버퍼에 추가 (메모리 상한을 넘으면 가장 오래된 오디오를 버림)"""
+        self.bytes_received += len(data)
+        self._append(self.decoder.feed(data))
+
+    def finish_input(self):
+        """입력 종료: 디코더에 남은 오디오를 버퍼에 추가 (블로킹, 마지막 변환 직전에 호출)"""
+        self._append(self.decoder.finish())
+
+    def _append(self, samples: np.ndarray):
+        self.buffer = np.concatenate([self.buffer, samples])
+        self.pending_samples += len(samples)
+        self.total_samples += len(samples)
+
+        # 추론이 밀려 버퍼가 계속 커지는 경우 대비
+        overflow = len(self.buffer) - 2 * self.max_buffer_samples
+        if overflow > 0:
+            self.buffer = self.buffer[overflow:]
+            self.buffer_offset += overflow / SAMPLE_RATE
+            self.dropped_seconds += overflow / SAMPLE_RATE
+
+    def ready(self) -> bool:
+        return self.pending_samples >= self.step_samples
+
+    def apply_result(self, segments: List[dict], buffer_length: int, start_offset: float, final: bool = False):
+        """
+        Whisper 결과를 확정/임시 세그먼트로 나누고 확정된 구간만큼 버퍼를 비웁니다.
+
+        Args:
+            segments: 버퍼 기준 시각의 세그먼트 목록
+            buffer_length: 추론에 사용한 버퍼 샘플 수 (추론 중 들어온 오디오는 보존)
+            start_offset: 추론 시작 시점의 buffer_offset
+            final: True이면 모두 확정 (회의 종료 또는 버퍼 상한 초과)
+
+        Returns:
+            tuple: (새로 확정된 세그먼트, 임시 세그먼트)
+        """
+        window_seconds = buffer_length / SAMPLE_RATE
+        final = final or buffer_length >= self.max_buffer_samples
+
+        new_final, provisional = [], []
+        cut_seconds = 0.0
+        for segment in segments:
+            shifted = {
+                "start": start_offset + segment["start"],
+                "end": start_offset + min(segment["end"], window_seconds),
+                "text": segment["text"].strip(),
+            }
+            if not shifted["text"]:
+                continue
+            if final or segment["end"] <= window_seconds - self.finalize_margin:
+                new_final.append(shifted)
+                cut_seconds = min(segment["end"], window_seconds)
+            else:
+                provisional.append(shifted)
+
+        if final:
+            cut_seconds = window_seconds
+
+        # 추론 중 상한 초과로 앞부분이 이미 버려졌다면 그만큼 덜 자름
+        dropped_during_pass = int(round((self.buffer_offset - start_offset) * SAMPLE_RATE))
+        cut_samples = max(0, int(cut_seconds * SAMPLE_RATE) - dropped_during_pass)
+        if cut_samples:
+            self.buffer = self.buffer[cut_samples:]
+            self.buffer_offset += cut_samples / SAMPLE_RATE
+        self.finalized.extend(new_final)
+        return new_final, provisional
+
+    def transcript(self) -> str:
+        return " ".join(segment["text"] for segment in self.finalized)
+
+    def close(self):
+        self.decoder.close()
+
+
+class LiveTranscriber:
+    """회의실별 LiveSession을 관리하고 Whisper 실행을 공유 자원으로 제한"""
+
+    def __init__(self, max_rooms: int = 16, max_concurrent_passes: int = 2):
+        self.max_rooms = max_rooms
+        self.rooms = {}
+        self.passes = asyncio.Semaphore(max_concurrent_passes)
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            max_rooms=int(os.getenv("LIVE_MAX_ROOMS", "16")),
+            max_concurrent_passes=int(os.getenv("LIVE_MAX_CONCURRENT_PASSES", "2")),
+        )
+
+    def open(self, room_id: str, audio_format: str = "pcm16") -> LiveSession:
+        if room_id in self.rooms:
+            raise ValueError("이미 진행 중인 회의실입니다")
+        if len(self.rooms) >= self.max_rooms:
+            raise RuntimeError("동시에 진행할 수 있는 회의 수를 초과했습니다")
+        session = LiveSession(
+            room_id,
+            audio_format=audio_format,
+            step_seconds=float(os.getenv("LIVE_STEP_SECONDS", "2")),
+            max_buffer_seconds=float(os.getenv("LIVE_MAX_BUFFER_SECONDS", "20")),
+        )
+        self.rooms[room_id] = session
+        return session
+
+    def close(self, room_id: str):
+        session = self.rooms.pop(room_id, None)
+        if session:
+            session.close()
+
+    async def run_pass(self, session: LiveSession, transcriber, final: bool = False):
+        """
+        현재 버퍼로 Whisper를 한 번 실행하고 결과를 반영
+
+        Returns:
+            tuple: (새로 확정된 세그먼트, 임시 세그먼트)
+        """
+        from fastapi.concurrency import run_in_threadpool
+
+        session.pending_samples = 0
+        buffer_length = len(session.buffer)
+        if buffer_length == 0:
+            return [], []
+
+        audio = session.buffer[:buffer_length]
+        start_offset = session.buffer_offset
+        async with self.passes:
+            start = time.time()
+            _, segments = await run_in_threadpool(transcriber.transcribe_segments, audio)
+            session.processing_time += time.time() - start
+        return session.apply_result(segments, buffer_length, start_offset, final=final)
+
+    def status(self) -> dict:
+        return {
+            "rooms": len(self.rooms),
+            "max_rooms": self.max_rooms,
+            "buffered_seconds": sum(len(s.buffer) for s in self.rooms.values()) / SAMPLE_RATE,
+        }
@@ -3,6 +3,7 @@ import os
 from datetime import datetime
 from stt_module import STTProcessor
 from gpt_summarizer import GPTSummarizer
+from transcript_compactor import compact_transcript
 
 
 def save_output(transcript, summary, output_dir="output"):
@@ -55,8 +56,10 @@ def main():
 
         # 2단계: GPT 요약
         print("[2/3] GPT로 회의록 작성 중...")
+        compacted, stats = compact_transcript(transcript)
+        print(f"텍스트 압축: 약 {stats['tokens_saved']}토큰 절감 ({stats['saved_ratio'] * 100:.1f}%)")
         summarizer = GPTSummarizer()
-        summary = summarizer.summarize(transcript)
+        summary = summarizer.summarize(compacted)
         print(f"\n생성된 회의록:\n{summary}\n")
 
         # 3단계: 파일 저장
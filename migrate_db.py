@@ -1,22 +1,464 @@
 """
 데이터베이스 마이그레이션 스크립트
 기존 meeting_records 테이블을 transcript_records와 summary_records로 분리
+
+- 원본 행을 ID 순으로 batch_size개씩 읽어(keyset 페이지네이션) executemany로 한 번에 삽입
+- 배치 삽입과 체크포인트(migration_checkpoints 테이블) 갱신을 같은 트랜잭션으로 커밋하므로
+  중간에 실패해도 다시 실행하면 마지막으로 커밋된 배치 다음부터 이어서 진행
+- transcript_records.id는 meeting_records.id를 그대로 사용 (요약의 transcript_id 매핑 불필요)
+- 본문(transcript/summary)은 저장된 표본으로 학습한 zstd 사전으로 압축하고 검색 시그니처를 채움
+  (text_compression.py, 이미 최신 사전으로 압축된 행은 건너뜀)
+
+실행:
+    python migrate_db.py                 # 확인 후 실행
+    python migrate_db.py --yes           # 배포 스크립트 등 비대화형 실행
+    python migrate_db.py --yes --batch-size 10000
+    python migrate_db.py --yes --retrain-dictionary --vacuum   # 사전 재학습 + 재압축 후 SQLite 파일 정리
 """
-from database import SessionLocal, engine
-from models import TranscriptRecord, SummaryRecord, Base
-from sqlalchemy import text, inspect
+import argparse
+import json
 import sys
+import time
+
+from sqlalchemy import DateTime, LargeBinary, bindparam, inspect, text
+
+from models import TranscriptRecord, SummaryRecord, CompressionDictionary, Base
+from segment_store import pack_segments
+from text_compression import (
+    registry, compress_text, decompress_text, is_compressed, search_signature, train_dictionary
+)
+
+CHECKPOINT_TABLE = "migration_checkpoints"
+DEFAULT_BATCH_SIZE = 5000
+# 압축 대상 본문 컬럼 (테이블, 컬럼)
+COMPRESSED_COLUMNS = (("transcript_records", "transcript"), ("summary_records", "summary"))
+
 
+def _get_engine():
+    from database import engine
+    return engine
 
-def check_old_schema_exists():
+
+def check_old_schema_exists(engine=None):
     """기존 스키마(meeting_records) 존재 여부 확인"""
-    inspector = inspect(engine)
+    inspector = inspect(engine or _get_engine())
     return 'meeting_records' in inspector.get_table_names()
 
 
-def migrate_data():
+def add_missing_columns(engine=None):
+    """
+    모델에 새로 추가된 컬럼을 기존 테이블에 추가 (ALTER TABLE ADD COLUMN)
+    create_all은 이미 존재하는 테이블의 컬럼을 변경하지 않으므로 별도로 처리
+    """
+    engine = engine or _get_engine()
+    inspector = inspect(engine)
+    existing_tables = inspector.get_table_names()
+    added = []
+
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing_columns = {col["name"] for col in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+                added.append(f"{table.name}.{column.name}")
+                # 새 컬럼에 걸린 인덱스도 생성
+                for index in table.indexes:
+                    if column.name in index.columns:
+                        index.create(conn)
+
+    for name in added:
+        print(f"  ✓ 컬럼 추가: {name}")
+    return added
+
+
+def add_missing_indexes(engine=None):
+    """
+    기존 컬럼에 새로 지정된 인덱스 생성 (예: 목록 정렬용 created_at 인덱스)
+    add_missing_columns 다음에 호출 (새 컬럼의 인덱스는 그쪽에서 생성)
+    """
+    engine = engine or _get_engine()
+    inspector = inspect(engine)
+    existing_tables = inspector.get_table_names()
+    created = []
+
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    index.create(conn)
+                    created.append(index.name)
+
+    for name in created:
+        print(f"  ✓ 인덱스 생성: {name}")
+    return created
+
+
+# ============================================
+# 체크포인트
+# ============================================
+
+def _ensure_checkpoint_table(conn):
+    conn.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS {CHECKPOINT_TABLE} (
+            name VARCHAR(100) PRIMARY KEY,
+            last_id INTEGER NOT NULL,
+            rows_done INTEGER NOT NULL,
+            updated_at FLOAT NOT NULL
+        )
+    """))
+
+
+def load_checkpoint(conn, name: str):
+    """(마지막으로 커밋된 원본 ID, 처리한 행 수), 없으면 (0, 0)"""
+    row = conn.execute(
+        text(f"SELECT last_id, rows_done FROM {CHECKPOINT_TABLE} WHERE name = :name"),
+        {"name": name}
+    ).first()
+    return (row.last_id, row.rows_done) if row else (0, 0)
+
+
+def save_checkpoint(conn, name: str, last_id: int, rows_done: int):
+    """배치 삽입과 같은 트랜잭션 안에서 호출"""
+    updated = conn.execute(
+        text(f"UPDATE {CHECKPOINT_TABLE} SET last_id = :last_id, rows_done = :rows_done, updated_at = :now WHERE name = :name"),
+        {"name": name, "last_id": last_id, "rows_done": rows_done, "now": time.time()}
+    )
+    if updated.rowcount == 0:
+        conn.execute(
+            text(f"INSERT INTO {CHECKPOINT_TABLE} (name, last_id, rows_done, updated_at) VALUES (:name, :last_id, :rows_done, :now)"),
+            {"name": name, "last_id": last_id, "rows_done": rows_done, "now": time.time()}
+        )
+
+
+class _Progress:
+    """배치마다 한 줄씩 진행률과 처리 속도(rows/s) 출력"""
+
+    def __init__(self, label: str, total: int, already_done: int):
+        self.label = label
+        self.total = total
+        self.done = already_done
+        self.session_rows = 0
+        self.started = time.perf_counter()
+
+    def update(self, rows: int):
+        self.done += rows
+        self.session_rows += rows
+        print(f"  {self.label}: {self.done:,}/{self.total:,} ({self.rate:,.0f} rows/s)")
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    @property
+    def rate(self) -> float:
+        return self.session_rows / self.elapsed if self.elapsed else 0.0
+
+
+# ============================================
+# 마이그레이션 단계
+# ============================================
+
+def migrate_meeting_records(engine=None, batch_size: int = DEFAULT_BATCH_SIZE) -> dict:
+    """
+    meeting_records → transcript_records / summary_records 배치 복사 (재개 가능)
+
+    원본 ID를 그대로 쓰되, 앱이 이미 transcript_records에 기록을 만든 상태라면 ID가 겹치지 않도록
+    기존 최대 ID만큼 더한 값을 새 ID로 씁니다 (오프셋은 체크포인트에 저장하여 재개 시에도 같은 값 사용).
+
+    Returns:
+        dict: {"transcripts", "summaries", "seconds", "rows_per_second"}
+    """
+    engine = engine or _get_engine()
+    transcript_table = TranscriptRecord.__table__
+    summary_table = SummaryRecord.__table__
+    # SQLite는 created_at을 문자열로 돌려주므로 DateTime으로 변환하여 읽음
+    select_batch = text("""
+        SELECT id, filename, file_size, audio_duration, transcript,
+               whisper_model, stt_processing_time, summary,
+               gpt_model, gpt_processing_time, created_at
+        FROM meeting_records
+        WHERE id > :last_id
+        ORDER BY id
+        LIMIT :limit
+    """).columns(created_at=DateTime())
+
+    with engine.begin() as conn:
+        _ensure_checkpoint_table(conn)
+        last_id, rows_done = load_checkpoint(conn, "meeting_records")
+        total = conn.execute(text("SELECT COUNT(*) FROM meeting_records")).scalar()
+        if rows_done:
+            id_offset, _ = load_checkpoint(conn, "meeting_records_id_offset")
+        else:
+            id_offset = conn.execute(text("SELECT COALESCE(MAX(id), 0) FROM transcript_records")).scalar()
+            save_checkpoint(conn, "meeting_records_id_offset", id_offset, 0)
+
+    if rows_done:
+        print(f"  ↻ 체크포인트에서 재개 (원본 ID {last_id} 이후, {rows_done:,}행 완료)")
+    if id_offset:
+        print(f"  ⚠️  transcript_records에 기존 기록이 있어 새 ID = 원본 ID + {id_offset:,}로 복사합니다")
+    progress = _Progress("meeting_records", total, rows_done)
+    summary_count = 0
+
+    while True:
+        # 배치마다 한 트랜잭션: 삽입 + 체크포인트가 함께 커밋되거나 함께 롤백됨
+        with engine.begin() as conn:
+            rows = conn.execute(select_batch, {"last_id": last_id, "limit": batch_size}).fetchall()
+            if not rows:
+                break
+
+            transcripts = [{
+                "id": row.id + id_offset,
+                "filename": row.filename,
+                "file_size": row.file_size,
+                "audio_duration": row.audio_duration,
+                "transcript": row.transcript,
+                "whisper_model": row.whisper_model or "base",
+                "stt_processing_time": row.stt_processing_time,
+                "created_at": row.created_at,
+            } for row in rows]
+            summaries = [{
+                "transcript_id": row.id + id_offset,
+                "summary": row.summary,
+                "gpt_model": row.gpt_model,
+                "gpt_processing_time": row.gpt_processing_time,
+                "created_at": row.created_at,
+            } for row in rows if row.summary and row.gpt_model]
+
+            conn.execute(transcript_table.insert(), transcripts)
+            if summaries:
+                conn.execute(summary_table.insert(), summaries)
+
+            last_id = rows[-1].id
+            save_checkpoint(conn, "meeting_records", last_id, progress.done + len(rows))
+
+        summary_count += len(summaries)
+        progress.update(len(rows))
+
+    # ID를 직접 넣었으므로 PostgreSQL 시퀀스를 최대 ID 다음으로 맞춤
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as conn:
+            conn.execute(text(
+                "SELECT setval(pg_get_serial_sequence('transcript_records', 'id'), "
+                "COALESCE((SELECT MAX(id) FROM transcript_records), 1))"
+            ))
+
+    return {
+        "transcripts": progress.session_rows,
+        "summaries": summary_count,
+        "seconds": progress.elapsed,
+        "rows_per_second": progress.rate,
+    }
+
+
+def convert_json_segments(engine=None, batch_size: int = DEFAULT_BATCH_SIZE):
+    """
+    이전 버전의 JSON segments 컬럼을 컬럼형 segment_data 블롭으로 변환
+    (변환 후 segments 컬럼은 더 이상 사용하지 않으므로 직접 삭제해도 됨)
+    """
+    engine = engine or _get_engine()
+    inspector = inspect(engine)
+    if "transcript_records" not in inspector.get_table_names():
+        return 0
+    columns = {col["name"] for col in inspector.get_columns("transcript_records")}
+    if "segments" not in columns:
+        return 0
+
+    # segment_data IS NULL 조건 자체가 진행 상황이므로 별도 체크포인트 없이 재개됨
+    select_batch = text("""
+        SELECT id, segments FROM transcript_records
+        WHERE segments IS NOT NULL AND segment_data IS NULL AND id > :last_id
+        ORDER BY id
+        LIMIT :limit
+    """)
+    update = text("UPDATE transcript_records SET segment_data = :data WHERE id = :id")
+
+    converted = 0
+    last_id = 0
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(select_batch, {"last_id": last_id, "limit": batch_size}).fetchall()
+            if not rows:
+                break
+            conn.execute(update, [
+                {"data": pack_segments(json.loads(row.segments)), "id": row.id}
+                for row in rows
+            ])
+            last_id = rows[-1].id
+        converted += len(rows)
+
+    if converted:
+        print(f"  ✓ JSON 세그먼트 {converted:,}개를 segment_data로 변환")
+    return converted
+
+
+def train_compression_dictionary(engine=None, max_samples: int = 1000, sample_chars: int = 4000, force: bool = False):
+    """
+    저장된 STT 결과/회의록 표본으로 zstd 사전을 학습하여 compression_dictionaries에 저장
+
+    Args:
+        max_samples: 테이블당 최대 표본 수 (최근 레코드부터)
+        sample_chars: 표본당 사용할 앞부분 글자 수 (학습 메모리 제한)
+        force: 이미 사전이 있어도 새로 학습 (이후 압축은 새 사전 사용)
+
+    Returns:
+        int: 새 사전 ID (학습하지 않았으면 None)
+    """
+    engine = engine or _get_engine()
+    with engine.connect() as conn:
+        if not force and conn.execute(text("SELECT COUNT(*) FROM compression_dictionaries")).scalar():
+            return None
+        samples = []
+        for table, column in COMPRESSED_COLUMNS:
+            rows = conn.execute(
+                text(f"SELECT {column} FROM {table} ORDER BY id DESC LIMIT :limit"), {"limit": max_samples}
+            )
+            samples.extend(decompress_text(value)[:sample_chars] for (value,) in rows)
+
+    dict_data = train_dictionary(samples)
+    if dict_data is None:
+        return None
+    with engine.begin() as conn:
+        result = conn.execute(CompressionDictionary.__table__.insert(), {
+            "dict_data": dict_data, "sample_count": len(samples)
+        })
+        dict_id = result.inserted_primary_key[0]
+    registry.configure(engine)
+    print(f"  ✓ 압축 사전 학습 완료 (ID {dict_id}, 표본 {len(samples):,}개, {len(dict_data) / 1024:.0f}KB)")
+    return dict_id
+
+
+def _ensure_binary_column(engine, table: str, column: str):
+    """PostgreSQL은 TEXT 컬럼에 바이너리를 넣을 수 없으므로 BYTEA로 변경 (SQLite는 타입과 무관하게 저장)"""
+    if engine.dialect.name != "postgresql":
+        return
+    for col in inspect(engine).get_columns(table):
+        if col["name"] == column and not isinstance(col["type"], LargeBinary):
+            with engine.begin() as conn:
+                conn.execute(text(
+                    f"ALTER TABLE {table} ALTER COLUMN {column} TYPE BYTEA USING convert_to({column}, 'UTF8')"
+                ))
+            print(f"  ✓ {table}.{column} 컬럼을 BYTEA로 변경")
+
+
+def compress_text_columns(engine=None, batch_size: int = DEFAULT_BATCH_SIZE, retrain: bool = False) -> dict:
+    """
+    기존 본문을 압축 형식으로 바꾸고 검색 시그니처를 채움 (재실행 시 이미 처리된 행은 건너뜀)
+
+    최신 사전이 아닌 사전(또는 사전 없이)으로 압축된 행은 최신 사전으로 다시 압축합니다.
+
+    Returns:
+        dict: {"테이블": {"rows", "bytes_before", "bytes_after"}}
+    """
+    engine = engine or _get_engine()
+    registry.configure(engine)
+    existing = inspect(engine).get_table_names()
+    targets = [(table, column) for table, column in COMPRESSED_COLUMNS if table in existing]
+    for table, column in targets:
+        _ensure_binary_column(engine, table, column)
+    train_compression_dictionary(engine, force=retrain)
+
+    results = {}
+    for table, column in targets:
+        select_batch = text(f"""
+            SELECT id, {column} AS body, search_signature FROM {table}
+            WHERE id > :last_id ORDER BY id LIMIT :limit
+        """)
+        update = text(f"UPDATE {table} SET {column} = :body, search_signature = :signature WHERE id = :id").bindparams(
+            bindparam("body", type_=LargeBinary), bindparam("signature", type_=LargeBinary)
+        )
+        with engine.connect() as conn:
+            total = conn.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar()
+        progress = _Progress(f"{table}.{column} 압축", total, 0)
+        stats = {"rows": 0, "bytes_before": 0, "bytes_after": 0}
+        last_id = 0
+
+        while True:
+            with engine.begin() as conn:
+                rows = conn.execute(select_batch, {"last_id": last_id, "limit": batch_size}).fetchall()
+                if not rows:
+                    break
+                updates = []
+                for row in rows:
+                    body = row.body
+                    size = len(body.encode("utf-8")) if isinstance(body, str) else len(body)
+                    stats["bytes_before"] += size
+                    if is_compressed(body) and row.search_signature is not None:
+                        stats["bytes_after"] += size
+                        continue
+                    value = decompress_text(body)
+                    compressed = bytes(body) if is_compressed(body) else compress_text(value)
+                    stats["bytes_after"] += len(compressed)
+                    updates.append({"id": row.id, "body": compressed, "signature": search_signature(value)})
+                if updates:
+                    conn.execute(update, updates)
+                last_id = rows[-1].id
+            stats["rows"] += len(updates)
+            progress.update(len(rows))
+
+        results[table] = stats
+        if stats["bytes_before"]:
+            print(
+                f"  ✓ {table}.{column}: {stats['rows']:,}행 처리, "
+                f"{stats['bytes_before'] / 1024 ** 2:.1f}MB → {stats['bytes_after'] / 1024 ** 2:.1f}MB"
+            )
+    return results
+
+
+def vacuum(engine=None):
+    """SQLite 파일 크기 줄이기 (압축으로 비워진 페이지 반환, 트랜잭션 밖에서 실행)"""
+    engine = engine or _get_engine()
+    if engine.dialect.name != "sqlite":
+        return
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM"))
+    print("  ✓ VACUUM 완료")
+
+
+def archive_old_table(engine=None) -> str:
+    """
+    meeting_records를 백업 이름으로 변경 (행 복사 없이 RENAME)
+
+    Returns:
+        str: 백업 테이블 이름
+    """
+    engine = engine or _get_engine()
+    existing = inspect(engine).get_table_names()
+    backup = "meeting_records_backup"
+    if backup in existing:
+        backup = f"meeting_records_backup_{int(time.time())}"
+    with engine.begin() as conn:
+        conn.execute(text(f"ALTER TABLE meeting_records RENAME TO {backup}"))
+        conn.execute(text(f"DELETE FROM {CHECKPOINT_TABLE} WHERE name = 'meeting_records'"))
+    return backup
+
+
+def create_or_upgrade_tables(engine=None, batch_size: int = DEFAULT_BATCH_SIZE):
+    """
+    새 테이블 생성 + 기존 테이블 업그레이드 (컬럼/인덱스 추가, JSON 세그먼트 변환)
+
+    앱이 이전 버전으로 이미 transcript_records/summary_records를 만든 경우에도
+    복사/압축 단계가 새 컬럼(search_signature 등)을 사용할 수 있도록 그 전에 호출합니다.
+    """
+    engine = engine or _get_engine()
+    Base.metadata.create_all(bind=engine)
+    add_missing_columns(engine)
+    add_missing_indexes(engine)
+    convert_json_segments(engine, batch_size)
+
+
+def migrate_data(assume_yes: bool = False, batch_size: int = DEFAULT_BATCH_SIZE, engine=None,
+                 run_vacuum: bool = False, retrain_dictionary: bool = False):
     """기존 데이터를 새 스키마로 마이그레이션"""
-    db = SessionLocal()
+    engine = engine or _get_engine()
+    registry.configure(engine)
 
     try:
         print("=" * 80)
@@ -24,130 +466,92 @@ def migrate_data():
         print("=" * 80)
 
         # 1. 기존 스키마 확인
-        if not check_old_schema_exists():
+        if not check_old_schema_exists(engine):
             print("\n✅ 기존 meeting_records 테이블이 없습니다.")
             print("   새로운 스키마로 테이블을 생성합니다...\n")
-            Base.metadata.create_all(bind=engine)
+            create_or_upgrade_tables(engine, batch_size)
             print("✅ 새 테이블 생성 완료!")
             print("   - transcript_records")
             print("   - summary_records")
+            compress_text_columns(engine, batch_size, retrain=retrain_dictionary)
+            if run_vacuum:
+                vacuum(engine)
             return
 
         print("\n📋 기존 meeting_records 테이블 발견!")
 
-        # 2. 기존 데이터 조회
-        result = db.execute(text("SELECT COUNT(*) FROM meeting_records"))
-        count = result.scalar()
-
-        print(f"   총 {count}개의 레코드가 있습니다.")
+        with engine.connect() as conn:
+            count = conn.execute(text("SELECT COUNT(*) FROM meeting_records")).scalar()
+        print(f"   총 {count:,}개의 레코드가 있습니다.")
 
         if count == 0:
             print("\n⚠️  데이터가 없으므로 테이블만 재생성합니다.\n")
-            # 기존 테이블 삭제
-            db.execute(text("DROP TABLE IF EXISTS meeting_records"))
-            db.commit()
-            # 새 테이블 생성
-            Base.metadata.create_all(bind=engine)
+            with engine.begin() as conn:
+                conn.execute(text("DROP TABLE IF EXISTS meeting_records"))
+            create_or_upgrade_tables(engine, batch_size)
             print("✅ 새 테이블 생성 완료!")
+            compress_text_columns(engine, batch_size, retrain=retrain_dictionary)
+            if run_vacuum:
+                vacuum(engine)
             return
 
-        # 3. 사용자 확인
+        # 2. 사용자 확인 (--yes 또는 비대화형 환경에서는 생략 불가 → 명시적으로 --yes 필요)
         print("\n⚠️  주의: 기존 데이터를 새 스키마로 마이그레이션합니다.")
         print("   - transcript_records: STT 변환 데이터만 저장")
         print("   - summary_records: GPT 요약 데이터만 저장 (기존 데이터에서 생성)")
-        response = input("\n계속하시겠습니까? (y/N): ")
-
-        if response.lower() != 'y':
-            print("\n❌ 마이그레이션이 취소되었습니다.")
-            return
+        if not assume_yes:
+            if not sys.stdin.isatty():
+                print("\n❌ 비대화형 환경입니다. 확인 없이 실행하려면 --yes 옵션을 사용하세요.")
+                sys.exit(2)
+            response = input("\n계속하시겠습니까? (y/N): ")
+            if response.lower() != 'y':
+                print("\n❌ 마이그레이션이 취소되었습니다.")
+                return
 
-        print("\n🔄 데이터 마이그레이션 중...\n")
-
-        # 4. 기존 데이터 읽기
-        old_records = db.execute(text("""
-            SELECT id, filename, file_size, audio_duration, transcript,
-                   whisper_model, stt_processing_time, summary,
-                   gpt_model, gpt_processing_time, created_at
-            FROM meeting_records
-            ORDER BY id
-        """)).fetchall()
-
-        # 5. 새 테이블 생성
-        Base.metadata.create_all(bind=engine)
-        print(f"✅ 새 테이블 생성 완료 (transcript_records, summary_records)")
-
-        # 6. 데이터 마이그레이션
-        transcript_count = 0
-        summary_count = 0
-
-        for old_record in old_records:
-            # TranscriptRecord 생성
-            transcript_record = TranscriptRecord(
-                filename=old_record.filename,
-                file_size=old_record.file_size,
-                audio_duration=old_record.audio_duration,
-                transcript=old_record.transcript,
-                whisper_model=old_record.whisper_model or "base",
-                stt_processing_time=old_record.stt_processing_time,
-                created_at=old_record.created_at
-            )
-            db.add(transcript_record)
-            db.flush()  # ID 생성
-            transcript_count += 1
-
-            print(f"  ✓ Transcript #{transcript_record.id}: {old_record.filename}")
-
-            # Summary가 있으면 SummaryRecord 생성
-            if old_record.summary and old_record.gpt_model:
-                summary_record = SummaryRecord(
-                    transcript_id=transcript_record.id,
-                    summary=old_record.summary,
-                    gpt_model=old_record.gpt_model,
-                    gpt_processing_time=old_record.gpt_processing_time,
-                    created_at=old_record.created_at
-                )
-                db.add(summary_record)
-                summary_count += 1
-                print(f"    └─ Summary #{summary_record.id}: {old_record.gpt_model}")
-
-        db.commit()
+        # 3. 새 테이블 생성(기존 테이블은 업그레이드) 후 배치 복사
+        create_or_upgrade_tables(engine, batch_size)
+        print("✅ 새 테이블 생성 완료 (transcript_records, summary_records)")
+        print(f"\n🔄 데이터 마이그레이션 중... (배치 {batch_size:,}행)\n")
+        result = migrate_meeting_records(engine, batch_size)
 
         print(f"\n✅ 데이터 마이그레이션 완료!")
-        print(f"   - Transcript 레코드: {transcript_count}개")
-        print(f"   - Summary 레코드: {summary_count}개")
-
-        # 7. 기존 테이블 백업 및 삭제
-        print("\n🗑️  기존 테이블 정리 중...")
+        print(f"   - Transcript 레코드: {result['transcripts']:,}개")
+        print(f"   - Summary 레코드: {result['summaries']:,}개")
+        print(f"   - 소요 시간: {result['seconds']:.1f}초 ({result['rows_per_second']:,.0f} rows/s)")
 
-        # 백업 테이블 생성
-        db.execute(text("""
-            CREATE TABLE IF NOT EXISTS meeting_records_backup AS
-            SELECT * FROM meeting_records
-        """))
-        print("  ✓ meeting_records를 meeting_records_backup으로 백업")
+        # 사전 학습 후 최신 사전으로 재압축 + 검색 시그니처 생성
+        print("\n🗜️  본문 압축 중...\n")
+        compress_text_columns(engine, batch_size, retrain=retrain_dictionary)
 
-        # 기존 테이블 삭제
-        db.execute(text("DROP TABLE meeting_records"))
-        db.commit()
-        print("  ✓ meeting_records 테이블 삭제")
+        # 4. 기존 테이블 백업
+        print("\n🗑️  기존 테이블 정리 중...")
+        backup = archive_old_table(engine)
+        print(f"  ✓ meeting_records를 {backup}(으)로 이름 변경")
 
         print("\n" + "=" * 80)
         print("✅ 마이그레이션 완료!")
         print("=" * 80)
         print("\n📌 참고:")
-        print("  - 기존 데이터는 meeting_records_backup 테이블에 백업되어 있습니다.")
-        print("  - 문제가 없다면 나중에 'DROP TABLE meeting_records_backup'으로 삭제하세요.")
+        print(f"  - 기존 데이터는 {backup} 테이블에 백업되어 있습니다.")
+        print(f"  - 문제가 없다면 나중에 'DROP TABLE {backup}'으로 삭제하세요.")
         print("  - VS Code의 SQLite Viewer로 데이터를 확인할 수 있습니다.")
 
     except Exception as e:
-        db.rollback()
         print(f"\n❌ 오류 발생: {str(e)}")
-        print("   데이터베이스가 롤백되었습니다.")
+        print("   마지막으로 커밋된 배치까지는 저장되어 있습니다. 다시 실행하면 이어서 진행합니다.")
         sys.exit(1)
 
-    finally:
-        db.close()
-
 
 if __name__ == "__main__":
-    migrate_data()
+    parser = argparse.ArgumentParser(description="meeting_records → transcript_records/summary_records 마이그레이션")
+    parser.add_argument("--yes", "-y", action="store_true", help="확인 없이 실행 (배포/CI용)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help=f"배치당 행 수 (기본값: {DEFAULT_BATCH_SIZE})")
+    parser.add_argument("--retrain-dictionary", action="store_true", help="압축 사전을 새로 학습하고 본문을 재압축")
+    parser.add_argument("--vacuum", action="store_true", help="완료 후 SQLite VACUUM (압축으로 줄어든 파일 크기 반영)")
+    args = parser.parse_args()
+    migrate_data(
+        assume_yes=args.yes,
+        batch_size=args.batch_size,
+        run_vacuum=args.vacuum,
+        retrain_dictionary=args.retrain_dictionary
+    )
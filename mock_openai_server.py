@@ -0,0 +1,149 @@
+"""
+로컬 OpenAI mock 서버 (Chat Completions만 지원)
+
+429/5xx 응답을 일정 비율로 주입하여 재시도/한도 제어를 테스트합니다.
+stream=true 요청은 응답을 여러 조각(SSE)으로 나눠 보내며, 중간에 연결이 끊기면 생성을 멈추고
+stats의 aborted에 기록합니다 (요청 취소 테스트용).
+response_format이 json_schema이면 스키마에 맞는 샘플 JSON(주제/결정/액션 아이템)을 반환합니다.
+
+사용법:
+    python mock_openai_server.py --port 8100 --rate-429 0.3 --rate-5xx 0.1
+    OPENAI_BASE_URL=http://localhost:8100/v1 OPENAI_API_KEY=test python api.py
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+app = FastAPI(title="OpenAI mock 서버")
+
+# 실행 인자로 덮어씀
+config = {"rate_429": 0.0, "rate_5xx": 0.0, "latency": 0.2, "retry_after": 1}
+stats = {"requests": 0, "injected_429": 0, "injected_5xx": 0, "completed": 0, "aborted": 0}
+
+# 스트리밍 응답을 나눌 조각 수 (지연 시간도 조각마다 나눠서 대기)
+STREAM_PIECES = 10
+
+
+async def stream_completion(completion_id: str, model: str, content: str, usage: dict, include_usage: bool):
+    """Chat Completions 스트리밍(SSE) 형식으로 응답 조각 전송"""
+    base = {"id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()), "model": model}
+    step = max(1, len(content) // STREAM_PIECES)
+    try:
+        for start in range(0, len(content), step):
+            await asyncio.sleep(config["latency"] / STREAM_PIECES)
+            delta = {"content": content[start:start + step]}
+            if start == 0:
+                delta["role"] = "assistant"
+            chunk = {**base, "choices": [{"index": 0, "delta": delta, "finish_reason": None}]}
+            yield f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+        yield f"data: {json.dumps({**base, 'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'stop'}]})}\n\n"
+        if include_usage:
+            yield f"data: {json.dumps({**base, 'choices': [], 'usage': usage})}\n\n"
+        yield "data: [DONE]\n\n"
+        stats["completed"] += 1
+    except asyncio.CancelledError:
+        # 클라이언트가 연결을 끊음 (요청 취소)
+        stats["aborted"] += 1
+        raise
+
+
+def structured_content(response_format: dict) -> str:
+    """json_schema 요청에 대한 샘플 응답 (minutes 필드는 스키마에 있을 때만)"""
+    properties = response_format.get("json_schema", {}).get("schema", {}).get("properties", {})
+    data = {
+        "topics": ["(mock) 신제품 출시 일정", "(mock) 마케팅 예산"],
+        "decisions": ["(mock) 출시일을 다음 달 첫째 주로 확정"],
+        "action_items": [
+            {"task": "(mock) 출시 홍보 계획 초안 작성", "owner": "김민수", "team": "마케팅", "due_date": "2025-12-05"},
+            {"task": "(mock) 예산안 검토", "owner": None, "team": "재무", "due_date": None},
+        ],
+    }
+    if "minutes" in properties:
+        data = {"minutes": "1. **회의 주제**: (mock) 테스트 회의록", **data}
+    return json.dumps(data, ensure_ascii=False)
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    stats["requests"] += 1
+
+    roll = random.random()
+    if roll < config["rate_429"]:
+        stats["injected_429"] += 1
+        return JSONResponse(
+            status_code=429,
+            headers={"Retry-After": str(config["retry_after"])},
+            content={"error": {"message": "Rate limit reached (mock)", "type": "rate_limit_error"}},
+        )
+    if roll < config["rate_429"] + config["rate_5xx"]:
+        stats["injected_5xx"] += 1
+        return JSONResponse(
+            status_code=random.choice([500, 502, 503]),
+            content={"error": {"message": "Server error (mock)", "type": "server_error"}},
+        )
+
+    prompt_chars = sum(len(m.get("content") or "") for m in body.get("messages", []))
+    response_format = body.get("response_format") or {}
+    if body.get("mock_response"):
+        content = body["mock_response"]
+    elif response_format.get("type") == "json_schema":
+        content = structured_content(response_format)
+    else:
+        content = "1. **회의 주제**: (mock) 테스트 회의록"
+    usage = {
+        "prompt_tokens": prompt_chars // 2,
+        "completion_tokens": len(content) // 2,
+        "total_tokens": prompt_chars // 2 + len(content) // 2,
+    }
+    completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+    if body.get("stream"):
+        include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+        return StreamingResponse(
+            stream_completion(completion_id, body.get("model"), content, usage, include_usage),
+            media_type="text/event-stream",
+        )
+
+    await asyncio.sleep(config["latency"])
+    stats["completed"] += 1
+
+    return {
+        "id": completion_id,
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop",
+        }],
+        "usage": usage,
+    }
+
+
+@app.get("/stats")
+async def get_stats():
+    """주입된 오류/완료 건수"""
+    return stats
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="OpenAI mock 서버")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--rate-429", type=float, default=0.0, help="429 응답 비율 (0~1)")
+    parser.add_argument("--rate-5xx", type=float, default=0.0, help="5xx 응답 비율 (0~1)")
+    parser.add_argument("--latency", type=float, default=0.2, help="정상 응답 지연 (초)")
+    parser.add_argument("--retry-after", type=int, default=1, help="429 응답의 Retry-After (초)")
+    args = parser.parse_args()
+
+    config.update(rate_429=args.rate_429, rate_5xx=args.rate_5xx,
+                  latency=args.latency, retry_after=args.retry_after)
+    uvicorn.run(app, host="127.0.0.1", port=args.port)
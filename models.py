@@ -1,10 +1,13 @@
 """
 데이터베이스 모델 정의
 """
-from sqlalchemy import Column, Integer, String, Float, Text, DateTime, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import (
+    Boolean, Column, Date, Integer, String, Float, Text, DateTime, ForeignKey, Index, LargeBinary, UniqueConstraint
+)
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 from database import Base
+from text_compression import CompressedText
 
 
 class TranscriptRecord(Base):
@@ -17,9 +20,14 @@ class TranscriptRecord(Base):
     filename = Column(String(500), nullable=False, comment="원본 파일명")
     file_size = Column(Integer, nullable=False, comment="파일 크기 (bytes)")
     audio_duration = Column(Float, nullable=True, comment="오디오 길이 (초)")
+    audio_hash = Column(String(64), nullable=True, index=True, comment="원본 파일 SHA-256 (디코딩 캐시 키)")
 
-    # STT 결과
-    transcript = Column(Text, nullable=False, comment="STT 변환 결과")
+    # STT 결과 (zstd 압축 저장, 읽을 때 자동으로 str)
+    transcript = Column(CompressedText, nullable=False, comment="STT 변환 결과")
+    # 본문을 풀지 않고 검색 후보를 거르는 블룸 필터 (목록 조회 시 로드하지 않도록 deferred)
+    search_signature = deferred(Column(LargeBinary, nullable=True, comment="검색용 문자 n-gram 블룸 필터"))
+    # 세그먼트 타이밍/화자 (segment_store 컬럼형 블롭, 목록 조회 시 로드하지 않도록 deferred)
+    segment_data = deferred(Column(LargeBinary, nullable=True, comment="세그먼트 블롭 (시작/끝/화자/텍스트)"))
 
     # 모델 정보
     whisper_model = Column(String(50), nullable=False, default="base", comment="사용한 Whisper 모델")
@@ -27,8 +35,10 @@ class TranscriptRecord(Base):
     # 처리 시간
     stt_processing_time = Column(Float, nullable=True, comment="STT 처리 시간 (초)")
 
-    # 타임스탬프
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), comment="생성 시각")
+    # 타임스탬프 (목록이 created_at 역순이므로 인덱스)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True, comment="생성 시각")
+    # 보관 시각 (값이 있으면 본문/세그먼트/검색 시그니처는 record_archive에 있고 이 행은 포인터)
+    archived_at = Column(DateTime(timezone=True), nullable=True, index=True, comment="보관 시각")
 
     # 관계 (1:N - 하나의 transcript에 여러 summary)
     summaries = relationship("SummaryRecord", back_populates="transcript", cascade="all, delete-orphan")
@@ -46,8 +56,9 @@ class SummaryRecord(Base):
     # 외래키
     transcript_id = Column(Integer, ForeignKey("transcript_records.id", ondelete="CASCADE"), nullable=False, comment="STT 레코드 ID")
 
-    # GPT 요약 결과
-    summary = Column(Text, nullable=False, comment="GPT 회의록")
+    # GPT 요약 결과 (zstd 압축 저장, 읽을 때 자동으로 str)
+    summary = Column(CompressedText, nullable=False, comment="GPT 회의록")
+    search_signature = deferred(Column(LargeBinary, nullable=True, comment="검색용 문자 n-gram 블룸 필터"))
 
     # 모델 정보
     gpt_model = Column(String(50), nullable=False, comment="사용한 GPT 모델")
@@ -56,10 +67,151 @@ class SummaryRecord(Base):
     gpt_processing_time = Column(Float, nullable=True, comment="GPT 처리 시간 (초)")
 
     # 타임스탬프
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), comment="생성 시각")
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True, comment="생성 시각")
+    # 보관 시각 (값이 있으면 본문은 record_archive에 있음)
+    archived_at = Column(DateTime(timezone=True), nullable=True, comment="보관 시각")
+    # 주제/결정/액션 아이템을 구조화하여 저장한 시각 (항목이 없어도 설정, NULL이면 백필 대상)
+    structured_at = Column(DateTime(timezone=True), nullable=True, comment="구조화 저장 시각")
 
     # 관계 (N:1 - 여러 summary가 하나의 transcript에 속함)
     transcript = relationship("TranscriptRecord", back_populates="summaries")
+    # 관계 (1:N - 요약에서 추출한 구조, 요약 삭제 시 함께 삭제)
+    topics = relationship("MeetingTopic", cascade="all, delete-orphan")
+    decisions = relationship("MeetingDecision", cascade="all, delete-orphan")
+    action_items = relationship("ActionItem", cascade="all, delete-orphan")
 
     def __repr__(self):
         return f"<SummaryRecord(id={self.id}, transcript_id={self.transcript_id}, gpt_model='{self.gpt_model}', created_at={self.created_at})>"
+
+
+class SummaryChunkCache(Base):
+    """청크별 중간 요약 캐시 테이블 (증분 재요약용, 청크 내용 해시 기준)"""
+    __tablename__ = "summary_chunk_cache"
+    __table_args__ = (
+        UniqueConstraint("content_hash", "gpt_model", "prompt_version", name="uq_chunk_cache_key"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+
+    # 캐시 키
+    content_hash = Column(String(64), nullable=False, index=True, comment="청크 내용 SHA-256")
+    gpt_model = Column(String(50), nullable=False, comment="사용한 GPT 모델")
+    prompt_version = Column(String(20), nullable=False, comment="청크 요약 프롬프트 버전")
+
+    # 중간 요약
+    partial_summary = Column(Text, nullable=False, comment="청크 중간 요약")
+
+    # 타임스탬프
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), comment="생성 시각")
+
+    def __repr__(self):
+        return f"<SummaryChunkCache(id={self.id}, content_hash='{self.content_hash[:12]}', gpt_model='{self.gpt_model}')>"
+
+
+class CompressionDictionary(Base):
+    """텍스트 압축용 zstd 사전 테이블 (가장 최근 사전으로 압축, 압축된 값에 사전 ID 기록)"""
+    __tablename__ = "compression_dictionaries"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+
+    # 사전
+    dict_data = Column(LargeBinary, nullable=False, comment="zstd 사전")
+    sample_count = Column(Integer, nullable=False, comment="학습에 사용한 표본 수")
+
+    # 타임스탬프
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), comment="생성 시각")
+
+    def __repr__(self):
+        return f"<CompressionDictionary(id={self.id}, size={len(self.dict_data or b'')}, sample_count={self.sample_count})>"
+
+
+class RecordArchive(Base):
+    """보관(cold) 테이블 - 오래된 회의의 STT 본문/세그먼트/요약 본문을 회의 단위로 묶어 압축 (archive.py)"""
+    __tablename__ = "record_archive"
+
+    transcript_id = Column(Integer, ForeignKey("transcript_records.id", ondelete="CASCADE"), primary_key=True, comment="STT 레코드 ID")
+
+    # 압축된 묶음 (archive.pack_bundle)
+    payload = Column(LargeBinary, nullable=False, comment="압축된 본문 묶음")
+    original_bytes = Column(Integer, nullable=False, comment="압축 전 본문 크기 (bytes)")
+    summary_count = Column(Integer, nullable=False, default=0, comment="함께 보관된 요약 수")
+
+    # 타임스탬프
+    archived_at = Column(DateTime(timezone=True), server_default=func.now(), comment="보관 시각")
+
+    def __repr__(self):
+        return f"<RecordArchive(transcript_id={self.transcript_id}, size={len(self.payload or b'')}, summary_count={self.summary_count})>"
+
+
+# ============================================
+# 구조화된 회의록 (요약과 함께 GPT JSON 스키마 출력으로 저장)
+#
+# 같은 회의를 다시 요약하면 새 요약의 항목만 is_current=True이고 이전 항목은 False가 되므로,
+# 회의를 가로지르는 조회는 is_current 조건으로 회의당 최신 요약의 항목만 봅니다.
+# ============================================
+
+class MeetingTopic(Base):
+    """회의 주제 테이블"""
+    __tablename__ = "meeting_topics"
+    __table_args__ = (
+        Index("ix_meeting_topics_current_title", "is_current", "title"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    summary_id = Column(Integer, ForeignKey("summary_records.id", ondelete="CASCADE"), nullable=False, index=True, comment="요약 레코드 ID")
+    transcript_id = Column(Integer, ForeignKey("transcript_records.id", ondelete="CASCADE"), nullable=False, index=True, comment="STT 레코드 ID")
+    position = Column(Integer, nullable=False, comment="회의록 내 순서")
+    title = Column(String(500), nullable=False, comment="주제")
+    is_current = Column(Boolean, nullable=False, default=True, comment="회의의 최신 요약 항목 여부")
+
+    def __repr__(self):
+        return f"<MeetingTopic(id={self.id}, transcript_id={self.transcript_id}, title='{self.title[:30]}')>"
+
+
+class MeetingDecision(Base):
+    """회의 결정 사항 테이블"""
+    __tablename__ = "meeting_decisions"
+    __table_args__ = (
+        Index("ix_meeting_decisions_current_transcript", "is_current", "transcript_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    summary_id = Column(Integer, ForeignKey("summary_records.id", ondelete="CASCADE"), nullable=False, index=True, comment="요약 레코드 ID")
+    transcript_id = Column(Integer, ForeignKey("transcript_records.id", ondelete="CASCADE"), nullable=False, index=True, comment="STT 레코드 ID")
+    position = Column(Integer, nullable=False, comment="회의록 내 순서")
+    text = Column(Text, nullable=False, comment="결정 사항")
+    is_current = Column(Boolean, nullable=False, default=True, comment="회의의 최신 요약 항목 여부")
+
+    def __repr__(self):
+        return f"<MeetingDecision(id={self.id}, transcript_id={self.transcript_id})>"
+
+
+class ActionItem(Base):
+    """액션 아이템 테이블 (담당자/팀/기한/진행 상태)"""
+    __tablename__ = "action_items"
+    __table_args__ = (
+        # "팀 X의 미완료 액션 아이템 (기한순)", "담당자 Y의 미완료 액션 아이템" 조회용
+        Index("ix_action_items_current_status_team_due", "is_current", "status", "team", "due_date"),
+        Index("ix_action_items_current_status_owner_due", "is_current", "status", "owner", "due_date"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    summary_id = Column(Integer, ForeignKey("summary_records.id", ondelete="CASCADE"), nullable=False, index=True, comment="요약 레코드 ID")
+    transcript_id = Column(Integer, ForeignKey("transcript_records.id", ondelete="CASCADE"), nullable=False, index=True, comment="STT 레코드 ID")
+    position = Column(Integer, nullable=False, comment="회의록 내 순서")
+
+    task = Column(Text, nullable=False, comment="할 일")
+    owner = Column(String(100), nullable=True, comment="담당자")
+    team = Column(String(100), nullable=True, comment="담당 팀/부서")
+    due_date = Column(Date, nullable=True, comment="기한")
+
+    # 진행 상태 ("open" | "done")
+    status = Column(String(20), nullable=False, default="open", comment="진행 상태")
+    completed_at = Column(DateTime(timezone=True), nullable=True, comment="완료 처리 시각")
+    is_current = Column(Boolean, nullable=False, default=True, comment="회의의 최신 요약 항목 여부")
+
+    # 타임스탬프
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), comment="생성 시각")
+
+    def __repr__(self):
+        return f"<ActionItem(id={self.id}, transcript_id={self.transcript_id}, owner='{self.owner}', status='{self.status}')>"
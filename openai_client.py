@@ -0,0 +1,323 @@
+"""
+OpenAI 클라이언트 계층
+
+- HTTP 연결 풀/타임아웃을 명시한 OpenAI 클라이언트 생성
+- 지터가 들어간 지수 백오프 재시도 (429/5xx/연결 오류, Retry-After 헤더 준수)
+- 모델별 토큰 버킷으로 분당 요청 수(RPM)/토큰 수(TPM) 제한 및 동시 호출 수 제한
+- 취소 가능한 요청(cancellation 토큰이 있는 API 요청)은 스트리밍으로 호출하여, 취소 시 연결을 끊어
+  OpenAI 쪽 생성도 중단
+
+환경 변수:
+    OPENAI_BASE_URL           API 주소 (로컬 mock 서버 테스트 시 http://localhost:8100/v1)
+    OPENAI_MAX_RETRIES        최대 재시도 횟수 (기본 5)
+    OPENAI_RPM / OPENAI_TPM   모델 공통 기본 분당 요청/토큰 한도
+    OPENAI_MAX_CONCURRENCY    모델별 동시 호출 수 (기본 8)
+    OPENAI_RATE_LIMITS        모델별 한도 "gpt-5-mini:500:200000,gpt-5:100:30000" (모델:RPM:TPM)
+    GPT_PRICING               비용 추정용 1M 토큰당 USD "gpt-5-mini:0.25:2.0" (모델:입력:출력)
+"""
+import os
+import random
+import socket
+import threading
+import time
+from types import SimpleNamespace
+from typing import Dict, Optional
+
+import httpx
+import openai
+from openai import OpenAI
+
+import cancellation
+
+# 재시도 대상 HTTP 상태 코드
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+# 비용 추정용 기본 단가 (1M 토큰당 USD, (입력, 출력)) - 실제 단가는 GPT_PRICING으로 덮어쓰기
+DEFAULT_PRICING = {
+    "gpt-5.1": (1.25, 10.0),
+    "gpt-5": (1.25, 10.0),
+    "gpt-5-mini": (0.25, 2.0),
+    "gpt-5-nano": (0.05, 0.4),
+    "gpt-4.1": (2.0, 8.0),
+}
+
+
+def get_pricing() -> Dict[str, tuple]:
+    pricing = dict(DEFAULT_PRICING)
+    for item in os.getenv("GPT_PRICING", "").split(","):
+        if not item.strip():
+            continue
+        model, input_price, output_price = item.strip().rsplit(":", 2)
+        pricing[model] = (float(input_price), float(output_price))
+    return pricing
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> Optional[float]:
+    """토큰 사용량으로 비용(USD) 추정 (단가를 모르는 모델은 None)"""
+    price = get_pricing().get(model)
+    if not price:
+        return None
+    return (prompt_tokens * price[0] + completion_tokens * price[1]) / 1_000_000
+
+
+def build_openai_client(api_key: str) -> OpenAI:
+    """연결 풀과 타임아웃을 설정한 OpenAI 클라이언트 생성 (재시도는 ResilientChatClient가 담당)"""
+    http_client = httpx.Client(
+        limits=httpx.Limits(
+            max_connections=int(os.getenv("OPENAI_MAX_CONNECTIONS", "32")),
+            max_keepalive_connections=int(os.getenv("OPENAI_MAX_KEEPALIVE", "16")),
+            keepalive_expiry=30.0,
+        ),
+        # 긴 회의록 생성은 응답이 오래 걸리므로 read 타임아웃만 길게
+        timeout=httpx.Timeout(
+            connect=5.0,
+            read=float(os.getenv("OPENAI_READ_TIMEOUT", "180")),
+            write=30.0,
+            pool=10.0,
+        ),
+    )
+    return OpenAI(
+        api_key=api_key,
+        base_url=os.getenv("OPENAI_BASE_URL") or None,
+        http_client=http_client,
+        max_retries=0,
+    )
+
+
+class TokenBucket:
+    """스레드 안전 토큰 버킷 (capacity만큼 모이고 초당 refill_rate씩 채워짐)"""
+
+    def __init__(self, capacity: float, refill_rate: float):
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.refill_rate)
+        self.updated_at = now
+
+    def acquire(self, amount: float = 1.0):
+        """amount만큼 토큰이 모일 때까지 대기 후 차감 (capacity보다 큰 요청은 capacity로 제한)"""
+        amount = min(amount, self.capacity)
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                wait = (amount - self.tokens) / self.refill_rate
+            cancellation.sleep(wait)
+
+    def adjust(self, delta: float):
+        """예상치와 실제 사용량의 차이를 반영 (음수면 추가 차감, 양수면 환급)"""
+        with self.lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens + delta)
+
+
+class _ModelLimits:
+    def __init__(self, rpm: int, tpm: int, max_concurrency: int):
+        self.requests = TokenBucket(rpm, rpm / 60.0)
+        self.tokens = TokenBucket(tpm, tpm / 60.0)
+        self.slots = threading.BoundedSemaphore(max_concurrency)
+
+
+class ModelRateLimiter:
+    """모델별 RPM/TPM 토큰 버킷과 동시 호출 수 제한"""
+
+    def __init__(self, default_rpm: int = 500, default_tpm: int = 200000, max_concurrency: int = 8,
+                 overrides: Optional[Dict[str, tuple]] = None):
+        self.default_rpm = default_rpm
+        self.default_tpm = default_tpm
+        self.max_concurrency = max_concurrency
+        self.overrides = overrides or {}
+        self._limits: Dict[str, _ModelLimits] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """OPENAI_RPM / OPENAI_TPM / OPENAI_MAX_CONCURRENCY / OPENAI_RATE_LIMITS로 생성"""
+        overrides = {}
+        for item in os.getenv("OPENAI_RATE_LIMITS", "").split(","):
+            if not item.strip():
+                continue
+            model, rpm, tpm = item.strip().rsplit(":", 2)
+            overrides[model] = (int(rpm), int(tpm))
+        return cls(
+            default_rpm=int(os.getenv("OPENAI_RPM", "500")),
+            default_tpm=int(os.getenv("OPENAI_TPM", "200000")),
+            max_concurrency=int(os.getenv("OPENAI_MAX_CONCURRENCY", "8")),
+            overrides=overrides,
+        )
+
+    def limits_for(self, model: str) -> _ModelLimits:
+        with self._lock:
+            if model not in self._limits:
+                rpm, tpm = self.overrides.get(model, (self.default_rpm, self.default_tpm))
+                self._limits[model] = _ModelLimits(rpm, tpm, self.max_concurrency)
+            return self._limits[model]
+
+
+def estimate_tokens(messages, completion_allowance: int = 1500) -> int:
+    """요청 토큰 수 추정 (한국어는 대략 1.5자당 1토큰) + 응답 토큰 여유분"""
+    chars = sum(len(message.get("content") or "") for message in messages)
+    return int(chars / 1.5) + completion_allowance
+
+
+def _retry_after_seconds(error) -> Optional[float]:
+    """응답의 Retry-After(-ms) 헤더를 초 단위로 반환 (없으면 None)"""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    try:
+        if "retry-after-ms" in headers:
+            return float(headers["retry-after-ms"]) / 1000
+        if "retry-after" in headers:
+            return float(headers["retry-after"])
+    except ValueError:
+        return None
+    return None
+
+
+def _is_retryable(error) -> bool:
+    if isinstance(error, (openai.APIConnectionError, openai.APITimeoutError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in RETRYABLE_STATUS
+    return False
+
+
+def _abort_response(response):
+    """
+    다른 스레드에서 응답 연결을 끊음 (취소 콜백)
+
+    response.close()만으로는 데이터를 기다리며 막혀 있는 읽기가 다음 조각이 올 때까지 깨어나지 않으므로
+    (추론 모델은 수십 초 동안 아무것도 보내지 않을 수 있음) 소켓을 직접 shutdown합니다.
+    """
+    network_stream = response.extensions.get("network_stream")
+    sock = network_stream.get_extra_info("socket") if network_stream is not None else None
+    if sock is None:
+        response.close()
+        return
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+
+
+class ResilientChatClient:
+    """Chat Completions 호출에 한도 제어와 재시도를 적용하는 래퍼"""
+
+    def __init__(self, client: OpenAI, limiter: ModelRateLimiter, max_retries: int = 5,
+                 base_delay: float = 0.5, max_delay: float = 30.0):
+        self.client = client
+        self.limiter = limiter
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.usage: Dict[str, dict] = {}
+        self._usage_lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, client: OpenAI, limiter: Optional[ModelRateLimiter] = None):
+        """limiter를 주면 환경 변수 한도 대신 사용 (일괄 작업별 한도 등)"""
+        return cls(
+            client,
+            limiter or ModelRateLimiter.from_env(),
+            max_retries=int(os.getenv("OPENAI_MAX_RETRIES", "5")),
+        )
+
+    def _record_usage(self, model: str, response, retries: int):
+        usage = getattr(response, "usage", None)
+        with self._usage_lock:
+            counters = self.usage.setdefault(
+                model, {"requests": 0, "retries": 0, "prompt_tokens": 0, "completion_tokens": 0}
+            )
+            counters["requests"] += 1
+            counters["retries"] += retries
+            if usage is not None:
+                counters["prompt_tokens"] += usage.prompt_tokens or 0
+                counters["completion_tokens"] += usage.completion_tokens or 0
+
+    def usage_summary(self) -> dict:
+        """지금까지의 모델별 호출 수/토큰 사용량과 추정 비용"""
+        with self._usage_lock:
+            models = {model: dict(counters) for model, counters in self.usage.items()}
+        total_cost = 0.0
+        for model, counters in models.items():
+            counters["cost_usd"] = estimate_cost(model, counters["prompt_tokens"], counters["completion_tokens"])
+            total_cost += counters["cost_usd"] or 0.0
+        return {"models": models, "cost_usd": round(total_cost, 6)}
+
+    def _backoff(self, attempt: int, error) -> float:
+        """Retry-After가 있으면 따르고, 없으면 full jitter 지수 백오프"""
+        retry_after = _retry_after_seconds(error)
+        if retry_after is not None:
+            return min(retry_after, self.max_delay) + random.uniform(0, self.base_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def _create_cancellable(self, params: dict, token):
+        """
+        스트리밍으로 호출하고 응답을 모아 ChatCompletion과 같은 모양으로 반환
+
+        일반 호출은 응답 헤더가 생성이 끝난 뒤에 오므로 중간에 끊을 수 없지만, 스트리밍은 바로 응답이 열리므로
+        취소 시 다른 스레드에서 연결을 끊어 대기 중인 읽기를 깨우고 서버 쪽 생성도 중단시킵니다.
+        """
+        stream = self.client.chat.completions.create(**params, stream=True, stream_options={"include_usage": True})
+        remove_callback = token.add_callback(lambda: _abort_response(stream.response))
+        parts = []
+        usage = None
+        try:
+            for chunk in stream:
+                if chunk.usage is not None:
+                    usage = chunk.usage
+                if chunk.choices and chunk.choices[0].delta.content:
+                    parts.append(chunk.choices[0].delta.content)
+        except Exception:
+            if token.cancelled:
+                raise cancellation.JobCancelled(token.reason) from None
+            raise
+        finally:
+            remove_callback()
+            stream.close()
+        token.check()
+        message = SimpleNamespace(role="assistant", content="".join(parts))
+        return SimpleNamespace(choices=[SimpleNamespace(index=0, message=message)], usage=usage, model=params["model"])
+
+    def create(self, **params):
+        """client.chat.completions.create와 같은 인자. 한도 대기 → 호출 → 실패 시 재시도"""
+        model = params["model"]
+        limits = self.limiter.limits_for(model)
+        estimated = estimate_tokens(params.get("messages", []))
+        token = cancellation.current()
+
+        attempt = 0
+        while True:
+            limits.requests.acquire(1)
+            limits.tokens.acquire(estimated)
+            with limits.slots:
+                try:
+                    if token is not None:
+                        token.check()
+                        response = self._create_cancellable(params, token)
+                    else:
+                        response = self.client.chat.completions.create(**params)
+                except Exception as e:
+                    # 실패한 호출은 토큰을 소비하지 않았으므로 환급
+                    limits.tokens.adjust(estimated)
+                    if not _is_retryable(e) or attempt >= self.max_retries:
+                        raise
+                    delay = self._backoff(attempt, e)
+                    print(f"OpenAI 호출 실패 ({type(e).__name__}), {delay:.1f}초 후 재시도 ({attempt + 1}/{self.max_retries})")
+                    attempt += 1
+                else:
+                    usage = getattr(response, "usage", None)
+                    if usage is not None and usage.total_tokens:
+                        limits.tokens.adjust(estimated - usage.total_tokens)
+                    self._record_usage(model, response, attempt)
+                    return response
+            cancellation.sleep(delay)
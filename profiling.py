@@ -0,0 +1,372 @@
+"""
+요청 단위 프로파일링과 메모리 추적 (관리자 전용, 선택 기능)
+
+PROFILING_ADMIN_TOKEN이 설정된 경우에만 동작합니다.
+
+1) 요청 단위 프로파일
+   X-Profile: 1 헤더(또는 ?profile=1)와 X-Admin-Token 헤더를 함께 보내면 그 요청에 대해
+   - 단계(stage)별 CPU 프로파일 (cProfile, 스레드풀에서 실행되는 Whisper/GPT/디코딩 단계)
+   - tracemalloc 메모리 diff (요청 전후 스냅샷 비교, 상위 할당 위치)
+   - 단계별 소요 시간, RSS 변화
+   를 PROFILING_DIR에 저장합니다. 응답의 X-Profile-Id로 /admin/profiles/{id}에서 내려받습니다.
+   cProfile과 tracemalloc은 프로세스 전역이므로 한 번에 한 요청만 프로파일링합니다.
+
+2) 샘플링 프로파일러 (PROFILING_SAMPLER=true)
+   백그라운드 스레드가 일정 간격으로 stage()로 표시된 스레드의 스택만 샘플링하여
+   flamegraph.pl / speedscope에 바로 넣을 수 있는 collapsed stack 형식으로 누적합니다.
+   대상 스레드에 코드를 삽입하지 않으므로 상시 켜 두어도 오버헤드가 작습니다.
+"""
+import contextvars
+import cProfile
+import functools
+import hmac
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from typing import List, Optional
+
+# 현재 요청의 프로파일 (run_in_threadpool로 넘어간 작업에도 전달됨)
+_current_profile = contextvars.ContextVar("current_profile", default=None)
+
+# 스레드 ID -> 실행 중인 단계 이름 (샘플링 프로파일러가 읽음)
+_active_stages = {}
+
+# cProfile은 한 번에 하나만 활성화 (Python 3.12+는 프로세스 전역)
+_cprofile_lock = threading.Lock()
+
+
+def _rss_bytes() -> Optional[int]:
+    """현재 RSS (Linux /proc 기준, 그 외 플랫폼은 None)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class RequestProfile:
+    """한 요청의 단계별 CPU 프로파일과 메모리 diff"""
+
+    def __init__(self, method: str, path: str, tracemalloc_frames: int = 10):
+        self.id = uuid.uuid4().hex[:16]
+        self.method = method
+        self.path = path
+        self.started_at = time.time()
+        self.stages = []
+        self.stats = None
+        self._lock = threading.Lock()
+        self._started_tracing = False
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(tracemalloc_frames)
+            self._started_tracing = True
+        tracemalloc.reset_peak()
+        self._snapshot = tracemalloc.take_snapshot()
+        self._rss_before = _rss_bytes()
+
+    def add_stage(self, name: str, seconds: float, profiler: Optional[cProfile.Profile]):
+        with self._lock:
+            self.stages.append({
+                "stage": name,
+                "seconds": round(seconds, 4),
+                "cpu_profile": profiler is not None,
+            })
+            if profiler is None:
+                return
+            if self.stats is None:
+                self.stats = pstats.Stats(profiler)
+            else:
+                self.stats.add(profiler)
+
+    def finish(self, status_code: int, top: int = 30) -> dict:
+        """메모리 diff를 계산하고 (추적을 시작한 경우) tracemalloc을 멈춘 뒤 결과 반환"""
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        if self._started_tracing:
+            tracemalloc.stop()
+
+        filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        diff = snapshot.filter_traces(filters).compare_to(self._snapshot.filter_traces(filters), "lineno")
+        rss_after = _rss_bytes()
+
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "status_code": status_code,
+            "started_at": self.started_at,
+            "seconds": round(time.time() - self.started_at, 4),
+            "stages": self.stages,
+            "memory": {
+                "traced_peak_bytes": peak,
+                "rss_before_bytes": self._rss_before,
+                "rss_after_bytes": rss_after,
+                "rss_diff_bytes": rss_after - self._rss_before if rss_after and self._rss_before else None,
+                "top_allocations": [
+                    {
+                        "location": str(stat.traceback),
+                        "size_diff_bytes": stat.size_diff,
+                        "count_diff": stat.count_diff,
+                    }
+                    for stat in diff[:top]
+                ],
+            },
+        }
+
+
+class RequestProfiler:
+    def __init__(self, admin_token: Optional[str] = None, profile_dir: str = "output/profiles",
+                 keep: int = 50, tracemalloc_frames: int = 10):
+        """
+        Args:
+            admin_token: 프로파일 요청/조회에 필요한 관리자 토큰 (없으면 비활성화)
+            profile_dir: 프로파일 결과 저장 디렉토리
+            keep: 보관할 최대 프로파일 수 (오래된 것부터 삭제)
+            tracemalloc_frames: 할당 위치별로 저장할 스택 깊이
+        """
+        self.admin_token = admin_token
+        self.profile_dir = profile_dir
+        self.keep = keep
+        self.tracemalloc_frames = tracemalloc_frames
+        self._busy = threading.Lock()
+        if self.enabled:
+            os.makedirs(profile_dir, exist_ok=True)
+
+    @classmethod
+    def from_env(cls):
+        """환경 변수(PROFILING_ADMIN_TOKEN, PROFILING_DIR, PROFILING_KEEP, PROFILING_TRACEMALLOC_FRAMES)로 생성"""
+        return cls(
+            admin_token=os.getenv("PROFILING_ADMIN_TOKEN") or None,
+            profile_dir=os.getenv("PROFILING_DIR", os.path.join("output", "profiles")),
+            keep=int(os.getenv("PROFILING_KEEP", "50")),
+            tracemalloc_frames=int(os.getenv("PROFILING_TRACEMALLOC_FRAMES", "10")),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.admin_token)
+
+    def is_authorized(self, token: Optional[str]) -> bool:
+        return self.enabled and bool(token) and hmac.compare_digest(token, self.admin_token)
+
+    def begin(self, method: str, path: str) -> Optional[RequestProfile]:
+        """프로파일 시작 (이미 다른 요청을 프로파일링 중이면 None)"""
+        if not self._busy.acquire(blocking=False):
+            return None
+        try:
+            return RequestProfile(method, path, self.tracemalloc_frames)
+        except Exception:
+            self._busy.release()
+            raise
+
+    def end(self, profile: RequestProfile, status_code: int) -> dict:
+        """결과를 {id}.json, {id}.prof(pstats), {id}.txt(상위 함수)로 저장"""
+        try:
+            result = profile.finish(status_code)
+        finally:
+            self._busy.release()
+
+        base = os.path.join(self.profile_dir, profile.id)
+        if profile.stats is not None:
+            profile.stats.dump_stats(base + ".prof")
+            text = io.StringIO()
+            pstats.Stats(base + ".prof", stream=text).sort_stats("cumulative").print_stats(60)
+            with open(base + ".txt", "w", encoding="utf-8") as f:
+                f.write(text.getvalue())
+        with open(base + ".json", "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+        self._prune()
+        return result
+
+    def _prune(self):
+        metas = sorted(
+            (name for name in os.listdir(self.profile_dir) if name.endswith(".json")),
+            key=lambda name: os.path.getmtime(os.path.join(self.profile_dir, name)),
+        )
+        for name in metas[:max(0, len(metas) - self.keep)]:
+            base = os.path.join(self.profile_dir, name[:-len(".json")])
+            for suffix in (".json", ".prof", ".txt"):
+                if os.path.exists(base + suffix):
+                    os.remove(base + suffix)
+
+    def list(self) -> List[dict]:
+        """저장된 프로파일 요약 목록 (최신순)"""
+        profiles = []
+        for name in os.listdir(self.profile_dir):
+            if not name.endswith(".json"):
+                continue
+            with open(os.path.join(self.profile_dir, name), encoding="utf-8") as f:
+                meta = json.load(f)
+            profiles.append({key: meta[key] for key in ("id", "method", "path", "status_code", "started_at", "seconds")})
+        return sorted(profiles, key=lambda meta: meta["started_at"], reverse=True)
+
+    def get(self, profile_id: str) -> Optional[dict]:
+        path = self.file_path(profile_id, "json")
+        if not path:
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def file_path(self, profile_id: str, kind: str) -> Optional[str]:
+        """저장된 파일 경로 (kind: json, prof, txt / 없거나 잘못된 ID면 None)"""
+        if not profile_id.isalnum() or kind not in ("json", "prof", "txt"):
+            return None
+        path = os.path.join(self.profile_dir, f"{profile_id}.{kind}")
+        return path if os.path.exists(path) else None
+
+
+def activate(profile: Optional[RequestProfile]):
+    """현재 컨텍스트(요청)에 프로파일 연결, reset()용 토큰 반환"""
+    return _current_profile.set(profile)
+
+
+def reset(token):
+    _current_profile.reset(token)
+
+
+@contextmanager
+def stage(name: str):
+    """
+    실행 단계 표시 (블로킹 작업을 실행하는 스레드 안에서 사용)
+
+    - 샘플링 프로파일러가 이 스레드의 스택을 name 아래로 집계
+    - 현재 요청이 프로파일 대상이면 이 단계를 cProfile로 측정
+    """
+    thread_id = threading.get_ident()
+    previous = _active_stages.get(thread_id)
+    _active_stages[thread_id] = name
+
+    profile = _current_profile.get()
+    profiler = None
+    if profile is not None and _cprofile_lock.acquire(blocking=False):
+        profiler = cProfile.Profile()
+        profiler.enable()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        if profiler is not None:
+            profiler.disable()
+            _cprofile_lock.release()
+        if profile is not None:
+            # 병렬 단계(예: Whisper와 화자 분리)는 먼저 시작한 쪽만 cProfile로 측정
+            profile.add_stage(name, elapsed, profiler)
+        if previous is None:
+            _active_stages.pop(thread_id, None)
+        else:
+            _active_stages[thread_id] = previous
+
+
+def profiled(name: str, func):
+    """func를 stage(name) 안에서 실행하는 함수 반환 (run_in_threadpool에 넘길 때 사용)"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with stage(name):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+class SamplingProfiler:
+    """stage()로 표시된 스레드의 스택을 주기적으로 샘플링하여 collapsed stack으로 누적"""
+
+    def __init__(self, interval: float = 0.02, max_stacks: int = 20000, max_depth: int = 128):
+        """
+        Args:
+            interval: 샘플링 간격 (초, 기본값: 20ms = 50Hz)
+            max_stacks: 저장할 서로 다른 스택 수 상한 (넘으면 단계별 [truncated]로 집계)
+            max_depth: 스택당 최대 프레임 수
+        """
+        self.interval = interval
+        self.max_stacks = max_stacks
+        self.max_depth = max_depth
+        self._counts = Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.samples = 0
+        self.sampling_seconds = 0.0
+        self.started_at = None
+
+    @classmethod
+    def from_env(cls):
+        """환경 변수(PROFILING_SAMPLE_INTERVAL_MS)로 생성"""
+        return cls(interval=int(os.getenv("PROFILING_SAMPLE_INTERVAL_MS", "20")) / 1000)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self.started_at = time.time()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=1)
+        self._thread = None
+
+    def _frame_label(self, frame) -> str:
+        code = frame.f_code
+        return f"{os.path.basename(code.co_filename)}:{getattr(code, 'co_qualname', code.co_name)}"
+
+    def _sample(self):
+        frames = sys._current_frames()
+        stacks = []
+        for thread_id, stage_name in list(_active_stages.items()):
+            frame = frames.get(thread_id)
+            labels = []
+            while frame is not None and len(labels) < self.max_depth:
+                labels.append(self._frame_label(frame))
+                frame = frame.f_back
+            labels.append(stage_name)
+            stacks.append(";".join(reversed(labels)))
+
+        with self._lock:
+            for stack in stacks:
+                if stack not in self._counts and len(self._counts) >= self.max_stacks:
+                    stack = stack.split(";", 1)[0] + ";[truncated]"
+                self._counts[stack] += 1
+            self.samples += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            start = time.perf_counter()
+            self._sample()
+            self.sampling_seconds += time.perf_counter() - start
+
+    def collapsed(self, reset: bool = False) -> str:
+        """flamegraph.pl / speedscope용 collapsed stack 텍스트 ("단계;프레임;...;프레임 샘플수")"""
+        with self._lock:
+            lines = [f"{stack} {count}" for stack, count in self._counts.most_common()]
+            if reset:
+                self._counts.clear()
+                self.samples = 0
+                self.sampling_seconds = 0.0
+                self.started_at = time.time()
+        return "\n".join(lines) + ("\n" if lines else "")
+
+    def status(self) -> dict:
+        with self._lock:
+            elapsed = time.time() - self.started_at if self.started_at else 0
+            return {
+                "running": self.running,
+                "interval_ms": round(self.interval * 1000, 1),
+                "samples": self.samples,
+                "stacks": len(self._counts),
+                # 샘플링 스레드가 사용한 시간 비율 (오버헤드 추정)
+                "overhead_ratio": round(self.sampling_seconds / elapsed, 5) if elapsed else 0.0,
+            }
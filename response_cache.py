@@ -0,0 +1,221 @@
+"""
+조회 응답 캐시 (ETag / 조건부 GET / 압축)
+
+STT 레코드와 요약 레코드의 본문은 한 번 저장되면 바뀌지 않으므로(재변환/재요약은 새 레코드 생성)
+직렬화된 JSON 본문을 프로세스 안의 LRU에 보관하고 재사용합니다.
+보관/구조화 시각처럼 바뀔 수 있는 값은 호출하는 쪽에서 캐시 키(버전)에 포함합니다.
+
+- ETag: 본문 SHA-256 기반의 강한 ETag, If-None-Match가 일치하면 본문 없이 304
+- 압축: 일정 크기 이상이면 Accept-Encoding에 따라 brotli(설치된 경우) 또는 gzip으로
+        한 번만 압축하여 캐시 항목에 함께 보관
+- 무효화: 삭제 시 해당 키 제거, 그 외에는 LRU(항목 수/바이트) + TTL로 정리
+  (TTL은 멀티 워커 배포에서 다른 워커가 삭제한 레코드를 계속 응답하는 시간을 제한)
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# 이 크기(bytes)보다 작은 본문은 압축하지 않음 (헤더 오버헤드가 더 큼)
+MIN_COMPRESS_SIZE = 1024
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def encoded_etag(etag: str, encoding: Optional[str]) -> str:
+    """압축본은 표현(representation)이 다르므로 강한 ETag에 압축 방식을 붙임"""
+    return etag[:-1] + "-" + encoding + '"' if encoding else etag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match 헤더(여러 값, W/ 접두사, * 허용)가 본문 ETag(압축본 포함)와 일치하는지 확인"""
+    if not if_none_match:
+        return False
+    variants = {etag, encoded_etag(etag, "gzip"), encoded_etag(etag, "br")}
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate in variants:
+            return True
+    return False
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Accept-Encoding에서 사용할 압축 방식 선택 (br > gzip, q=0은 제외)"""
+    accepted = set()
+    for part in (accept_encoding or "").lower().split(","):
+        name, _, params = part.strip().partition(";")
+        params = params.replace(" ", "")
+        if params.startswith("q="):
+            try:
+                if float(params[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(name.strip())
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+def _compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=6)
+
+
+class CachedResponse:
+    """직렬화된 JSON 본문과 ETag, 압축본"""
+
+    def __init__(self, key: tuple, body: bytes):
+        self.key = key
+        self.body = body
+        self.etag = make_etag(body)
+        self.encoded = {}
+        self.created_at = time.monotonic()
+        # 캐시 크기 합계에 반영된 바이트 수
+        self.accounted = 0
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(len(data) for data in self.encoded.values())
+
+    def encode(self, encoding: Optional[str]):
+        """(본문, 실제 적용된 압축 방식) - 압축본은 처음 요청될 때 한 번만 생성"""
+        if encoding is None or len(self.body) < MIN_COMPRESS_SIZE:
+            return self.body, None
+        data = self.encoded.get(encoding)
+        if data is None:
+            data = self.encoded.setdefault(encoding, _compress(self.body, encoding))
+        return data, encoding
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 64 * 1024 ** 2, ttl: float = 300):
+        """
+        Args:
+            max_entries: 최대 항목 수 (0이면 캐시 사용 안 함, ETag/압축만 적용)
+            max_bytes: 본문 + 압축본 합계 최대 크기 (bytes, 기본값: 64MB)
+            ttl: 항목 유지 시간 (초)
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls):
+        """환경 변수(RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_MAX_MB, RESPONSE_CACHE_TTL)로 캐시 생성"""
+        return cls(
+            max_entries=int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024")),
+            max_bytes=int(os.getenv("RESPONSE_CACHE_MAX_MB", "64")) * 1024 ** 2,
+            ttl=float(os.getenv("RESPONSE_CACHE_TTL", "300")),
+        )
+
+    def get(self, key: tuple) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry.created_at > self.ttl:
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: tuple, payload) -> CachedResponse:
+        """payload를 FastAPI 기본 JSONResponse와 같은 형식으로 직렬화하여 저장"""
+        body = json.dumps(
+            jsonable_encoder(payload),
+            ensure_ascii=False,
+            allow_nan=False,
+            separators=(",", ":"),
+        ).encode("utf-8")
+        entry = CachedResponse(key, body)
+        if self.max_entries <= 0:
+            return entry
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = entry
+            self._account(entry)
+        return entry
+
+    def invalidate(self, *keys: tuple):
+        with self._lock:
+            for key in keys:
+                self._remove(key)
+
+    def invalidate_prefix(self, prefix: tuple):
+        """키 앞부분이 prefix와 같은 항목 모두 제거 (예: 버전이 붙은 목록 키)"""
+        with self._lock:
+            for key in [key for key in self._entries if key[:len(prefix)] == prefix]:
+                self._remove(key)
+
+    def _remove(self, key: tuple):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.accounted
+
+    def _account(self, entry: CachedResponse):
+        """항목 크기 변화(새 압축본 등)를 합계에 반영하고 한도를 넘으면 오래된 항목부터 제거"""
+        if self._entries.get(entry.key) is not entry:
+            return
+        size = entry.size
+        self._bytes += size - entry.accounted
+        entry.accounted = size
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, oldest = self._entries.popitem(last=False)
+            self._bytes -= oldest.accounted
+
+    def respond(self, entry: CachedResponse, request, cache_control: str) -> Response:
+        """조건부 요청이면 304, 아니면 Accept-Encoding에 맞춰 압축한 본문"""
+        headers = {"Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+        encoding = choose_encoding(request.headers.get("accept-encoding"))
+        if etag_matches(request.headers.get("if-none-match"), entry.etag):
+            if len(entry.body) < MIN_COMPRESS_SIZE:
+                encoding = None
+            headers["ETag"] = encoded_etag(entry.etag, encoding)
+            return Response(status_code=304, headers=headers)
+
+        body, applied = entry.encode(encoding)
+        headers["ETag"] = encoded_etag(entry.etag, applied)
+        if applied:
+            headers["Content-Encoding"] = applied
+            with self._lock:
+                self._account(entry)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def status(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "megabytes": round(self._bytes / 1024 ** 2, 2),
+                "hits": self.hits,
+                "misses": self.misses,
+                "brotli": brotli is not None,
+            }
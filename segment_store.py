@@ -0,0 +1,145 @@
+"""
+세그먼트 컬럼형 저장 포맷
+
+Whisper 세그먼트(시작/끝 시각, 화자, 텍스트)를 하나의 바이너리 블롭으로 압축 저장합니다.
+dict 목록을 JSON으로 저장하는 것보다 작고, 시간 구간 조회 시 필요한 텍스트만 디코딩합니다.
+
+레이아웃 (리틀 엔디언):
+    헤더      magic(4) "SEG1", 세그먼트 수 N (uint32), 화자 라벨 바이트 길이 (uint32)
+    starts    uint32[N]   시작 시각 (ms)
+    ends      uint32[N]   끝 시각 (ms)
+    offsets   uint32[N+1] 텍스트 버퍼 내 바이트 오프셋
+    speakers  uint16[N]   화자 라벨 인덱스 (NO_SPEAKER = 화자 없음)
+    labels    UTF-8       "\n"으로 구분된 화자 라벨 목록
+    text      UTF-8       모든 세그먼트 텍스트를 이어붙인 버퍼
+"""
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import List, Optional
+
+MAGIC = b"SEG1"
+NO_SPEAKER = 0xFFFF
+_HEADER = struct.Struct("<4sII")
+
+
+def _to_le(arr: array) -> bytes:
+    if sys.byteorder != "little":
+        arr = array(arr.typecode, arr)
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def _from_le(typecode: str, data) -> array:
+    arr = array(typecode)
+    arr.frombytes(data)
+    if sys.byteorder != "little":
+        arr.byteswap()
+    return arr
+
+
+def pack_segments(segments: List[dict]) -> bytes:
+    """
+    세그먼트 목록을 컬럼형 블롭으로 변환합니다.
+
+    Args:
+        segments: [{"start": 초, "end": 초, "text": 문장, "speaker": 라벨(선택)}, ...] (시간순)
+
+    Returns:
+        bytes: 직렬화된 블롭
+    """
+    starts = array("I")
+    ends = array("I")
+    offsets = array("I", [0])
+    speakers = array("H")
+    labels = {}
+    text_buffer = bytearray()
+
+    for segment in segments:
+        starts.append(int(round(segment["start"] * 1000)))
+        ends.append(int(round(segment["end"] * 1000)))
+        text_buffer += segment["text"].encode("utf-8")
+        offsets.append(len(text_buffer))
+
+        speaker = segment.get("speaker")
+        if speaker is None:
+            speakers.append(NO_SPEAKER)
+        else:
+            speakers.append(labels.setdefault(speaker, len(labels)))
+
+    label_bytes = "\n".join(labels).encode("utf-8")
+    return b"".join([
+        _HEADER.pack(MAGIC, len(starts), len(label_bytes)),
+        _to_le(starts),
+        _to_le(ends),
+        _to_le(offsets),
+        _to_le(speakers),
+        label_bytes,
+        bytes(text_buffer),
+    ])
+
+
+class SegmentIndex:
+    """블롭 위에서 동작하는 읽기 전용 세그먼트 뷰 (텍스트는 필요한 구간만 디코딩)"""
+
+    def __init__(self, blob: bytes):
+        view = memoryview(blob)
+        magic, count, label_length = _HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise ValueError("세그먼트 블롭 형식이 올바르지 않습니다")
+
+        pos = _HEADER.size
+        self.starts = _from_le("I", view[pos:pos + 4 * count])
+        pos += 4 * count
+        self.ends = _from_le("I", view[pos:pos + 4 * count])
+        pos += 4 * count
+        self.offsets = _from_le("I", view[pos:pos + 4 * (count + 1)])
+        pos += 4 * (count + 1)
+        self.speakers = _from_le("H", view[pos:pos + 2 * count])
+        pos += 2 * count
+        label_bytes = bytes(view[pos:pos + label_length])
+        self.labels = label_bytes.decode("utf-8").split("\n") if label_length else []
+        self._text = view[pos + label_length:]
+
+    def __len__(self):
+        return len(self.starts)
+
+    def segment(self, i: int) -> dict:
+        """i번째 세그먼트를 dict로 반환"""
+        speaker_id = self.speakers[i]
+        return {
+            "start": self.starts[i] / 1000,
+            "end": self.ends[i] / 1000,
+            "text": bytes(self._text[self.offsets[i]:self.offsets[i + 1]]).decode("utf-8"),
+            "speaker": None if speaker_id == NO_SPEAKER else self.labels[speaker_id],
+        }
+
+    def segments(self) -> List[dict]:
+        """전체 세그먼트 목록"""
+        return [self.segment(i) for i in range(len(self))]
+
+    def range(self, start: Optional[float] = None, end: Optional[float] = None) -> List[dict]:
+        """
+        [start, end) 구간과 겹치는 세그먼트를 이진 탐색으로 찾습니다.
+
+        Args:
+            start: 구간 시작 (초, None이면 처음부터)
+            end: 구간 끝 (초, None이면 끝까지)
+        """
+        first = 0 if start is None else bisect_right(self.ends, int(start * 1000))
+        last = len(self) if end is None else bisect_left(self.starts, int(end * 1000))
+        return [self.segment(i) for i in range(first, last)]
+
+
+def unpack_segments(blob: bytes) -> List[dict]:
+    """블롭을 세그먼트 목록으로 복원"""
+    return SegmentIndex(blob).segments()
+
+
+def parse_timestamp(value: str) -> float:
+    """'12:00', '1:02:03' 또는 초 단위 숫자 문자열을 초로 변환"""
+    seconds = 0.0
+    for part in value.strip().split(":"):
+        seconds = seconds * 60 + float(part)
+    return seconds
@@ -0,0 +1,739 @@
+"""
+회의 의미 검색 (로컬 임베딩 + 메모리 맵 int8 벡터 인덱스)
+
+키워드가 달라도 "3분기 예산 얘기한 회의"처럼 의미로 회의를 찾습니다.
+
+- 청크: STT 결과/회의록을 문장 경계 기준 약 400자 청크로 나눔
+- 임베딩: CPU에서 돌아가는 작은 다국어 모델 (기본값: intfloat/multilingual-e5-small, 384차원)
+- 인덱스: 청크 벡터를 벡터별 스케일의 int8로 양자화하여 np.memmap 파일에 저장 (청크당 384바이트 + 12바이트)
+  레코드(회의록 하나)마다 청크 평균 벡터(centroid)도 함께 저장
+- 검색: 청크 수가 SEMANTIC_EXACT_LIMIT 이하이면 전체 청크를 블록 단위 NumPy 행렬 곱으로 정확히 계산하고,
+  그보다 크면 centroid로 후보 레코드를 먼저 고른 뒤(IVF와 같은 2단계) 후보의 청크만 계산
+- 갱신: 레코드 생성 시 청크를 파일 끝에 추가, 삭제 시 삭제 표시만 하고 일정 비율이 넘으면 압축(compact)
+  쓰기는 파일 잠금으로 직렬화하고, 다른 워커가 쓴 내용은 헤더 변경을 보고 다시 매핑
+
+실행:
+    python semantic_search.py sync                  # DB와 인덱스 동기화 (없는 레코드 추가, 삭제된 레코드 제거)
+    python semantic_search.py rebuild               # 인덱스를 지우고 처음부터 다시 생성
+    python semantic_search.py query "3분기 예산" -k 5
+    python semantic_search.py status
+"""
+import argparse
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+RECORD_TYPES = {"transcript": 0, "summary": 1}
+RECORD_TYPE_NAMES = {value: key for key, value in RECORD_TYPES.items()}
+
+CHUNK_DTYPE = np.dtype([("record", "<i4"), ("chunk_no", "<i4"), ("scale", "<f4")])
+RECORD_DTYPE = np.dtype([
+    ("record_id", "<i4"),
+    ("transcript_id", "<i4"),
+    ("start", "<i8"),
+    ("length", "<i4"),
+    ("scale", "<f4"),
+    ("record_type", "u1"),
+    ("alive", "u1"),
+])
+
+# int8 → float32 변환을 한 번에 처리할 행 수 (블록당 약 25MB)
+SCORE_BLOCK_ROWS = 16384
+
+_SENTENCE_END_RE = re.compile(r"(?<=[.?!])\s+|\n+")
+
+
+def chunk_text(text: str, max_chars: int = 400, overlap_sentences: int = 1) -> List[str]:
+    """
+    문장 경계 기준으로 max_chars 이하 청크로 나눔 (앞 청크의 마지막 문장을 다음 청크 앞에 겹쳐 문맥 유지)
+
+    같은 텍스트는 항상 같은 청크로 나뉘므로 검색 결과의 청크 번호로 원문 구간을 다시 찾을 수 있습니다.
+    """
+    sentences = []
+    for sentence in _SENTENCE_END_RE.split(text or ""):
+        sentence = sentence.strip()
+        while len(sentence) > max_chars:
+            sentences.append(sentence[:max_chars])
+            sentence = sentence[max_chars:]
+        if sentence:
+            sentences.append(sentence)
+
+    chunks = []
+    current = []
+    length = 0
+    for sentence in sentences:
+        if current and length + len(sentence) + 1 > max_chars:
+            chunks.append(" ".join(current))
+            current = current[-overlap_sentences:] if overlap_sentences else []
+            length = sum(len(s) + 1 for s in current)
+            if length + len(sentence) + 1 > max_chars:
+                current, length = [], 0
+        current.append(sentence)
+        length += len(sentence) + 1
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def quantize(vectors: np.ndarray):
+    """벡터별 대칭 int8 양자화 → (int8 벡터, float32 스케일), 원래 값 ≈ int8 × 스케일"""
+    vectors = np.atleast_2d(vectors).astype(np.float32)
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    quantized = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return quantized, scales.astype(np.float32)
+
+
+def _scores(vectors: np.ndarray, scales: np.ndarray, query: np.ndarray) -> np.ndarray:
+    """int8 벡터와 float32 질의의 내적 (블록 단위로 float32 변환 후 BLAS 행렬 곱)"""
+    out = np.empty(len(vectors), dtype=np.float32)
+    for start in range(0, len(vectors), SCORE_BLOCK_ROWS):
+        block = vectors[start:start + SCORE_BLOCK_ROWS]
+        out[start:start + len(block)] = block.astype(np.float32) @ query
+    return out * scales
+
+
+def _top(scores: np.ndarray, k: int) -> np.ndarray:
+    """점수 상위 k개 인덱스 (내림차순, 전체 정렬 없이 argpartition)"""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top])]
+
+
+class Embedder:
+    def __init__(self, model_name: str = "intfloat/multilingual-e5-small", device: str = "cpu", batch_size: int = 32):
+        """
+        Args:
+            model_name: sentence-transformers 모델 이름
+            device: 실행 장치 (기본값: cpu)
+            batch_size: 한 번에 임베딩할 청크 수
+        """
+        self.model_name = model_name
+        self.device = device
+        self.batch_size = batch_size
+        self._model = None
+        self._lock = threading.Lock()
+        # e5 계열은 질의/문서 앞에 접두어를 붙여야 성능이 나옴
+        self._e5 = "e5" in model_name.lower()
+
+    def _load(self):
+        with self._lock:
+            if self._model is None:
+                try:
+                    from sentence_transformers import SentenceTransformer
+                except ImportError:
+                    raise ImportError(
+                        "의미 검색에는 sentence-transformers 패키지가 필요합니다: pip install sentence-transformers"
+                    )
+                print(f"임베딩 모델 로딩 중: {self.model_name}")
+                self._model = SentenceTransformer(self.model_name, device=self.device)
+        return self._model
+
+    @property
+    def dim(self) -> int:
+        return self._load().get_sentence_embedding_dimension()
+
+    def embed(self, texts: List[str], query: bool = False) -> np.ndarray:
+        """정규화된 float32 임베딩 (len(texts), dim)"""
+        model = self._load()
+        if self._e5:
+            prefix = "query: " if query else "passage: "
+            texts = [prefix + text for text in texts]
+        vectors = model.encode(
+            texts,
+            batch_size=self.batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        )
+        return np.asarray(vectors, dtype=np.float32)
+
+
+class SemanticIndex:
+    """청크/레코드 벡터를 담는 메모리 맵 int8 인덱스 (프로세스 간 공유 가능)"""
+
+    def __init__(self, index_dir: str, exact_limit: int = 200_000, candidates: int = 512):
+        """
+        Args:
+            index_dir: 인덱스 파일 디렉토리
+            exact_limit: 청크 수가 이 이하이면 전체 청크를 정확히 계산
+            candidates: 2단계 검색에서 centroid로 고를 후보 레코드 수
+        """
+        self.index_dir = index_dir
+        self.exact_limit = exact_limit
+        self.candidates = candidates
+        self.header = None
+        self._header_stat = None
+        self._maps = {}
+        self._by_key = {}
+        self._indexed_records = 0
+        self._lock = threading.RLock()
+        os.makedirs(index_dir, exist_ok=True)
+        self._header_path = os.path.join(index_dir, "header.json")
+        self._lock_path = os.path.join(index_dir, "write.lock")
+
+    # ---------- 파일 ----------
+
+    def _file(self, name: str, generation: int) -> str:
+        return os.path.join(self.index_dir, f"{name}.{generation}.bin")
+
+    def _write_header(self):
+        tmp_path = self._header_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.header, f)
+        os.replace(tmp_path, self._header_path)
+        self._header_stat = self._stat_header()
+
+    def _stat_header(self):
+        try:
+            stat = os.stat(self._header_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def _map(self, name: str, dtype, capacity: int, dim: Optional[int] = None):
+        shape = (capacity, dim) if dim else (capacity,)
+        path = self._file(name, self.header["generation"])
+        size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        if not os.path.exists(path) or os.path.getsize(path) < size:
+            with open(path, "ab") as f:
+                f.truncate(size)
+        return np.memmap(path, dtype=dtype, mode="r+", shape=shape)
+
+    def _open_maps(self):
+        header = self.header
+        self._maps = {
+            "chunk_vectors": self._map("chunk_vectors", np.int8, header["chunk_capacity"], header["dim"]),
+            "chunks": self._map("chunks", CHUNK_DTYPE, header["chunk_capacity"]),
+            "record_vectors": self._map("record_vectors", np.int8, header["record_capacity"], header["dim"]),
+            "records": self._map("records", RECORD_DTYPE, header["record_capacity"]),
+        }
+        self._by_key = {}
+        self._indexed_records = 0
+
+    def _refresh(self):
+        """다른 프로세스(워커)가 헤더를 바꿨으면 다시 읽고 필요하면 다시 매핑"""
+        stat = self._stat_header()
+        if stat is None or stat == self._header_stat:
+            return
+        with open(self._header_path, encoding="utf-8") as f:
+            header = json.load(f)
+        reopen = (
+            self.header is None
+            or header["generation"] != self.header["generation"]
+            or header["chunk_capacity"] != self.header["chunk_capacity"]
+            or header["record_capacity"] != self.header["record_capacity"]
+        )
+        self.header = header
+        self._header_stat = stat
+        if reopen:
+            self._open_maps()
+        self._update_lookup()
+
+    def _update_lookup(self):
+        """새로 추가된 레코드 행을 (종류, ID) → 행 번호 사전에 반영"""
+        records = self._maps["records"]
+        for row in range(self._indexed_records, self.header["records"]):
+            meta = records[row]
+            if meta["alive"]:
+                self._by_key[(int(meta["record_type"]), int(meta["record_id"]))] = row
+        self._indexed_records = self.header["records"]
+
+    def _file_lock(self):
+        """프로세스 간 쓰기 잠금 (fcntl이 없는 플랫폼에서는 프로세스 내 잠금만)"""
+        lock_file = open(self._lock_path, "a")
+        if fcntl:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        return lock_file
+
+    def _release(self, lock_file):
+        if fcntl:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+        lock_file.close()
+
+    def load(self, dim: Optional[int] = None, model: Optional[str] = None):
+        """
+        인덱스 열기 (없으면 dim으로 새로 생성)
+
+        저장된 모델과 다른 모델로 열면 벡터 공간이 달라 검색이 무의미하므로 오류를 냅니다.
+        """
+        with self._lock:
+            self._refresh()
+            if self.header is None:
+                if dim is None:
+                    raise ValueError("인덱스가 없습니다. 먼저 sync로 생성하세요")
+                lock_file = self._file_lock()
+                try:
+                    self._refresh()
+                    if self.header is None:
+                        self.header = {
+                            "version": 1, "model": model, "dim": dim, "generation": 1,
+                            "chunks": 0, "records": 0, "deleted": 0,
+                            "chunk_capacity": 4096, "record_capacity": 256,
+                        }
+                        self._open_maps()
+                        self._write_header()
+                finally:
+                    self._release(lock_file)
+            if model and self.header.get("model") != model:
+                raise ValueError(
+                    f"인덱스 모델({self.header.get('model')})과 설정된 모델({model})이 다릅니다. rebuild가 필요합니다"
+                )
+            if dim and self.header["dim"] != dim:
+                raise ValueError(f"인덱스 차원({self.header['dim']})과 모델 차원({dim})이 다릅니다. rebuild가 필요합니다")
+
+    # ---------- 쓰기 ----------
+
+    def _ensure_capacity(self, chunks: int, records: int):
+        header = self.header
+        grow = False
+        while header["chunks"] + chunks > header["chunk_capacity"]:
+            header["chunk_capacity"] *= 2
+            grow = True
+        while header["records"] + records > header["record_capacity"]:
+            header["record_capacity"] *= 2
+            grow = True
+        if grow:
+            self._open_maps()
+            self._update_lookup()
+
+    def add(self, record_type: str, record_id: int, transcript_id: int, vectors: np.ndarray):
+        """레코드의 청크 벡터 추가 (이미 있으면 기존 항목을 삭제 표시하고 새로 추가)"""
+        self.add_batch([(record_type, record_id, transcript_id, vectors)])
+
+    def add_batch(self, items: List[tuple]):
+        """
+        여러 레코드를 한 번의 잠금/헤더 갱신으로 추가 (동기화/재생성용)
+
+        Args:
+            items: [(record_type, record_id, transcript_id, 청크 벡터 (n, dim)), ...]
+        """
+        # 같은 레코드가 여러 번 있으면 마지막 것만 사용
+        items = list({(item[0], item[1]): item for item in items if len(item[3])}.values())
+        if not items:
+            return
+        with self._lock:
+            lock_file = self._file_lock()
+            try:
+                self._refresh()
+                for record_type, record_id, _, _ in items:
+                    self._mark_deleted(RECORD_TYPES[record_type], record_id)
+                self._ensure_capacity(sum(len(item[3]) for item in items), len(items))
+                header = self.header
+                chunks = self._maps["chunks"]
+                for record_type, record_id, transcript_id, vectors in items:
+                    chunk_vectors, chunk_scales = quantize(vectors)
+                    centroid = vectors.mean(axis=0)
+                    centroid /= np.linalg.norm(centroid) or 1.0
+                    centroid_vector, centroid_scale = quantize(centroid)
+
+                    start, row = header["chunks"], header["records"]
+                    end = start + len(vectors)
+                    self._maps["chunk_vectors"][start:end] = chunk_vectors
+                    chunks["record"][start:end] = row
+                    chunks["chunk_no"][start:end] = np.arange(len(vectors))
+                    chunks["scale"][start:end] = chunk_scales
+                    self._maps["record_vectors"][row] = centroid_vector[0]
+                    self._maps["records"][row] = (
+                        record_id, transcript_id, start, len(vectors), centroid_scale[0], RECORD_TYPES[record_type], 1
+                    )
+                    header["chunks"] = end
+                    header["records"] = row + 1
+
+                # 데이터를 먼저 쓰고 헤더를 바꿔야 다른 프로세스가 절반만 쓰인 행을 읽지 않음
+                # (공유 매핑이라 다른 프로세스에 바로 보이며, 디스크 기록(msync)은 파일 크기에 비례하므로 flush/압축 시에만)
+                self._write_header()
+                self._update_lookup()
+            finally:
+                self._release(lock_file)
+
+    def _mark_deleted(self, type_code: int, record_id: int) -> bool:
+        row = self._by_key.pop((type_code, record_id), None)
+        records = self._maps.get("records")
+        if row is None or records is None or not records[row]["alive"]:
+            return False
+        records["alive"][row] = 0
+        self.header["deleted"] += 1
+        return True
+
+    def remove(self, record_type: str, record_id: int) -> bool:
+        """레코드 삭제 표시 (삭제된 레코드가 30%를 넘으면 압축)"""
+        with self._lock:
+            if self.header is None:
+                return False
+            lock_file = self._file_lock()
+            try:
+                self._refresh()
+                removed = self._mark_deleted(RECORD_TYPES[record_type], record_id)
+                if removed:
+                    if self.header["deleted"] > max(100, self.header["records"] * 0.3):
+                        self._compact()
+                    else:
+                        self._write_header()
+                return removed
+            finally:
+                self._release(lock_file)
+
+    def flush(self):
+        """메모리 맵 내용을 디스크에 기록 (서버 종료/동기화 완료 시)"""
+        with self._lock:
+            for array in self._maps.values():
+                array.flush()
+
+    def compact(self):
+        """삭제 표시된 레코드를 제거한 새 파일로 교체"""
+        with self._lock:
+            lock_file = self._file_lock()
+            try:
+                self._refresh()
+                self._compact()
+            finally:
+                self._release(lock_file)
+
+    def _compact(self):
+        header = self.header
+        old_maps = self._maps
+        old_generation = header["generation"]
+        records = old_maps["records"][:header["records"]]
+        alive_rows = np.flatnonzero(records["alive"])
+        lengths = records["length"][alive_rows].astype(np.int64)
+        chunk_total = int(lengths.sum())
+
+        new_header = dict(header)
+        new_header.update(
+            generation=old_generation + 1, chunks=chunk_total, records=len(alive_rows), deleted=0,
+            chunk_capacity=max(4096, 1 << int(np.ceil(np.log2(max(chunk_total, 1) * 1.25)))),
+            record_capacity=max(256, 1 << int(np.ceil(np.log2(max(len(alive_rows), 1) * 1.25)))),
+        )
+        self.header = new_header
+        self._open_maps()
+        new_maps = self._maps
+
+        position = 0
+        for new_row, old_row in enumerate(alive_rows):
+            meta = records[old_row].copy()
+            start, length = int(meta["start"]), int(meta["length"])
+            new_maps["chunk_vectors"][position:position + length] = old_maps["chunk_vectors"][start:start + length]
+            new_maps["chunks"][position:position + length] = old_maps["chunks"][start:start + length]
+            new_maps["chunks"]["record"][position:position + length] = new_row
+            meta["start"] = position
+            new_maps["records"][new_row] = meta
+            new_maps["record_vectors"][new_row] = old_maps["record_vectors"][old_row]
+            position += length
+        for name in new_maps:
+            new_maps[name].flush()
+
+        self._write_header()
+        self._update_lookup()
+        del old_maps
+        for name in ("chunk_vectors", "chunks", "record_vectors", "records"):
+            try:
+                os.remove(self._file(name, old_generation))
+            except OSError:
+                pass
+        print(f"의미 검색 인덱스 압축: 레코드 {len(alive_rows):,}개, 청크 {chunk_total:,}개")
+
+    # ---------- 검색 ----------
+
+    def search(self, query: np.ndarray, k: int = 50, record_type: Optional[str] = None) -> List[dict]:
+        """
+        질의 벡터와 가장 가까운 청크 k개
+
+        Returns:
+            list: [{"record_type", "record_id", "transcript_id", "chunk_no", "score"}, ...] (점수 내림차순)
+        """
+        query = np.asarray(query, dtype=np.float32).reshape(-1)
+        with self._lock:
+            self._refresh()
+            if self.header is None or self.header["records"] == 0:
+                return []
+            n, r = self.header["chunks"], self.header["records"]
+            chunk_vectors = self._maps["chunk_vectors"]
+            chunks = self._maps["chunks"]
+            records = self._maps["records"][:r]
+
+            usable = records["alive"] == 1
+            if record_type:
+                usable &= records["record_type"] == RECORD_TYPES[record_type]
+
+            if n <= self.exact_limit:
+                rows = np.arange(n)
+                scores = _scores(chunk_vectors[:n], chunks["scale"][:n], query)
+                scores[~usable[chunks["record"][:n]]] = -np.inf
+            else:
+                # 1단계: 레코드 centroid로 후보 선택, 2단계: 후보 레코드의 청크만 계산
+                record_scores = _scores(self._maps["record_vectors"][:r], records["scale"], query)
+                record_scores[~usable] = -np.inf
+                candidates = _top(record_scores, self.candidates)
+                candidates = candidates[np.isfinite(record_scores[candidates])]
+                if len(candidates) == 0:
+                    return []
+                rows = np.concatenate([
+                    np.arange(records[row]["start"], records[row]["start"] + records[row]["length"])
+                    for row in candidates
+                ])
+                scores = _scores(chunk_vectors[rows], chunks["scale"][rows], query)
+
+            hits = []
+            for index in _top(scores, k):
+                if not np.isfinite(scores[index]):
+                    break
+                chunk = chunks[rows[index]]
+                meta = records[chunk["record"]]
+                hits.append({
+                    "record_type": RECORD_TYPE_NAMES[int(meta["record_type"])],
+                    "record_id": int(meta["record_id"]),
+                    "transcript_id": int(meta["transcript_id"]),
+                    "chunk_no": int(chunk["chunk_no"]),
+                    "score": round(float(scores[index]), 4),
+                })
+            return hits
+
+    def keys(self) -> set:
+        """인덱스에 있는 (종류, ID) 목록"""
+        with self._lock:
+            self._refresh()
+            records = self._maps["records"]
+            return {
+                (RECORD_TYPE_NAMES[type_code], record_id)
+                for (type_code, record_id), row in self._by_key.items() if records[row]["alive"]
+            }
+
+    def status(self) -> dict:
+        with self._lock:
+            self._refresh()
+            if self.header is None:
+                return {"records": 0, "chunks": 0}
+            header = self.header
+            dim = header["dim"]
+            return {
+                "model": header.get("model"),
+                "dim": dim,
+                "records": header["records"] - header["deleted"],
+                "deleted": header["deleted"],
+                "chunks": header["chunks"],
+                "megabytes": round(
+                    (header["chunk_capacity"] * (dim + CHUNK_DTYPE.itemsize)
+                     + header["record_capacity"] * (dim + RECORD_DTYPE.itemsize)) / 1024 ** 2, 1
+                ),
+                "mode": "exact" if header["chunks"] <= self.exact_limit else "two-stage",
+            }
+
+
+class SemanticSearch:
+    """임베딩 모델 + 인덱스 (레코드 추가는 백그라운드 스레드 하나에서 순서대로 처리)"""
+
+    def __init__(self, index: SemanticIndex, embedder: Embedder, max_chunk_chars: int = 400):
+        self.index = index
+        self.embedder = embedder
+        self.max_chunk_chars = max_chunk_chars
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="semantic-index")
+
+    @classmethod
+    def from_env(cls):
+        """환경 변수(SEMANTIC_INDEX_DIR, SEMANTIC_MODEL, SEMANTIC_EXACT_LIMIT, SEMANTIC_CANDIDATES, SEMANTIC_CHUNK_CHARS)로 생성"""
+        index = SemanticIndex(
+            index_dir=os.getenv("SEMANTIC_INDEX_DIR", "semantic_index"),
+            exact_limit=int(os.getenv("SEMANTIC_EXACT_LIMIT", "200000")),
+            candidates=int(os.getenv("SEMANTIC_CANDIDATES", "512")),
+        )
+        embedder = Embedder(model_name=os.getenv("SEMANTIC_MODEL", "intfloat/multilingual-e5-small"))
+        return cls(index, embedder, max_chunk_chars=int(os.getenv("SEMANTIC_CHUNK_CHARS", "400")))
+
+    def load(self):
+        """임베딩 모델과 인덱스 로드 (인덱스가 없으면 생성)"""
+        self.index.load(dim=self.embedder.dim, model=self.embedder.model_name)
+
+    def chunks(self, text: str) -> List[str]:
+        return chunk_text(text, max_chars=self.max_chunk_chars)
+
+    def embed_records(self, records: List[tuple]) -> List[tuple]:
+        """
+        [(record_type, record_id, transcript_id, text), ...] → add_batch에 넘길 항목
+        (여러 레코드의 청크를 한 번에 임베딩하여 배치 효율을 높임)
+        """
+        chunked = [(record, self.chunks(record[3])) for record in records]
+        texts = [chunk for _, chunks in chunked for chunk in chunks]
+        vectors = self.embedder.embed(texts) if texts else None
+        items = []
+        position = 0
+        for (record_type, record_id, transcript_id, _), chunks in chunked:
+            if chunks:
+                items.append((record_type, record_id, transcript_id, vectors[position:position + len(chunks)]))
+                position += len(chunks)
+        return items
+
+    def index_record(self, record_type: str, record_id: int, transcript_id: int, text: str) -> int:
+        """레코드를 청크로 나눠 임베딩하고 인덱스에 추가 (추가한 청크 수 반환)"""
+        items = self.embed_records([(record_type, record_id, transcript_id, text)])
+        self.index.add_batch(items)
+        return sum(len(item[3]) for item in items)
+
+    def submit(self, record_type: str, record_id: int, transcript_id: int, text: str):
+        """index_record를 백그라운드에서 실행 (요청 응답을 기다리게 하지 않음)"""
+        def run():
+            try:
+                start = time.time()
+                count = self.index_record(record_type, record_id, transcript_id, text)
+                print(f"의미 검색 인덱스 추가: {record_type} {record_id} (청크 {count}개, {time.time() - start:.2f}초)")
+            except Exception as e:
+                print(f"의미 검색 인덱스 추가 실패 ({record_type} {record_id}): {str(e)}")
+        self._executor.submit(run)
+
+    def remove(self, record_type: str, record_id: int):
+        self._executor.submit(self.index.remove, record_type, record_id)
+
+    def search(self, query: str, k: int = 10, record_type: Optional[str] = None, chunks_per_meeting: int = 3) -> List[dict]:
+        """
+        질의와 의미가 가까운 회의 k개 (transcript_id 기준으로 묶음)
+
+        Returns:
+            list: [{"transcript_id", "score", "matches": [{"record_type", "record_id", "chunk_no", "score"}]}]
+        """
+        query_vector = self.embedder.embed([query], query=True)[0]
+        # 같은 회의의 청크가 상위를 독차지할 수 있으므로 넉넉히 가져와 회의별로 묶음
+        hits = self.index.search(query_vector, k=k * chunks_per_meeting * 4, record_type=record_type)
+        meetings: Dict[int, dict] = {}
+        for hit in hits:
+            meeting = meetings.setdefault(hit["transcript_id"], {
+                "transcript_id": hit["transcript_id"], "score": hit["score"], "matches": []
+            })
+            if len(meeting["matches"]) < chunks_per_meeting:
+                meeting["matches"].append({key: hit[key] for key in ("record_type", "record_id", "chunk_no", "score")})
+        return sorted(meetings.values(), key=lambda meeting: -meeting["score"])[:k]
+
+    def add_snippets(self, db, meetings: List[dict], max_chars: int = 200):
+        """검색 결과의 각 청크에 원문 구간(snippet)을 붙임 (같은 텍스트는 항상 같은 청크로 나뉨)"""
+        import crud
+
+        wanted = {"transcript": set(), "summary": set()}
+        for meeting in meetings:
+            for match in meeting["matches"]:
+                wanted[match["record_type"]].add(match["record_id"])
+        texts = {}
+        if wanted["transcript"]:
+            for record_id, transcript, _ in crud.get_transcript_texts(db, list(wanted["transcript"])):
+                texts[("transcript", record_id)] = transcript
+        if wanted["summary"]:
+            for record_id, _, summary in crud.get_summary_texts(db, list(wanted["summary"])):
+                texts[("summary", record_id)] = summary
+
+        chunked = {}
+        for meeting in meetings:
+            for match in meeting["matches"]:
+                key = (match["record_type"], match["record_id"])
+                if key not in texts:
+                    # 인덱스에는 남아 있지만 DB에서 삭제된 레코드
+                    match["snippet"] = None
+                    continue
+                if key not in chunked:
+                    chunked[key] = self.chunks(texts[key])
+                chunks = chunked[key]
+                snippet = chunks[match["chunk_no"]] if match["chunk_no"] < len(chunks) else ""
+                match["snippet"] = snippet[:max_chars] + ("…" if len(snippet) > max_chars else "")
+        return meetings
+
+    def sync(self, session_factory, batch_size: int = 50) -> dict:
+        """
+        DB와 인덱스 동기화: 인덱스에 없는 레코드는 추가, DB에서 삭제된 레코드는 인덱스에서 제거
+
+        Returns:
+            dict: {"added": 추가한 레코드 수, "removed": 제거한 레코드 수}
+        """
+        import crud
+        from models import SummaryRecord, TranscriptRecord
+
+        self.load()
+        db = session_factory()
+        try:
+            indexed = self.index.keys()
+            transcript_ids = [row[0] for row in db.query(TranscriptRecord.id).all()]
+            summary_rows = db.query(SummaryRecord.id, SummaryRecord.transcript_id).all()
+            existing = {("transcript", tid) for tid in transcript_ids} | {("summary", sid) for sid, _ in summary_rows}
+
+            removed = 0
+            for record_type, record_id in indexed - existing:
+                removed += self.index.remove(record_type, record_id)
+
+            added = 0
+            missing = [tid for tid in transcript_ids if ("transcript", tid) not in indexed]
+            for offset in range(0, len(missing), batch_size):
+                rows = crud.get_transcript_texts(db, missing[offset:offset + batch_size])
+                self.index.add_batch(self.embed_records([
+                    ("transcript", transcript_id, transcript_id, transcript) for transcript_id, transcript, _ in rows
+                ]))
+                added += len(rows)
+                print(f"의미 검색 인덱스 동기화 (STT): {min(offset + batch_size, len(missing))}/{len(missing)}")
+
+            missing = [sid for sid, _ in summary_rows if ("summary", sid) not in indexed]
+            for offset in range(0, len(missing), batch_size):
+                rows = crud.get_summary_texts(db, missing[offset:offset + batch_size])
+                self.index.add_batch(self.embed_records([
+                    ("summary", summary_id, transcript_id, summary) for summary_id, transcript_id, summary in rows
+                ]))
+                added += len(rows)
+                print(f"의미 검색 인덱스 동기화 (요약): {min(offset + batch_size, len(missing))}/{len(missing)}")
+        finally:
+            db.close()
+        return {"added": added, "removed": removed}
+
+    def status(self) -> dict:
+        return {"model": self.embedder.model_name, **self.index.status()}
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+        self.index.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="회의 의미 검색 인덱스 관리")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("sync", help="DB와 인덱스 동기화")
+    sub.add_parser("rebuild", help="인덱스를 지우고 다시 생성")
+    sub.add_parser("status", help="인덱스 상태")
+    sub.add_parser("compact", help="삭제된 레코드 정리")
+    query_parser = sub.add_parser("query", help="검색")
+    query_parser.add_argument("text", help="검색할 문장")
+    query_parser.add_argument("-k", type=int, default=5, help="결과 회의 수")
+    args = parser.parse_args()
+
+    search = SemanticSearch.from_env()
+    if args.command in ("sync", "rebuild"):
+        from database import SessionLocal
+        if args.command == "rebuild":
+            shutil.rmtree(search.index.index_dir, ignore_errors=True)
+            search = SemanticSearch.from_env()
+        start = time.time()
+        result = search.sync(SessionLocal)
+        search.index.flush()
+        print(f"완료: 추가 {result['added']}개, 제거 {result['removed']}개 ({time.time() - start:.1f}초)")
+    elif args.command == "status":
+        print(json.dumps(search.index.status(), ensure_ascii=False, indent=2))
+    elif args.command == "compact":
+        search.index.load()
+        search.index.compact()
+    else:
+        search.load()
+        start = time.perf_counter()
+        results = search.search(args.text, k=args.k)
+        print(f"{(time.perf_counter() - start) * 1000:.1f}ms")
+        for meeting in results:
+            print(f"  회의 {meeting['transcript_id']} (점수 {meeting['score']:.3f}): {meeting['matches']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,17 @@
+import functools
 import os
+import threading
 from dotenv import load_dotenv
 import whisper
 
+import cancellation
+
+
+def _cancellable_decode(model, mel, options):
+    """whisper.decode 전에 현재 요청의 취소 여부 확인 (whisper.transcribe는 30초 윈도우마다 model.decode 호출)"""
+    cancellation.check()
+    return whisper.decode(model, mel, options)
+
 
 class STTProcessor:
     def __init__(self, model_size: str = "base"):
@@ -20,6 +30,10 @@ class STTProcessor:
         self.model_size = model_size
         print(f"Whisper 모델 로딩 중 (크기: {model_size})...")
         self.model = whisper.load_model(model_size)
+        # 요청이 취소되면 다음 윈도우를 디코딩하기 전에 JobCancelled로 중단
+        self.model.decode = functools.partial(_cancellable_decode, self.model)
+        # 하나의 모델을 여러 스레드가 공유하므로 디코딩은 직렬화
+        self.lock = threading.Lock()
         print(f"Whisper 모델 로딩 완료!")
 
     def transcribe(self, audio_file_path):
@@ -28,13 +42,35 @@ class STTProcessor:
 
         Args:
             audio_file_path: 음성 파일 경로 (.mp3, .wav, .m4a 등)
+                             또는 디코딩된 16kHz mono float32 배열 (AudioCache의 메모리 맵 등)
 
         Returns:
             str: 변환된 텍스트
         """
-        if not os.path.exists(audio_file_path):
-            raise FileNotFoundError(f"파일을 찾을 수 없습니다: {audio_file_path}")
+        text, _ = self.transcribe_segments(audio_file_path)
+        return text
+
+    def transcribe_segments(self, audio_file_path):
+        """
+        음성 파일을 텍스트로 변환하고 Whisper 세그먼트(시작/끝 시각)도 함께 반환합니다.
+
+        Args:
+            audio_file_path: 음성 파일 경로 또는 디코딩된 16kHz mono float32 배열
+
+        Returns:
+            tuple: (변환된 텍스트, [{"start": 초, "end": 초, "text": 문장}, ...])
+        """
+        if isinstance(audio_file_path, str):
+            if not os.path.exists(audio_file_path):
+                raise FileNotFoundError(f"파일을 찾을 수 없습니다: {audio_file_path}")
+            print(f"음성 파일 변환 중 (Whisper {self.model_size}): {audio_file_path}")
+        else:
+            print(f"디코딩된 오디오 변환 중 (Whisper {self.model_size}, {len(audio_file_path) / 16000:.1f}초)")
 
-        print(f"음성 파일 변환 중 (Whisper {self.model_size}): {audio_file_path}")
-        result = self.model.transcribe(audio_file_path, language="ko")
-        return result["text"]
+        with self.lock:
+            result = self.model.transcribe(audio_file_path, language="ko")
+        segments = [
+            {"start": seg["start"], "end": seg["end"], "text": seg["text"].strip()}
+            for seg in result["segments"]
+        ]
+        return result["text"], segments
@@ -0,0 +1,296 @@
+"""
+STT 결과/회의록 텍스트 압축 저장
+
+transcript_records.transcript, summary_records.summary 컬럼은 CompressedText 타입으로
+저장 시 zstd(학습된 사전 사용)로 압축하고 읽을 때 자동으로 풀기 때문에 ORM/Core 코드는 그대로 str을 다룹니다.
+한국어 회의 텍스트는 같은 어휘와 말투가 반복되어, 회의록 표본으로 학습한 사전을 쓰면
+짧은 요약까지도 잘 압축됩니다.
+
+저장 형식 (첫 바이트로 구분):
+    0x00 + UTF-8          압축하지 않음 (아주 짧은 텍스트)
+    0x01 + zlib           zstandard 패키지가 없을 때
+    0x02 + 사전 ID(4바이트) + zstd 프레임 (사전 ID 0은 사전 없음)
+마이그레이션 전의 일반 텍스트 값(str, 또는 PostgreSQL bytea로 변환된 UTF-8)도 그대로 읽습니다.
+
+압축된 본문은 DB에서 LIKE 검색을 할 수 없으므로, 레코드마다 문자 unigram/bigram 블룸 필터
+(search_signature)를 별도 컬럼에 저장하고, 검색 시 필터를 통과한 레코드만 풀어서 확인합니다.
+"""
+import os
+import re
+import struct
+import threading
+import unicodedata
+import zlib
+from typing import Iterable, Optional
+
+import numpy as np
+from sqlalchemy import LargeBinary, text
+from sqlalchemy.types import TypeDecorator
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+MARKER_RAW = 0
+MARKER_ZLIB = 1
+MARKER_ZSTD = 2
+
+# 이보다 짧은 텍스트는 압축하지 않음 (헤더/프레임 오버헤드가 더 큼)
+MIN_COMPRESS_BYTES = 32
+
+COMPRESSION_LEVEL = int(os.getenv("TEXT_COMPRESSION_LEVEL", "6"))
+DICTIONARY_TABLE = "compression_dictionaries"
+
+
+class CompressionRegistry:
+    """
+    zstd 사전 보관소 (프로세스당 하나)
+
+    사전은 한 번 저장되면 바뀌지 않으므로 ID별로 캐시합니다. 새로 압축할 때는 가장 최근 사전을 사용하고,
+    예전 사전으로 압축된 값은 저장된 사전 ID로 찾아서 풉니다.
+    """
+
+    def __init__(self):
+        self.engine = None
+        self.active_id = 0
+        self._dicts = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def configure(self, engine):
+        """사전을 읽어 올 엔진 지정 (지정하지 않으면 database.engine)"""
+        with self._lock:
+            self.engine = engine
+            self._dicts = {}
+            self._loaded = False
+            self._local = threading.local()
+
+    def _engine(self):
+        if self.engine is None:
+            from database import engine
+            self.engine = engine
+        return self.engine
+
+    def _load_active(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            try:
+                with self._engine().connect() as conn:
+                    row = conn.execute(text(
+                        f"SELECT id, dict_data FROM {DICTIONARY_TABLE} ORDER BY id DESC LIMIT 1"
+                    )).first()
+            except Exception:
+                # 사전 테이블이 아직 없음 (마이그레이션 전) → 사전 없이 압축
+                row = None
+            if row is not None and zstandard is not None:
+                self._dicts[row.id] = zstandard.ZstdCompressionDict(bytes(row.dict_data))
+                self.active_id = row.id
+            else:
+                self.active_id = 0
+            self._loaded = True
+
+    def _dictionary(self, dict_id: int):
+        if dict_id == 0:
+            return None
+        cached = self._dicts.get(dict_id)
+        if cached is not None:
+            return cached
+        with self._engine().connect() as conn:
+            row = conn.execute(
+                text(f"SELECT dict_data FROM {DICTIONARY_TABLE} WHERE id = :id"), {"id": dict_id}
+            ).first()
+        if row is None:
+            raise ValueError(f"압축 사전을 찾을 수 없습니다 (ID: {dict_id})")
+        dictionary = zstandard.ZstdCompressionDict(bytes(row.dict_data))
+        with self._lock:
+            self._dicts.setdefault(dict_id, dictionary)
+        return self._dicts[dict_id]
+
+    def compressor(self):
+        """(사전 ID, 현재 스레드 전용 ZstdCompressor) - zstd 객체는 스레드 간에 공유하지 않음"""
+        self._load_active()
+        dict_id = self.active_id
+        cache = self._local.__dict__.setdefault("compressors", {})
+        if dict_id not in cache:
+            cache[dict_id] = zstandard.ZstdCompressor(
+                level=COMPRESSION_LEVEL, dict_data=self._dictionary(dict_id), write_content_size=True
+            )
+        return dict_id, cache[dict_id]
+
+    def decompressor(self, dict_id: int):
+        cache = self._local.__dict__.setdefault("decompressors", {})
+        if dict_id not in cache:
+            cache[dict_id] = zstandard.ZstdDecompressor(dict_data=self._dictionary(dict_id))
+        return cache[dict_id]
+
+
+registry = CompressionRegistry()
+
+
+def compress_text(value: str) -> bytes:
+    data = value.encode("utf-8")
+    if len(data) < MIN_COMPRESS_BYTES:
+        return bytes([MARKER_RAW]) + data
+    if zstandard is None:
+        return bytes([MARKER_ZLIB]) + zlib.compress(data, COMPRESSION_LEVEL)
+    dict_id, compressor = registry.compressor()
+    return bytes([MARKER_ZSTD]) + struct.pack(">I", dict_id) + compressor.compress(data)
+
+
+def decompress_text(value) -> str:
+    if isinstance(value, str):
+        # 마이그레이션 전 TEXT 값
+        return value
+    data = bytes(value)
+    if not data:
+        return ""
+    marker = data[0]
+    if marker == MARKER_RAW:
+        return data[1:].decode("utf-8")
+    if marker == MARKER_ZLIB:
+        return zlib.decompress(data[1:]).decode("utf-8")
+    if marker == MARKER_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstd로 압축된 텍스트를 읽으려면 zstandard 패키지가 필요합니다 (pip install zstandard)")
+        (dict_id,) = struct.unpack(">I", data[1:5])
+        return registry.decompressor(dict_id).decompress(data[5:]).decode("utf-8")
+    # PostgreSQL에서 TEXT → BYTEA로 바뀌었지만 아직 압축되지 않은 값
+    return data.decode("utf-8")
+
+
+def is_compressed(value) -> bool:
+    """
+    현재 설정으로 이미 압축된 값인지 확인 (마이그레이션 재실행 시 건너뛰기용)
+
+    zstd 값은 최신 사전으로 압축된 경우에만 True이므로, 사전을 새로 학습한 뒤 다시 실행하면 재압축됩니다.
+    """
+    if value is None or isinstance(value, str):
+        return False
+    data = bytes(value[:5])
+    if not data:
+        return False
+    if data[0] == MARKER_RAW:
+        return True
+    if zstandard is None:
+        return data[0] == MARKER_ZLIB
+    registry._load_active()
+    return data[0] == MARKER_ZSTD and len(data) == 5 and struct.unpack(">I", data[1:5])[0] == registry.active_id
+
+
+class CompressedText(TypeDecorator):
+    """str을 받아 압축된 바이너리로 저장하는 컬럼 타입 (LIKE 검색 불가 → search_signature 사용)"""
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return compress_text(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return decompress_text(value)
+
+
+def train_dictionary(samples: Iterable[str], dict_size: int = 112640) -> Optional[bytes]:
+    """
+    텍스트 표본으로 zstd 사전 학습 (zstandard가 없거나 표본이 부족하면 None)
+
+    Args:
+        samples: 학습용 텍스트 (STT 결과/회의록)
+        dict_size: 사전 크기 (bytes, 기본값: 110KB - zstd CLI 기본값)
+    """
+    if zstandard is None:
+        return None
+    data = [sample.encode("utf-8") for sample in samples if sample]
+    if len(data) < 10:
+        return None
+    try:
+        return zstandard.train_dictionary(dict_size, data).as_bytes()
+    except zstandard.ZstdError as e:
+        print(f"압축 사전 학습 실패 (사전 없이 압축): {e}")
+        return None
+
+
+# ============================================
+# 검색용 시그니처 (블룸 필터)
+# ============================================
+
+_SPACES_RE = re.compile(r"\s+")
+# 블룸 필터 비트 수 = 고유 n-gram 수 × BITS_PER_GRAM (2의 거듭제곱으로 올림, 해시 2개 → 거짓 양성 약 5%)
+BITS_PER_GRAM = 8
+MIN_SIGNATURE_BITS = 8 * 256
+MAX_SIGNATURE_BITS = 8 * 32768
+
+
+def normalize_for_search(value: str) -> str:
+    """검색 비교용 정규화 (NFC, 소문자, 연속 공백 → 공백 하나)"""
+    return _SPACES_RE.sub(" ", unicodedata.normalize("NFC", value or "").lower()).strip()
+
+
+# n-gram 키: bigram은 (앞 코드포인트 << 21) | 뒤 코드포인트, unigram은 1 << 42를 더해 구분
+_UNIGRAM_FLAG = 1 << 42
+_HASH_MULTIPLIER = 0x9E3779B97F4A7C15
+_MASK64 = (1 << 64) - 1
+
+
+def _gram_keys(normalized: str) -> np.ndarray:
+    """고유 unigram/bigram 키 (문자열 조각을 만들지 않고 코드포인트 배열로 계산)"""
+    codes = np.frombuffer(normalized.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    bigrams = (codes[:-1] << np.uint64(21)) | codes[1:]
+    return np.unique(np.concatenate([bigrams, codes | np.uint64(_UNIGRAM_FLAG)]))
+
+
+def _hash_keys(keys: np.ndarray) -> np.ndarray:
+    hashed = keys * np.uint64(_HASH_MULTIPLIER)
+    return hashed ^ (hashed >> np.uint64(29))
+
+
+def _hash_key(key: int) -> int:
+    """_hash_keys와 같은 해시 (검색어 쪽, 파이썬 정수)"""
+    hashed = (key * _HASH_MULTIPLIER) & _MASK64
+    return hashed ^ (hashed >> 29)
+
+
+def search_signature(value: str) -> bytes:
+    """텍스트의 문자 unigram/bigram 블룸 필터 (해시 2개: 하위/상위 32비트)"""
+    keys = _gram_keys(normalize_for_search(value))
+    bits = MIN_SIGNATURE_BITS
+    while bits < len(keys) * BITS_PER_GRAM and bits < MAX_SIGNATURE_BITS:
+        bits *= 2
+    hashed = _hash_keys(keys)
+    mask = np.uint64(bits - 1)
+    flags = np.zeros(bits, dtype=bool)
+    flags[(hashed & mask).astype(np.int64)] = True
+    flags[((hashed >> np.uint64(32)) & mask).astype(np.int64)] = True
+    return np.packbits(flags, bitorder="little").tobytes()
+
+
+def signature_may_contain(signature, keyword: str) -> bool:
+    """
+    keyword가 포함되어 있을 수 있는지 (False면 확실히 없음, True면 본문 확인 필요)
+
+    keyword는 normalize_for_search로 정규화된 값이어야 합니다.
+    """
+    if not keyword:
+        return True
+    signature = bytes(signature)
+    bits = len(signature) * 8
+    codes = [ord(char) for char in keyword]
+    if len(codes) == 1:
+        keys = [codes[0] | _UNIGRAM_FLAG]
+    else:
+        keys = [(first << 21) | second for first, second in zip(codes, codes[1:])]
+    for key in keys:
+        hashed = _hash_key(key)
+        for position in (hashed & (bits - 1), (hashed >> 32) & (bits - 1)):
+            if not signature[position >> 3] & (1 << (position & 7)):
+                return False
+    return True
@@ -0,0 +1,168 @@
+"""
+GPT 전달 전 STT 텍스트 압축
+
+Whisper 결과를 그대로 보내면 추임새(음, 어, 그, 뭐), 말 더듬기로 생긴 반복,
+Whisper 특유의 반복 환각("시청해주셔서 감사합니다" 등)까지 모두 토큰 비용과 지연으로 이어집니다.
+정규식과 한 번의 선형 스캔만 사용하는 결정적(deterministic) 전처리로,
+같은 입력에는 항상 같은 출력이 나오므로 증분 재요약의 청크 캐시와도 함께 쓸 수 있습니다.
+
+    compacted, stats = compact_transcript(text)
+"""
+import re
+import unicodedata
+
+# 토큰 수 추정 기준 (openai_client.estimate_tokens와 동일하게 한국어 1.5자당 1토큰)
+CHARS_PER_TOKEN = 1.5
+
+# 어디에 있어도 의미가 없는 추임새 (단독 토큰일 때만 제거)
+FILLERS = {"음", "음음", "으음", "흠", "어어", "에에", "으", "아아"}
+
+# 뒤에 쉼표/말줄임표가 붙었을 때만 추임새로 보고 제거
+# ("그 사람"의 "그", "3시 에"처럼 띄어 쓴 조사 "에", 감탄사 "어"는 유지)
+SOFT_FILLERS = {"그", "뭐", "저", "이제", "막", "그니까", "그러니까", "약간", "좀", "어", "에"}
+
+# 짧은 n-gram은 이 횟수 이상 연속될 때만 반복으로 봄 ("1 2 1 2 3", "네 네" 등 정상 발화 유지)
+MIN_SHORT_REPEATS = 3
+# 토큰 3개 이상이면서 이 글자 수 이상인 n-gram은 두 번만 연속돼도 반복(문장 반복 환각)으로 봄
+MIN_LONG_NGRAM_TOKENS = 3
+MIN_LONG_NGRAM_CHARS = 10
+
+# Whisper가 무음/잡음 구간에서 만들어내는 대표적인 문장
+HALLUCINATION_RE = re.compile(
+    r"(시청해\s?주셔서\s?감사합니다|구독과\s?좋아요[^.?!\n]*|MBC\s?뉴스\s?[^.?!\n]*입니다|자막\s?제공[^.?!\n]*)[.?!]*"
+)
+
+# 반복 문장 부호 정리 ("!!!" -> "!", "...." -> "...")
+_PUNCT_RUN_RE = re.compile(r"([!?,])\1+|\.{4,}")
+_SPACE_BEFORE_PUNCT_RE = re.compile(r"\s+([.,?!])")
+_SPACES_RE = re.compile(r"[ \t ]+")
+_SPEAKER_PREFIX_RE = re.compile(r"^(\[[^\]]+\])\s*")
+_TRAILING_PUNCT = ".,?!…~"
+_SENTENCE_END = {".", "?", "!", "?!"}
+
+
+def _core(token: str) -> str:
+    """반복 비교용 토큰 (끝의 문장 부호 제외)"""
+    return token.rstrip(_TRAILING_PUNCT)
+
+
+def _is_filler(token: str) -> bool:
+    core = _core(token)
+    if core in FILLERS:
+        return True
+    if core in SOFT_FILLERS and core != token:
+        tail = token[len(core):]
+        return tail.startswith(",") or tail.startswith("…") or tail.startswith("..")
+    return False
+
+
+def _min_repeats(ngram) -> int:
+    """n-gram을 반복으로 보기 위한 최소 연속 횟수"""
+    if len(ngram) >= MIN_LONG_NGRAM_TOKENS and sum(len(key) for key in ngram) >= MIN_LONG_NGRAM_CHARS:
+        return 2
+    return MIN_SHORT_REPEATS
+
+
+def _collapse_repeats(tokens, max_ngram):
+    """
+    연속으로 반복되는 n-gram(1 ~ max_ngram 토큰)을 한 번만 남깁니다.
+
+    짧은 n-gram은 MIN_SHORT_REPEATS번 이상 연속될 때만, 긴 n-gram(문장)은 두 번부터 축약하므로
+    "좋습니다 좋습니다 좋습니다"나 같은 문장이 수십 번 반복되는 환각은 정리하고
+    "1 2 1 2 3"처럼 우연히 두 번 이어진 짧은 구절은 그대로 둡니다.
+    마지막 반복을 남겨 문장 끝의 마침표/물음표를 유지합니다.
+    """
+    keys = [_core(token) for token in tokens]
+    out = []
+    removed = 0
+    i = 0
+    while i < len(tokens):
+        key = keys[i]
+        for n in range(1, min(max_ngram, (len(tokens) - i) // 2) + 1):
+            if keys[i + n] != key:
+                continue
+            ngram = keys[i:i + n]
+            count = 1
+            while keys[i + count * n:i + (count + 1) * n] == ngram:
+                count += 1
+            if count >= _min_repeats(ngram):
+                last = i + (count - 1) * n
+                out.extend(tokens[last:last + n])
+                removed += (count - 1) * n
+                i += count * n
+                break
+        else:
+            out.append(tokens[i])
+            i += 1
+    return out, removed
+
+
+def _normalize(line: str) -> str:
+    line = _PUNCT_RUN_RE.sub(lambda m: m.group(1) or "...", line)
+    line = _SPACE_BEFORE_PUNCT_RE.sub(r"\1", line)
+    return _SPACES_RE.sub(" ", line).strip()
+
+
+def compact_transcript(text: str, max_ngram: int = 16):
+    """
+    추임새 제거, 반복 n-gram 축약, 환각 문장 제거, 공백/문장 부호 정규화
+
+    "[화자 N] ..." 형식의 줄은 화자 표시를 그대로 두고 발화 내용만 압축합니다.
+
+    Args:
+        text: STT 변환 결과 (일반 텍스트 또는 화자 라벨 텍스트)
+        max_ngram: 반복으로 볼 최대 토큰 수
+
+    Returns:
+        tuple: (압축된 텍스트, 통계 dict)
+    """
+    text = unicodedata.normalize("NFC", text or "")
+    fillers_removed = 0
+    repeats_removed = 0
+    hallucinations_removed = 0
+
+    lines = []
+    for raw_line in text.splitlines():
+        match = _SPEAKER_PREFIX_RE.match(raw_line)
+        prefix = match.group(1) if match else None
+        body = raw_line[match.end():] if match else raw_line
+
+        body, count = HALLUCINATION_RE.subn(" ", body)
+        hallucinations_removed += count
+
+        tokens = []
+        for token in _normalize(body).split(" "):
+            if not token:
+                continue
+            if _is_filler(token):
+                fillers_removed += 1
+                # "좋습니다 음." 처럼 추임새에 붙은 문장 끝 부호는 앞 토큰으로 옮김
+                tail = token[len(_core(token)):]
+                if tokens and tail in _SENTENCE_END and _core(tokens[-1]) == tokens[-1]:
+                    tokens[-1] += tail
+                continue
+            tokens.append(token)
+
+        tokens, removed = _collapse_repeats(tokens, max_ngram)
+        repeats_removed += removed
+        if not tokens:
+            continue
+        body = " ".join(tokens)
+        lines.append(f"{prefix} {body}" if prefix else body)
+
+    compacted = "\n".join(lines)
+
+    tokens_before = int(len(text) / CHARS_PER_TOKEN)
+    tokens_after = int(len(compacted) / CHARS_PER_TOKEN)
+    stats = {
+        "chars_before": len(text),
+        "chars_after": len(compacted),
+        "tokens_before": tokens_before,
+        "tokens_after": tokens_after,
+        "tokens_saved": tokens_before - tokens_after,
+        "saved_ratio": round(1 - tokens_after / tokens_before, 4) if tokens_before else 0.0,
+        "fillers_removed": fillers_removed,
+        "repeats_removed": repeats_removed,
+        "hallucinations_removed": hallucinations_removed,
+    }
+    return compacted, stats
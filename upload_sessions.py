@@ -0,0 +1,234 @@
+"""
+재개 가능한 분할 업로드 세션
+
+1. 세션 생성 (파일 크기, 청크 크기, 선택적으로 전체 SHA-256)
+2. 청크를 병렬로 PUT (청크별 SHA-256 검증 후 파일의 해당 오프셋에 바로 기록)
+3. 수신된 구간 조회 (연결이 끊긴 뒤 빠진 청크만 다시 전송)
+4. 완료 요청 시 전체 파일을 스트리밍으로 해시 검증
+
+세션 파일 (base_dir 아래):
+    <id>.json    세션 정보
+    <id>.part    파일 크기만큼 미리 할당한 데이터 파일
+    <id>.chunks  수신 완료된 청크 로그 ("인덱스 SHA-256" 한 줄씩, append-only)
+    <id>.lock    완료 처리 중 표시 (O_EXCL로 생성하여 동시에 들어온 완료 요청 중 하나만 진행)
+"""
+import hashlib
+import json
+import os
+import time
+import uuid
+from typing import List, Optional
+
+MAX_CHUNK_SIZE = 16 * 1024 * 1024
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+# 세션 생성 시 디스크에 파일 크기만큼 미리 할당하므로 상한을 둠
+MAX_FILE_SIZE = int(os.getenv("UPLOAD_MAX_FILE_SIZE", str(4 * 1024 ** 3)))
+
+
+class UploadError(Exception):
+    """잘못된 업로드 요청 (status_code로 HTTP 상태 코드 전달)"""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class UploadSessionStore:
+    def __init__(self, base_dir: str = "uploads/sessions"):
+        self.base_dir = base_dir
+        os.makedirs(base_dir, exist_ok=True)
+
+    def _path(self, upload_id: str, suffix: str) -> str:
+        # upload_id는 uuid hex만 허용 (경로 조작 방지)
+        if not upload_id.isalnum():
+            raise UploadError("잘못된 업로드 ID입니다", status_code=404)
+        return os.path.join(self.base_dir, upload_id + suffix)
+
+    def create(
+        self,
+        filename: str,
+        file_size: int,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        sha256: Optional[str] = None,
+        metadata: Optional[dict] = None
+    ) -> dict:
+        """
+        새 업로드 세션 생성
+
+        Args:
+            filename: 원본 파일명
+            file_size: 전체 파일 크기 (bytes)
+            chunk_size: 청크 크기 (bytes, 마지막 청크만 더 작을 수 있음)
+            sha256: 전체 파일 SHA-256 (주면 완료 시 검증)
+            metadata: 완료 후 변환에 필요한 추가 정보 (whisper_model 등)
+        """
+        if file_size <= 0:
+            raise UploadError("파일 크기가 올바르지 않습니다")
+        if file_size > MAX_FILE_SIZE:
+            raise UploadError(f"파일 크기는 최대 {MAX_FILE_SIZE} bytes입니다", status_code=413)
+        if not 0 < chunk_size <= MAX_CHUNK_SIZE:
+            raise UploadError(f"청크 크기는 1 ~ {MAX_CHUNK_SIZE} bytes여야 합니다")
+
+        upload_id = uuid.uuid4().hex
+        session = {
+            "upload_id": upload_id,
+            "filename": filename,
+            "file_size": file_size,
+            "chunk_size": chunk_size,
+            "total_chunks": (file_size + chunk_size - 1) // chunk_size,
+            "sha256": sha256.lower() if sha256 else None,
+            "metadata": metadata or {},
+            "created_at": time.time(),
+        }
+
+        # 전체 크기를 미리 할당해 두고 청크는 각자의 오프셋에 기록
+        with open(self._path(upload_id, ".part"), "wb") as f:
+            f.truncate(file_size)
+        open(self._path(upload_id, ".chunks"), "a").close()
+        with open(self._path(upload_id, ".json"), "w", encoding="utf-8") as f:
+            json.dump(session, f, ensure_ascii=False)
+        return session
+
+    def get(self, upload_id: str) -> dict:
+        try:
+            with open(self._path(upload_id, ".json"), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise UploadError("업로드 세션을 찾을 수 없습니다", status_code=404)
+
+    def data_path(self, upload_id: str) -> str:
+        return self._path(upload_id, ".part")
+
+    def received_chunks(self, upload_id: str) -> dict:
+        """수신 완료된 청크 {인덱스: SHA-256}"""
+        received = {}
+        with open(self._path(upload_id, ".chunks"), encoding="utf-8") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 2:
+                    received[int(parts[0])] = parts[1]
+        return received
+
+    def write_chunk(self, upload_id: str, index: int, data: bytes, sha256: Optional[str] = None) -> dict:
+        """
+        청크를 검증한 뒤 파일의 해당 위치에 기록 (같은 청크를 다시 보내도 안전)
+
+        Args:
+            upload_id: 세션 ID
+            index: 청크 인덱스 (0부터)
+            data: 청크 내용
+            sha256: 클라이언트가 계산한 청크 SHA-256 (주면 검증)
+        """
+        session = self.get(upload_id)
+        if os.path.exists(self._path(upload_id, ".lock")):
+            raise UploadError("이미 완료 처리 중인 업로드입니다", status_code=409)
+        if not 0 <= index < session["total_chunks"]:
+            raise UploadError("청크 인덱스가 범위를 벗어났습니다")
+
+        offset = index * session["chunk_size"]
+        expected_length = min(session["chunk_size"], session["file_size"] - offset)
+        if len(data) != expected_length:
+            raise UploadError(f"청크 크기가 올바르지 않습니다 (예상 {expected_length}, 수신 {len(data)})")
+
+        digest = hashlib.sha256(data).hexdigest()
+        if sha256 and sha256.lower() != digest:
+            raise UploadError("청크 무결성 검증 실패 (SHA-256 불일치)", status_code=422)
+
+        fd = os.open(self.data_path(upload_id), os.O_WRONLY)
+        try:
+            os.pwrite(fd, data, offset)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+        # 한 줄 append는 원자적이므로 병렬 PUT에서도 로그가 섞이지 않음
+        with open(self._path(upload_id, ".chunks"), "a", encoding="utf-8") as f:
+            f.write(f"{index} {digest}\n")
+
+        return {"index": index, "offset": offset, "length": len(data), "sha256": digest}
+
+    def status(self, upload_id: str) -> dict:
+        """수신된 바이트 구간과 빠진 청크 목록"""
+        session = self.get(upload_id)
+        received = self.received_chunks(upload_id)
+        chunk_size = session["chunk_size"]
+
+        ranges: List[List[int]] = []
+        for index in sorted(received):
+            start = index * chunk_size
+            end = min(start + chunk_size, session["file_size"])
+            if ranges and ranges[-1][1] == start:
+                ranges[-1][1] = end
+            else:
+                ranges.append([start, end])
+
+        return {
+            "upload_id": upload_id,
+            "file_size": session["file_size"],
+            "chunk_size": chunk_size,
+            "total_chunks": session["total_chunks"],
+            "bytes_received": sum(end - start for start, end in ranges),
+            "received_ranges": ranges,
+            "missing_chunks": [i for i in range(session["total_chunks"]) if i not in received],
+        }
+
+    def claim(self, upload_id: str):
+        """
+        완료 처리 시작 표시 (이미 다른 요청이 처리 중이면 409)
+
+        finalize가 실패하면 release로 표시를 지워 완료 요청을 다시 받을 수 있게 합니다.
+        """
+        self.get(upload_id)
+        try:
+            os.close(os.open(self._path(upload_id, ".lock"), os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        except FileExistsError:
+            raise UploadError("이미 완료 처리 중인 업로드입니다", status_code=409)
+
+    def release(self, upload_id: str):
+        path = self._path(upload_id, ".lock")
+        if os.path.exists(path):
+            os.remove(path)
+
+    def finalize(self, upload_id: str) -> str:
+        """
+        모든 청크가 도착했는지 확인하고 전체 파일을 스트리밍으로 해시하여 검증
+
+        Returns:
+            str: 전체 파일 SHA-256
+        """
+        session = self.get(upload_id)
+        status = self.status(upload_id)
+        if status["missing_chunks"]:
+            raise UploadError(f"아직 받지 못한 청크가 {len(status['missing_chunks'])}개 있습니다", status_code=409)
+
+        digest = hashlib.sha256()
+        with open(self.data_path(upload_id), "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        file_hash = digest.hexdigest()
+
+        if session["sha256"] and session["sha256"] != file_hash:
+            raise UploadError("파일 무결성 검증 실패 (SHA-256 불일치)", status_code=422)
+        return file_hash
+
+    def delete(self, upload_id: str):
+        for suffix in (".json", ".part", ".chunks", ".lock"):
+            path = self._path(upload_id, suffix)
+            if os.path.exists(path):
+                os.remove(path)
+
+    def cleanup_expired(self, max_age: float) -> int:
+        """max_age초보다 오래된 세션 삭제"""
+        deleted = 0
+        now = time.time()
+        for name in os.listdir(self.base_dir):
+            if not name.endswith(".json"):
+                continue
+            upload_id = name[:-len(".json")]
+            try:
+                if now - self.get(upload_id)["created_at"] > max_age:
+                    self.delete(upload_id)
+                    deleted += 1
+            except (UploadError, ValueError):
+                continue
+        return deleted